@@ -28,6 +28,10 @@ INSERT INTO category (category_id, name) VALUES
 --------------------------------------------------
 
 
+DROP TABLE IF EXISTS review_helpful;
+DROP TABLE IF EXISTS store_review_daily;
+DROP TABLE IF EXISTS category_leaderboard;   -- 이전 버전의 카테고리 리더보드 (더 이상 쓰지 않음)
+DROP TABLE IF EXISTS store_rank_stats;
 DROP TABLE IF EXISTS review;
 DROP TABLE IF EXISTS menu;
 DROP TABLE IF EXISTS store;
@@ -42,8 +46,12 @@ CREATE TABLE `store` (
   `phone`        VARCHAR(30),
   `distance_km`  DECIMAL(6,2),
   `category_id`  INT,
+  `lat`          DECIMAL(9,6) NULL COMMENT '위도 (내 주변 랭킹용, 앱의 geo 격자 인덱스에 적재)',
+  `lng`          DECIMAL(9,6) NULL COMMENT '경도',
   PRIMARY KEY (`store_id`),
   KEY `idx_store_category` (`category_id`),
+  FULLTEXT KEY `ft_store_name` (`name`) WITH PARSER ngram,
+  FULLTEXT KEY `ft_store_address` (`address`) WITH PARSER ngram,
   CONSTRAINT `fk_store_category`
     FOREIGN KEY (`category_id`) REFERENCES `category`(`category_id`)
     ON UPDATE RESTRICT ON DELETE SET NULL
@@ -59,6 +67,7 @@ CREATE TABLE `menu` (
   PRIMARY KEY (`menu_id`),
   UNIQUE KEY `uq_menu_store_name` (`store_id`, `name`),
   KEY `idx_menu_store` (`store_id`),
+  FULLTEXT KEY `ft_menu_name` (`name`) WITH PARSER ngram,
   CONSTRAINT `fk_menu_store`
     FOREIGN KEY (`store_id`) REFERENCES `store`(`store_id`)
     ON UPDATE RESTRICT ON DELETE CASCADE
@@ -68,6 +77,7 @@ CREATE TABLE `menu` (
 -- 3. 회원 / 관리자 관련 테이블
 --------------------------------------------------
 
+DROP TABLE IF EXISTS review_helpful;
 DROP TABLE IF EXISTS inquiry;
 DROP TABLE IF EXISTS review;
 DROP TABLE IF EXISTS user;
@@ -141,6 +151,9 @@ CREATE TABLE `review` (
   PRIMARY KEY (`review_id`),
   KEY `idx_review_user` (`user_id`),
   KEY `idx_review_store_created` (`store_id`, `created_at`),
+  -- 매장별 리뷰 목록 정렬용 (store_reviews.py, 동점은 review_id DESC)
+  KEY `idx_review_store_rating` (`store_id`, `rating`, `review_id`),
+  KEY `idx_review_store_helpful` (`store_id`, `helpful_cnt`, `review_id`),
   CONSTRAINT `fk_review_user`
     FOREIGN KEY (`user_id`) REFERENCES `user`(`user_id`)
     ON UPDATE RESTRICT ON DELETE CASCADE,
@@ -149,6 +162,23 @@ CREATE TABLE `review` (
     ON UPDATE RESTRICT ON DELETE CASCADE
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
 
+-- 리뷰 도움돼요 (사용자당 1회, review.helpful_cnt 와 같은 트랜잭션에서 갱신)
+DROP TABLE IF EXISTS review_helpful;
+
+CREATE TABLE `review_helpful` (
+  `review_id`  INT NOT NULL,
+  `user_id`    INT NOT NULL,
+  `created_at` DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (`review_id`, `user_id`),
+  KEY `idx_helpful_user` (`user_id`),
+  CONSTRAINT `fk_helpful_review`
+    FOREIGN KEY (`review_id`) REFERENCES `review`(`review_id`)
+    ON UPDATE RESTRICT ON DELETE CASCADE,
+  CONSTRAINT `fk_helpful_user`
+    FOREIGN KEY (`user_id`) REFERENCES `user`(`user_id`)
+    ON UPDATE RESTRICT ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
 -- 문의
 DROP TABLE IF EXISTS inquiry;
 
@@ -161,13 +191,81 @@ CREATE TABLE `inquiry` (
   `content`    TEXT,
   `answer`     VARCHAR(255),
   `field`      VARCHAR(255),
+  `is_answered` TINYINT(1) AS (`answer` IS NOT NULL AND `answer` <> '') STORED,
   PRIMARY KEY (`inquiry_id`),
   KEY `idx_inquiry_user` (`user_id`),
+  -- 문의 목록 커서 페이지네이션용 (inquiry_id DESC 순 스캔 + 답변 여부/분야 필터)
+  KEY `idx_inquiry_user_answered` (`user_id`, `is_answered`, `inquiry_id`),
+  KEY `idx_inquiry_answered` (`is_answered`, `inquiry_id`),
+  KEY `idx_inquiry_field_answered` (`field`, `is_answered`, `inquiry_id`),
   CONSTRAINT `fk_inquiry_user`
     FOREIGN KEY (`user_id`) REFERENCES `user`(`user_id`)
     ON UPDATE RESTRICT ON DELETE CASCADE
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
 
+--------------------------------------------------
+-- 4-1. 랭킹 집계 테이블
+--  리뷰 작성/삭제 시 앱(ranking.apply_review_delta)에서 증분 갱신합니다.
+--  bayes_score = (rating_sum + m*C) / (review_cnt + m),  m = 5
+--------------------------------------------------
+
+DROP TABLE IF EXISTS review_global_stats;
+
+CREATE TABLE `store_rank_stats` (
+  `store_id`    INT NOT NULL COMMENT '매장의 id',
+  `category_id` INT NULL COMMENT 'store.category_id 복사본 (트리거로 동기화)',
+  `rating_sum`  INT NOT NULL DEFAULT 0,
+  `review_cnt`  INT NOT NULL DEFAULT 0,
+  `avg_rating`  DECIMAL(10,6) NOT NULL DEFAULT 0,
+  `bayes_score` DECIMAL(10,6) NOT NULL DEFAULT 0,
+  `cnt_1`       INT NOT NULL DEFAULT 0 COMMENT '별점 1 리뷰 수',
+  `cnt_2`       INT NOT NULL DEFAULT 0,
+  `cnt_3`       INT NOT NULL DEFAULT 0,
+  `cnt_4`       INT NOT NULL DEFAULT 0,
+  `cnt_5`       INT NOT NULL DEFAULT 0,
+  PRIMARY KEY (`store_id`),
+  KEY `idx_rank_bayes` (`bayes_score`, `review_cnt`),
+  KEY `idx_rank_avg` (`avg_rating`, `review_cnt`),
+  KEY `idx_rank_cat_bayes` (`category_id`, `bayes_score`, `review_cnt`),
+  KEY `idx_rank_cat_avg` (`category_id`, `avg_rating`, `review_cnt`),
+  CONSTRAINT `fk_rank_stats_store`
+    FOREIGN KEY (`store_id`) REFERENCES `store`(`store_id`)
+    ON UPDATE RESTRICT ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+-- 매장별 일자 리뷰 합계 (최근 30/90일 평균·추세용, ranking.get_review_stats)
+-- 리뷰 작성/삭제 시 같은 트랜잭션에서 그 날짜 행을 증감합니다.
+CREATE TABLE `store_review_daily` (
+  `store_id`    INT NOT NULL,
+  `day`         DATE NOT NULL COMMENT 'review.created_at 의 날짜',
+  `rating_sum`  INT NOT NULL DEFAULT 0,
+  `review_cnt`  INT NOT NULL DEFAULT 0,
+  PRIMARY KEY (`store_id`, `day`),
+  CONSTRAINT `fk_review_daily_store`
+    FOREIGN KEY (`store_id`) REFERENCES `store`(`store_id`)
+    ON UPDATE RESTRICT ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+-- 전체 리뷰 합계 (전체 평균 C 계산용, 항상 id = 1 한 행)
+CREATE TABLE `review_global_stats` (
+  `id`          TINYINT NOT NULL,
+  `rating_sum`  BIGINT NOT NULL DEFAULT 0,
+  `review_cnt`  INT NOT NULL DEFAULT 0,
+  `c_snapshot`  DECIMAL(10,6) NOT NULL DEFAULT 0 COMMENT 'bayes_score 계산에 사용 중인 C',
+  PRIMARY KEY (`id`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+-- 응답 캐시(ETag)용 리소스 버전. 'rank' / 'store:<id>' (versions.py)
+-- 쓰기 API 가 같은 트랜잭션에서 version 을 1씩 올립니다. 행이 없으면 버전 0.
+DROP TABLE IF EXISTS resource_version;
+
+CREATE TABLE `resource_version` (
+  `resource`    VARCHAR(40) NOT NULL,
+  `version`     BIGINT NOT NULL DEFAULT 0,
+  `updated_at`  DATETIME NOT NULL COMMENT 'Last-Modified (UTC)',
+  PRIMARY KEY (`resource`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
 --------------------------------------------------
 -- 5. 랭킹용 뷰
 --------------------------------------------------
@@ -221,17 +319,19 @@ SELECT
 FROM store_stats st
 CROSS JOIN global_stats gs;
 
--- 최종 랭킹 뷰 
+-- 최종 랭킹 뷰 (집계 테이블 기준)
 CREATE VIEW v_store_ranking AS
 SELECT
-  b.store_id,
-  b.name,
-  b.address,
-  b.distance_km,
-  b.avg_rating,
-  b.review_cnt,
-  b.bayes_score
-FROM v_store_scores_bayesian b;
+  s.store_id,
+  s.name,
+  s.address,
+  s.distance_km,
+  s.category_id,
+  rs.avg_rating,
+  rs.review_cnt,
+  rs.bayes_score
+FROM store s
+JOIN store_rank_stats rs ON rs.store_id = s.store_id;
 
 -- 테스트 유저 insert
 
@@ -843,6 +943,54 @@ UPDATE inquiry
 SET answer = '테스트 답변 입니다.'
 WHERE inquiry_id = 1;
 
+-- 랭킹 집계 테이블 초기화
+INSERT INTO store_rank_stats
+  (store_id, category_id, rating_sum, review_cnt, cnt_1, cnt_2, cnt_3, cnt_4, cnt_5)
+SELECT s.store_id, s.category_id, COALESCE(SUM(r.rating), 0), COUNT(r.review_id),
+       COUNT(IF(r.rating = 1, 1, NULL)), COUNT(IF(r.rating = 2, 1, NULL)),
+       COUNT(IF(r.rating = 3, 1, NULL)), COUNT(IF(r.rating = 4, 1, NULL)),
+       COUNT(IF(r.rating = 5, 1, NULL))
+FROM store s
+LEFT JOIN review r ON r.store_id = s.store_id
+GROUP BY s.store_id, s.category_id;
+
+INSERT INTO store_review_daily (store_id, day, rating_sum, review_cnt)
+SELECT store_id, DATE(created_at), COALESCE(SUM(rating), 0), COUNT(*)
+FROM review
+GROUP BY store_id, DATE(created_at);
+
+INSERT INTO review_global_stats (id, rating_sum, review_cnt, c_snapshot)
+SELECT 1, COALESCE(SUM(rating), 0), COUNT(review_id), COALESCE(AVG(rating), 0)
+FROM review;
+
+UPDATE store_rank_stats rs
+CROSS JOIN review_global_stats g
+SET rs.avg_rating  = IF(rs.review_cnt > 0, rs.rating_sum / rs.review_cnt, 0),
+    rs.bayes_score = (rs.rating_sum + 5 * g.c_snapshot) / (rs.review_cnt + 5)
+WHERE g.id = 1;
+
+-- 새 매장이 추가되면 리뷰 0건 상태의 집계 행을 같이 만듭니다.
+DROP TRIGGER IF EXISTS trg_store_rank_init;
+
+CREATE TRIGGER trg_store_rank_init
+AFTER INSERT ON store
+FOR EACH ROW
+  INSERT INTO store_rank_stats (store_id, category_id, bayes_score)
+  SELECT NEW.store_id, NEW.category_id, g.c_snapshot
+  FROM review_global_stats g
+  WHERE g.id = 1;
+
+-- 매장 카테고리가 바뀌면 집계 행의 category_id 도 맞춥니다.
+DROP TRIGGER IF EXISTS trg_store_rank_category;
+
+CREATE TRIGGER trg_store_rank_category
+AFTER UPDATE ON store
+FOR EACH ROW
+  UPDATE store_rank_stats
+  SET category_id = NEW.category_id
+  WHERE store_id = NEW.store_id
+    AND NOT (category_id <=> NEW.category_id);
+
 -- 생성 확인 코드
 select * from category;
 select * from inquiry;
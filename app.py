@@ -1,22 +1,45 @@
-from flask import Flask, jsonify, request, send_from_directory, g, render_template, redirect
+from flask import Flask, jsonify, request, send_from_directory, g, render_template, redirect, make_response
 
 from flask_cors import CORS
-from ranking import get_rank
-import decimal
-from db import get_connection
+from ranking import (
+    get_rank, get_rank_page, get_rank_count, get_rank_near, get_category_leaders, attach_review_stats,
+    get_scored_rank, parse_score_mode, current_snapshot, current_daily, snapshot_version, snapshots,
+    apply_review_delta, invalidate_rank_cache, get_rank_cache_stats, LEADERBOARD_SIZE,
+)
+from db import get_connection, get_pool_stats
 from datetime import datetime, timedelta
+from functools import wraps
 import pymysql
 import jwt
-from functools import wraps
+from auth import login_required, admin_required, get_auth_stats
+from json_provider import FastJSONProvider
 
 # store_info Blueprint import
 from store_info import bp as store_info_bp
 # store_admin Blueprint import
 from store_admin import bp as store_admin_bp
+# store_search Blueprint import
+from store_search import bp as store_search_bp
+# review_bulk Blueprint import
+from review_bulk import bp as review_bulk_bp
+# export Blueprint import
+from export import bp as export_bp
+# store_reviews Blueprint import
+from store_reviews import bp as store_reviews_bp
+# menus Blueprint import (메뉴 캐시 / 일괄 관리)
+from menus import bp as menus_bp, invalidate_menus, get_menu_cache_stats
+import autocomplete
+import geo
+import versions
+from versions import conditional
+from projection import parse_fields, project
+import compression
+import profiling
 
 
 
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
 CORS(app) 
 
 app.config['SECRET_KEY'] = 'login'  
@@ -24,6 +47,13 @@ app.config['SECRET_KEY'] = 'login'
 # Blueprint 등록
 app.register_blueprint(store_info_bp)
 app.register_blueprint(store_admin_bp)
+app.register_blueprint(store_search_bp)
+app.register_blueprint(review_bulk_bp)
+app.register_blueprint(export_bp)
+app.register_blueprint(store_reviews_bp)
+app.register_blueprint(menus_bp)
+compression.init_app(app)
+profiling.init_app(app)
 
 
 # ======================
@@ -43,111 +73,143 @@ def create_token(user_id, name, role=None):
     return token
 
 
-# ======================
-# 공통 함수
-# ======================
-def convert_decimal(rows):
-    """Decimal 타입을 float으로 변환 (JSON 응답용)"""
-    converted = []
-    for row in rows:
-        new_row = {}
-        for k, v in row.items():
-            if isinstance(v, decimal.Decimal):
-                new_row[k] = float(v)
-            else:
-                new_row[k] = v
-        converted.append(new_row)
-    return converted
-
 # ======================
 # 랭킹 API
 # GET /api/rank
+#  - offset 방식 : ?limit=20&offset=40            → [ ... ]
+#  - cursor 방식 : ?limit=20&cursor=<next_cursor>  → {"items": [...], "next_cursor": ...}
+#  - 내 주변     : ?lat=37.34&lng=126.73&radius_km=3&sort=score|combined → [ ... ]
+#                  (distance_km = 요청 위치로부터의 거리, offset 방식과 같이 limit/offset 사용)
+#  - category_id 로 카테고리 안의 랭킹만 조회 가능 (offset / cursor / 내 주변 모두)
+#  - stats=1 이면 각 매장에 별점 분포(rating_hist)와 30/90일 평균·추세를 덧붙임
+#  - 점수 방식 (offset 방식에서만) : ?m=10&half_life_days=180&window_days=365
+#      m              = 베이지안 사전 리뷰 수 (기본 5, use_adv=0 이면 0 = 단순 평균)
+#      half_life_days = 리뷰 가중치가 절반이 되는 일수 (시간 감쇠)
+#      window_days    = 최근 N일 리뷰만 사용
 # ======================
-@app.route("/api/rank", methods=["GET"])
-def api_rank():
-   
-    limit = int(request.args.get("limit", 10))
-    offset = int(request.args.get("offset", 0))
-    min_reviews = int(request.args.get("min_reviews", 0))
-    use_adv = request.args.get("use_adv", "1") == "1" 
+RANK_MAX_LIMIT = 100
+GEO_DEFAULT_RADIUS_KM = 3.0
+GEO_MAX_RADIUS_KM = 50.0
+# 랭킹 응답을 브라우저/CDN 이 재검증 없이 재사용해도 되는 시간(초).
+# 0 = no-cache: 리뷰를 쓴 직후에도 반영된 순위를 보도록 매번 ETag 로 재검증 (바뀌지 않았으면 304)
+RANK_MAX_AGE = 0
 
-    rows = get_rank(limit=limit,
-                    offset=offset,
-                    min_reviews=min_reviews,
-                    use_adv=use_adv)
+# ?fields= 로 고를 수 있는 랭킹 행 필드 (combined_score 는 내 주변 랭킹 sort=combined 에서만)
+# stats=1 이면 별점 분포 / 최근 30·90일 통계(ranking.shape_review_stats) 필드도 붙음
+RANK_FIELDS = dict.fromkeys(
+    ["store_id", "name", "distance_km", "review_cnt", "avg_rating", "score", "combined_score",
+     "rating_hist", "avg_30d", "cnt_30d", "avg_90d", "cnt_90d", "trend_30d"])
 
-    rows = convert_decimal(rows)
-    return jsonify(rows)
-# ======================
-# JWT 데코레이터들
-# ======================
-def login_required(f):
-    @wraps(f)
-    def decorated(*args, **kwargs):
-       
-        if request.method == "OPTIONS":
-            return "", 200
+def wants_daily(args=None):
+    """감쇠/기간 점수 방식 요청이면 True (일자 합계 스냅샷으로 응답, ranking.needs_daily)"""
+    args = request.args if args is None else args
+    return (args.get("half_life_days", type=float) is not None
+            or args.get("window_days", type=int) is not None)
 
-        auth_header = request.headers.get("Authorization", None)
-        if not auth_header or not auth_header.startswith("Bearer "):
-            return jsonify({"message": "인증 토큰이 필요합니다."}), 401
 
-        token = auth_header.split(" ")[1]
+def rank_version():
+    """GET /api/rank 의 ETag 버전: 감쇠/기간 방식이면 일자 합계 스냅샷의 버전"""
+    return snapshot_version(daily=wants_daily())
 
-        try:
-            payload = jwt.decode(
-                token, app.config["SECRET_KEY"], algorithms=["HS256"]
-            )
-        except jwt.ExpiredSignatureError:
-            return jsonify({"message": "토큰이 만료되었습니다."}), 401
-        except jwt.InvalidTokenError:
-            return jsonify({"message": "유효하지 않은 토큰입니다."}), 401
-
-        user_id = payload.get("user_id")
-        name = payload.get("name")
-        role = payload.get("role")
-
-       
-        if user_id is None or name is None:
-            return jsonify({"message": "유효하지 않은 사용자 토큰입니다."}), 401
-
-        g.user_id = user_id
-        g.user_name = name
-        g.role = role
-
-        return f(*args, **kwargs)
 
-    return decorated
-
-
-def admin_required(f):
+def with_snapshot_age(f):
+    """랭킹 스냅샷(ranking.RankSnapshot)으로 응답했으면 X-Rank-Snapshot-Age(초) 헤더를 붙임"""
     @wraps(f)
     def decorated(*args, **kwargs):
-        
-        if request.method == "OPTIONS":
-            return "", 200
+        response = make_response(f(*args, **kwargs))
+        snap = current_daily() if wants_daily() else current_snapshot()
+        if snap is not None and response.status_code == 200:
+            response.headers["X-Rank-Snapshot-Age"] = f"{snap.age():.1f}"
+        return response
+    return decorated
 
-        auth_header = request.headers.get('Authorization', None)
-        if not auth_header or not auth_header.startswith('Bearer '):
-            return jsonify({'message': '인증 토큰이 필요합니다.'}), 401
 
-        token = auth_header.split(' ')[1]
+def parse_rank_args(args):
+    """
+    GET /api/rank 쿼리 파라미터 검사 (asgi_app.api_rank 와 공유). 잘못된 값은 ValueError.
+    → dict(limit, offset, min_reviews, use_adv, cursor, category_id, fields, with_stats, mode, near)
+      near = 내 주변 랭킹이면 (lat, lng, radius_km, sort), 아니면 None
+    """
+    try:
+        limit = int(args.get("limit", 10))
+        offset = int(args.get("offset", 0))
+        min_reviews = int(args.get("min_reviews", 0))
+    except ValueError:
+        raise ValueError("limit, offset, min_reviews 는 정수여야 합니다.")
+    use_adv = args.get("use_adv", "1") == "1"
+    q = {
+        "limit": max(1, min(limit, RANK_MAX_LIMIT)),
+        "offset": max(0, offset),
+        "min_reviews": min_reviews,
+        "use_adv": use_adv,
+        "cursor": args.get("cursor"),
+        "category_id": args.get("category_id", type=int),
+        "fields": parse_fields(RANK_FIELDS, args=args),
+        "with_stats": args.get("stats") == "1",
+        "mode": parse_score_mode(m=args.get("m", type=float),
+                                 half_life_days=args.get("half_life_days", type=float),
+                                 window_days=args.get("window_days", type=int),
+                                 use_adv=use_adv),
+        "near": None,
+    }
+    near = "lat" in args or "lng" in args
+    if q["mode"] is not None and (q["cursor"] is not None or near):
+        raise ValueError("m / half_life_days / window_days 는 offset 방식에서만 사용할 수 있습니다.")
+
+    if near:
+        lat = args.get("lat", type=float)
+        lng = args.get("lng", type=float)
+        radius_km = args.get("radius_km", GEO_DEFAULT_RADIUS_KM, type=float)
+        sort = args.get("sort", "score")
+        if lat is None or lng is None or not (-90 <= lat <= 90 and -180 <= lng <= 180):
+            raise ValueError("lat, lng 값이 올바르지 않습니다.")
+        if radius_km is None or not (0 < radius_km <= GEO_MAX_RADIUS_KM):
+            raise ValueError(f"radius_km 는 0 초과 {GEO_MAX_RADIUS_KM:g} 이하여야 합니다.")
+        if sort not in ("score", "combined"):
+            raise ValueError("sort 는 score / combined 중 하나여야 합니다.")
+        q["near"] = (lat, lng, radius_km, sort)
+    return q
+
+
+def shape_rank_rows(rows, q, stats=None):
+    """fields / stats=1 적용. 캐시와 공유하는 rows 는 attach_review_stats() / project() 가 새 dict 를 만들어 건드리지 않음"""
+    if q["with_stats"]:
+        rows = attach_review_stats(rows, stats)
+    return project(rows, q["fields"])
 
-        try:
-            payload = jwt.decode(token, app.config['SECRET_KEY'], algorithms=['HS256'])
-        except jwt.ExpiredSignatureError:
-            return jsonify({'message': '토큰이 만료되었습니다.'}), 401
-        except jwt.InvalidTokenError:
-            return jsonify({'message': '유효하지 않은 토큰입니다.'}), 401
 
-        if payload.get('role') != 'admin':
-            return jsonify({'message': '관리자 권한이 필요합니다.'}), 403
+@app.route("/api/rank", methods=["GET"])
+@conditional("rank", max_age=RANK_MAX_AGE, version=rank_version)
+@with_snapshot_age
+def api_rank():
+    try:
+        q = parse_rank_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    common = dict(limit=q["limit"], min_reviews=q["min_reviews"], category_id=q["category_id"])
+
+    # lat/lng 가 있으면 내 주변 랭킹
+    if q["near"] is not None:
+        lat, lng, radius_km, sort = q["near"]
+        rows = get_rank_near(lat, lng, radius_km, offset=q["offset"],
+                             use_adv=q["use_adv"], sort=sort, **common)
+        return jsonify(shape_rank_rows(rows, q))
+
+    # cursor 파라미터가 있으면(빈 값 = 첫 페이지) 커서 방식으로 응답
+    if q["cursor"] is not None:
+        try:
+            rows, next_cursor = get_rank_page(cursor=q["cursor"], use_adv=q["use_adv"], **common)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        return jsonify({"items": shape_rank_rows(rows, q), "next_cursor": next_cursor})
 
-        g.admin_id = payload.get('admin_id')
-        g.admin_name = payload.get('admin_name')
+    if q["mode"] is not None:
+        rows = get_scored_rank(q["mode"], offset=q["offset"], **common)
+        return jsonify(shape_rank_rows(rows, q))
 
-        return f(*args, **kwargs)
-    return decorated
+    rows = get_rank(offset=q["offset"], use_adv=q["use_adv"], **common)
+    # Decimal 등은 FastJSONProvider 가 직렬화 시점에 변환
+    return jsonify(shape_rank_rows(rows, q))
 
 
 # ======================
@@ -155,37 +217,24 @@ def admin_required(f):
 # POST /api/login
 # (user 테이블 기준)
 # ======================
-@app.route("/api/login", methods=["POST"])
-def user_login():
-    data = request.get_json() or {}
-    login_id = data.get("login_id")
-    password = data.get("password") or data.get("pw")
-
-    if not login_id or not password:
-        return jsonify({"message": "아이디와 비밀번호를 입력하세요."}), 400
+USER_LOGIN_SQL = """
+    SELECT user_id, login_id, pw, name
+    FROM user
+    WHERE login_id = %s
+"""
 
-    conn = get_connection()
-    try:
-        with conn.cursor() as cursor:
-            sql = """
-                SELECT user_id, login_id, pw, name
-                FROM user
-                WHERE login_id = %s
-            """
-            cursor.execute(sql, (login_id,))
-            user = cursor.fetchone()
-    finally:
-        conn.close()
 
+def login_result(user, password):
+    """USER_LOGIN_SQL 로 읽은 user 행과 입력한 비밀번호 → (응답 body, status) (asgi_app 과 공유)"""
     # 아이디 / 비밀번호 검증
     if not user or user["pw"] != password:
-        return jsonify({"message": "아이디 또는 비밀번호가 올바르지 않습니다."}), 401
+        return {"message": "아이디 또는 비밀번호가 올바르지 않습니다."}, 401
 
     # 토큰 생성
     token = create_token(user["user_id"], user["name"], role=None)
 
     # 토큰 + 유저 정보 같이 응답
-    return jsonify({
+    return {
         "message": "로그인 성공",
         "token": token,
         "user": {
@@ -193,7 +242,28 @@ def user_login():
             "login_id": user["login_id"],
             "name": user["name"]
         }
-    }), 200
+    }, 200
+
+
+@app.route("/api/login", methods=["POST"])
+def user_login():
+    data = request.get_json() or {}
+    login_id = data.get("login_id")
+    password = data.get("password") or data.get("pw")
+
+    if not login_id or not password:
+        return jsonify({"message": "아이디와 비밀번호를 입력하세요."}), 400
+
+    conn = get_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(USER_LOGIN_SQL, (login_id,))
+            user = cursor.fetchone()
+    finally:
+        conn.close()
+
+    body, status = login_result(user, password)
+    return jsonify(body), status
 
 
 # ======================
@@ -233,9 +303,101 @@ def create_inquiry():
     return jsonify({"inquiry_id": inquiry_id}), 201
 
 
+# ======================
+# 문의 목록 페이지 조회 (커서 방식, 요약 컬럼만)
+#  - cursor : 직전 페이지의 next_cursor (첫 페이지는 빈 값)
+#  - limit  : 페이지 크기 (기본 20, 최대 100)
+#  - status : answered / unanswered
+#  - field  : 문의 분야
+# ======================
+INQUIRY_PAGE_DEFAULT = 20
+INQUIRY_PAGE_MAX = 100
+
+# ?fields= 로 고를 수 있는 문의 목록 필드 (content/answer 는 전체 목록 API 에만 있음)
+INQUIRY_FIELDS = dict.fromkeys(
+    ["inquiry_id", "user_id", "title", "writer", "field",
+     "content", "answer", "answered", "created_at"])
+
+
+def list_inquiry_page(user_id=None):
+    """
+    inquiry_id 기준 keyset 페이지네이션.
+    본문(content)/답변(answer) 대신 answered 여부만 내려주며 전체 내용은 상세 API 에서 조회합니다.
+    """
+    limit = request.args.get("limit", INQUIRY_PAGE_DEFAULT, type=int)
+    limit = max(1, min(limit, INQUIRY_PAGE_MAX))
+    try:
+        fields = parse_fields(INQUIRY_FIELDS)
+        sql, params = build_inquiry_page_query(user_id, limit,
+                                               request.args.get("cursor") or None,
+                                               request.args.get("status"),
+                                               request.args.get("field"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(sql, params)
+            rows = cur.fetchall()
+    finally:
+        conn.close()
+
+    page = shape_inquiry_page(rows, limit)
+    page["items"] = project(page["items"], fields)
+    return jsonify(page)
+
+
+def build_inquiry_page_query(user_id, limit, cursor=None, status=None, field=None):
+    """문의 목록 페이지 SQL 과 파라미터 (동기/비동기 모드 공용). 잘못된 값은 ValueError."""
+    where, params = [], []
+    if user_id is not None:
+        where.append("user_id = %s")
+        params.append(user_id)
+    if status == "answered":
+        where.append("is_answered = 1")
+    elif status == "unanswered":
+        where.append("is_answered = 0")
+    elif status:
+        raise ValueError("status 는 answered / unanswered 중 하나여야 합니다.")
+    if field:
+        where.append("field = %s")
+        params.append(field)
+    if cursor is not None:
+        if not cursor.isdigit():
+            raise ValueError("잘못된 cursor 입니다.")
+        where.append("inquiry_id < %s")
+        params.append(int(cursor))
+    params.append(limit)
+
+    sql = f"""
+        SELECT
+            inquiry_id,
+            user_id,
+            title,
+            writer,
+            field,
+            is_answered AS answered,
+            created_at
+        FROM inquiry
+        {"WHERE " + " AND ".join(where) if where else ""}
+        ORDER BY inquiry_id DESC
+        LIMIT %s
+    """
+    return sql, params
+
+
+def shape_inquiry_page(rows, limit):
+    for r in rows:
+        r["answered"] = bool(r["answered"])
+    next_cursor = str(rows[-1]["inquiry_id"]) if len(rows) == limit else None
+    return {"items": rows, "next_cursor": next_cursor}
+
+
 # ======================
 # 문의 목록 (로그인한 사용자)
 # GET /api/inquiries
+#  - cursor 파라미터가 있으면 list_inquiry_page() 형식으로 응답
 # ======================
 @app.route("/api/inquiries", methods=["GET"])
 @login_required
@@ -244,6 +406,13 @@ def list_inquiries():
     user_id_param = request.args.get("user_id", type=int)
     user_id = user_id_param if user_id_param is not None else g.user_id
 
+    if "cursor" in request.args:
+        return list_inquiry_page(user_id)
+    try:
+        fields = parse_fields(INQUIRY_FIELDS)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
     conn = get_connection()
     try:
         with conn.cursor() as cur:
@@ -263,15 +432,10 @@ def list_inquiries():
             """
             cur.execute(sql, (user_id,))
             rows = cur.fetchall()
-
-           
-            for r in rows:
-                if isinstance(r.get("created_at"), datetime):
-                    r["created_at"] = r["created_at"].strftime("%Y-%m-%d %H:%M:%S")
     finally:
         conn.close()
 
-    return jsonify(rows)
+    return jsonify(project(rows, fields))
 
 # ======================
 # 문의 상세 (사용자 본인 것만)
@@ -301,10 +465,6 @@ def get_inquiry_detail(inquiry_id):
     if inquiry['user_id'] != g.user_id:
         return jsonify({"error": "해당 문의에 접근할 권한이 없습니다."}), 403
 
-    
-    if isinstance(inquiry.get("created_at"), datetime):
-        inquiry["created_at"] = inquiry["created_at"].strftime("%Y-%m-%d %H:%M:%S")
-
     return jsonify(inquiry)
 
 @app.route('/inquiry_detail', methods=['GET'])
@@ -351,9 +511,17 @@ def update_inquiry_answer(inquiry_id):
 # ======================
 # 모든 문의(관리자 전체 조회용)
 # GET /api/inquiries_all
+#  - cursor 파라미터가 있으면 list_inquiry_page() 형식으로 응답
 # ======================
 @app.route('/api/inquiries_all', methods=['GET'])
 def get_all_inquiries():
+    if "cursor" in request.args:
+        return list_inquiry_page()
+    try:
+        fields = parse_fields(INQUIRY_FIELDS)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
     conn = get_connection()
     try:
         with conn.cursor() as cursor:
@@ -372,7 +540,7 @@ def get_all_inquiries():
             """
             cursor.execute(sql)
             rows = cursor.fetchall()
-        return jsonify(rows), 200
+        return jsonify(project(rows, fields)), 200
     finally:
         conn.close()
 
@@ -499,35 +667,6 @@ def my_inquiry_list():
     return render_template('my_inquiry_list.html')
 
 
-# ======================
-# 매장 검색
-# ======================
-@app.route('/api/stores/search', methods=['GET'])
-def search_store():
-    q = request.args.get('q')
-    if not q:
-        return jsonify({'error': '검색어가 없습니다.'}), 400
-
-    conn = get_connection()
-    try:
-        with conn.cursor() as cur:
-            sql = """
-                SELECT store_id, name
-                FROM store
-                WHERE name LIKE %s
-                ORDER BY name
-            """
-            cur.execute(sql, (f"%{q}%",))
-            stores = cur.fetchall()
-    finally:
-        conn.close()
-
-    if not stores:
-        return jsonify({'error': '매장을 찾을 수 없습니다.'}), 404
-
-    return jsonify(stores)
-
-
 @app.route('/admin/store/search', methods=['GET'])
 def admin_store_search_page():
     """매장 검색 페이지를 보여줍니다."""
@@ -665,10 +804,23 @@ def admin_update_menu(menu_id):
                 WHERE menu_id = %s
             """
             cur.execute(sql, (new_name, new_price, menu_id))
+
+            # 매장 상세(메뉴 목록)의 ETag 를 바꿈
+            cur.execute("SELECT store_id FROM menu WHERE menu_id = %s", (menu_id,))
+            menu = cur.fetchone()
+            if menu:
+                versions.bump(cur, f"store:{menu['store_id']}")
         conn.commit()
+    except pymysql.err.IntegrityError:
+        conn.rollback()
+        return jsonify({'message': '같은 이름의 메뉴가 이미 있습니다.'}), 409
     finally:
         conn.close()
 
+    if menu:
+        invalidate_menus(menu['store_id'])
+    versions.clear_local()
+
     return jsonify({'message': '메뉴가 수정되었습니다.'}), 200
 
 @app.route('/api/admin/menu/<int:menu_id>', methods=['DELETE'])
@@ -677,16 +829,21 @@ def admin_delete_menu(menu_id):
     try:
         with conn.cursor() as cur:
             
-            cur.execute("SELECT menu_id FROM menu WHERE menu_id = %s", (menu_id,))
-            if not cur.fetchone():
+            cur.execute("SELECT menu_id, store_id FROM menu WHERE menu_id = %s", (menu_id,))
+            menu = cur.fetchone()
+            if not menu:
                 return jsonify({'message': '해당 메뉴를 찾을 수 없습니다.'}), 404
             
            
             cur.execute("DELETE FROM menu WHERE menu_id = %s", (menu_id,))
+            versions.bump(cur, f"store:{menu['store_id']}")
         conn.commit()
     finally:
         conn.close()
 
+    invalidate_menus(menu['store_id'])
+    versions.clear_local()
+
     return jsonify({'message': '메뉴가 삭제되었습니다.'}), 200
 
 @app.route('/api/admin/review/<int:review_id>', methods=['DELETE'])
@@ -694,17 +851,29 @@ def admin_delete_review(review_id):
     conn = get_connection()
     try:
         with conn.cursor() as cur:
-           
-            cur.execute("SELECT review_id FROM review WHERE review_id = %s", (review_id,))
-            if not cur.fetchone():
+            # 같은 리뷰를 동시에 삭제해도 집계에서 한 번만 빼도록 리뷰 행을 잠금
+            cur.execute("""
+                SELECT review_id, store_id, rating, created_at
+                FROM review
+                WHERE review_id = %s
+                FOR UPDATE
+            """, (review_id,))
+            review = cur.fetchone()
+            if not review:
                 return jsonify({'message': '해당 리뷰를 찾을 수 없습니다.'}), 404
-            
-           
-            cur.execute("DELETE FROM review WHERE review_id = %s", (review_id,))
+
+            if cur.execute("DELETE FROM review WHERE review_id = %s", (review_id,)) != 1:
+                return jsonify({'message': '해당 리뷰를 찾을 수 없습니다.'}), 404
+
+            # 랭킹 집계 반영
+            apply_review_delta(cur, review["store_id"], review["rating"], sign=-1,
+                               created_at=review["created_at"])
         conn.commit()
     finally:
         conn.close()
 
+    invalidate_rank_cache()
+
     return jsonify({'message': '리뷰가 삭제되었습니다.'}), 200
 
 
@@ -745,14 +914,18 @@ def create_review():
                 VALUES (%s, %s, %s, %s)
             """
             cur.execute(sql, (user_id, store_id, rating, content))
-            conn.commit()
             review_id = cur.lastrowid
+
+            # 랭킹 집계 반영
+            apply_review_delta(cur, store_id, rating)
+            conn.commit()
     except Exception as e:
         print(f"리뷰 작성 오류: {e}")
         return jsonify({"error": "리뷰 작성 중 오류가 발생했습니다."}), 500
     finally:
         conn.close()
-    
+
+    invalidate_rank_cache()
     return jsonify({"message": "리뷰가 작성되었습니다.", "review_id": review_id}), 201
 
 # ======================
@@ -760,18 +933,107 @@ def create_review():
 # GET /api/rank/count
 # ======================
 @app.route("/api/rank/count", methods=["GET"])
+@conditional("rank", max_age=RANK_MAX_AGE, version=snapshot_version)
+@with_snapshot_age
 def api_rank_count():
-    conn = get_connection()
+    category_id = request.args.get("category_id", type=int)
+    return jsonify({"count": get_rank_count(category_id)})
+
+# ======================
+# 카테고리별 상위 매장 (카테고리 탭용)
+# GET /api/rank/categories?k=5
+# ======================
+@app.route("/api/rank/categories", methods=["GET"])
+@conditional("rank", max_age=RANK_MAX_AGE, version=snapshot_version)
+@with_snapshot_age
+def api_rank_categories():
+    k = request.args.get("k", 5, type=int)
+    return jsonify(get_category_leaders(max(0, min(k, LEADERBOARD_SIZE))))
+
+# ======================
+# DB 커넥션 풀 현황
+# GET /api/admin/db/pool
+# ======================
+@app.route("/api/admin/db/pool", methods=["GET"])
+@admin_required
+def admin_pool_stats():
+    return jsonify(get_pool_stats())
+
+# ======================
+# 쿼리 프로파일링 통계
+# GET    /api/admin/db/queries?top=20&sort=total|mean|max|count
+# DELETE /api/admin/db/queries  (통계 초기화)
+# ======================
+@app.route("/api/admin/db/queries", methods=["GET"])
+@admin_required
+def admin_query_stats():
+    top = request.args.get("top", 20, type=int)
+    sort = request.args.get("sort", "total")
+    if sort not in ("total", "mean", "max", "count"):
+        return jsonify({"error": "sort 는 total / mean / max / count 중 하나여야 합니다."}), 400
+    return jsonify(profiling.get_query_stats(max(1, min(top, 200)), sort))
+
+@app.route("/api/admin/db/queries", methods=["DELETE"])
+@admin_required
+def admin_reset_query_stats():
+    profiling.reset_query_stats()
+    return jsonify({"message": "쿼리 통계를 초기화했습니다."}), 200
+
+# ======================
+# 랭킹 캐시 현황
+# GET /api/admin/rank/cache
+# ======================
+@app.route("/api/admin/rank/cache", methods=["GET"])
+@admin_required
+def admin_rank_cache_stats():
+    return jsonify(get_rank_cache_stats())
+
+# ======================
+# 메뉴 캐시 현황
+# GET /api/admin/menu/cache
+# ======================
+@app.route("/api/admin/menu/cache", methods=["GET"])
+@admin_required
+def admin_menu_cache_stats():
+    return jsonify(get_menu_cache_stats())
+
+# ======================
+# 인증 토큰 캐시 현황
+# GET /api/admin/auth/cache
+# ======================
+@app.route("/api/admin/auth/cache", methods=["GET"])
+@admin_required
+def admin_auth_cache_stats():
+    return jsonify(get_auth_stats())
+
+# ======================
+# 앱 팩토리 (serve.py 에서 워커를 fork 하기 전에 한 번 호출)
+# ======================
+def create_app():
+    """
+    라우트/Blueprint 는 import 시점에 등록되어 있으므로
+    템플릿을 미리 컴파일하고 자동완성 / 좌표 인덱스를 적재한 뒤 app 을 반환합니다.
+    """
+    for name in app.jinja_env.list_templates():
+        app.jinja_env.get_template(name)
+
+    # 자동완성 / 좌표 인덱스를 미리 적재 (실패하면 첫 요청 때 다시 시도)
     try:
-        with conn.cursor() as cur:
-            cur.execute("SELECT COUNT(*) AS cnt FROM store")
-            row = cur.fetchone()
-        return jsonify({"count": row["cnt"]})
-    finally:
-        conn.close()
+        autocomplete.index.load()
+        geo.index.load()
+    except Exception as e:
+        print(f"인덱스 적재 오류: {e}")
+
+    # 첫 랭킹 스냅샷도 미리 계산 (워커 프로세스는 이것을 물려받고 각자 스레드로 갱신)
+    try:
+        snapshots.rebuild()
+    except Exception as e:
+        print(f"랭킹 스냅샷 계산 오류: {e}")
+    return app
+
 
 # ======================
-# 실행
+# 실행 (개발용. 운영은 python serve.py)
 # ======================
 if __name__ == "__main__":
-    app.run(debug=True)
+    create_app().run(debug=True)
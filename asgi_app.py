@@ -0,0 +1,669 @@
+"""
+asgi_app.py
+----------------------------------------
+비동기(ASGI) 실행 모드
+app.py 의 API 일부(랭킹, 로그인, 매장 상세, 검색, 자동완성, 리뷰, 문의)를 Quart + aiomysql 로 제공합니다.
+DB 응답을 기다리는 동안 워커 스레드를 붙잡지 않으므로
+프로세스 하나로 많은 동시 요청을 처리할 수 있습니다.
+
+파라미터 검사, SQL, 결과 가공은 동기 모드와 같은 함수를 사용합니다.
+- app.parse_rank_args() / shape_rank_rows() : GET /api/rank 의 모든 방식
+  (offset / cursor / 내 주변 / 점수 방식, stats, fields, ETag·304, 랭킹 스냅샷)
+- ranking.build_rank_query() / build_rank_stores_query() / review_stats_queries() / review_delta_steps()
+- app.USER_LOGIN_SQL / login_result()
+- store_info.STORE_DETAIL_SQL / shape_store_detail()
+- store_search.build_search_query()
+- app.build_inquiry_page_query() / shape_inquiry_page()
+랭킹 스냅샷 / 자동완성·좌표 인덱스는 메모리에서 바로 읽습니다. 비동기 SQL 이 없는 경로
+(스냅샷이 없을 때의 점수 방식, 카테고리별 상위 매장)는 동기 함수를 스레드에서 실행합니다.
+
+실행:
+    pip install -r requirements-async.txt
+    hypercorn asgi_app:app --bind 0.0.0.0:5001
+    (uvicorn 을 설치했다면 uvicorn asgi_app:app --port 5001 도 가능)
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import timezone
+from functools import wraps
+
+import aiomysql
+from quart import Quart, g, jsonify, make_response, request
+from werkzeug.sansio.http import is_resource_modified
+
+from app import (
+    app as flask_app,
+    RANK_MAX_AGE, INQUIRY_PAGE_DEFAULT, INQUIRY_PAGE_MAX, USER_LOGIN_SQL,
+    build_inquiry_page_query, shape_inquiry_page, parse_rank_args, shape_rank_rows,
+    wants_daily, login_result,
+)
+from auth import AuthError, bearer_payload
+from db import DB_CONFIG
+from json_provider import FastJSONProvider
+from ranking import (
+    rank_cache, build_rank_query, build_rank_stores_query, review_delta_steps,
+    encode_cursor, decode_cursor, RANK_COUNT_SQL, LEADERBOARD_SIZE,
+    invalidate_rank_cache, get_rank_cache_stats, current_snapshot, current_daily,
+    snapshot_version, snapshots, needs_daily, get_rank, get_rank_page, get_rank_near,
+    get_rank_count, get_scored_rank, get_category_leaders, shape_rank_near,
+    review_stats_queries, shape_review_stats_rows,
+)
+from store_info import STORE_DETAIL_SQL, shape_store_detail
+from store_search import (
+    SEARCH_SCOPES, SEARCH_DEFAULT_LIMIT, SEARCH_MAX_LIMIT, AUTOCOMPLETE_DEFAULT_K,
+    AUTOCOMPLETE_MAX_K, build_search_query,
+)
+from versions import VERSION_SQL, make_etag, version_cache
+import autocomplete
+import geo
+
+# 비동기 풀 설정 (커넥션 하나가 여러 요청을 순서대로 처리하므로 동기 풀보다 크게)
+ASYNC_POOL_MIN_SIZE = 2
+ASYNC_POOL_MAX_SIZE = 50
+ASYNC_POOL_RECYCLE = 1800   # 이 시간(초)보다 오래된 커넥션은 새로 만듭니다
+
+app = Quart(__name__)
+app.json = FastJSONProvider(app)
+app.config['SECRET_KEY'] = flask_app.config['SECRET_KEY']
+
+pool = None
+
+
+# ======================
+# aiomysql 커넥션 풀 (서버 시작/종료 시 생성/정리)
+# ======================
+@app.before_serving
+async def open_pool():
+    global pool
+    pool = await aiomysql.create_pool(
+        host=DB_CONFIG['host'],
+        user=DB_CONFIG['user'],
+        password=DB_CONFIG['password'],
+        db=DB_CONFIG['db'],
+        charset=DB_CONFIG['charset'],
+        cursorclass=aiomysql.DictCursor,
+        autocommit=False,
+        minsize=ASYNC_POOL_MIN_SIZE,
+        maxsize=ASYNC_POOL_MAX_SIZE,
+        pool_recycle=ASYNC_POOL_RECYCLE,
+    )
+
+    # 자동완성 / 좌표 인덱스와 첫 랭킹 스냅샷을 미리 적재 (app.create_app() 과 같음, 동기 풀 사용)
+    for label, load in (("인덱스", autocomplete.index.load), ("인덱스", geo.index.load),
+                        ("랭킹 스냅샷", snapshots.rebuild)):
+        try:
+            await asyncio.to_thread(load)
+        except Exception as e:
+            print(f"{label} 적재 오류: {e}")
+
+
+@app.after_serving
+async def close_pool():
+    pool.close()
+    await pool.wait_closed()
+
+
+@asynccontextmanager
+async def acquire():
+    """
+    pool.acquire() 대신 사용. 반납 전에 끝나지 않은 트랜잭션을 rollback 합니다 (db.py 의 _release 와 같음).
+    autocommit=False 라 SELECT 만 해도 트랜잭션이 열리고, aiomysql 은 트랜잭션 중인 커넥션을
+    반납하면 닫아 버리므로 이렇게 하지 않으면 조회할 때마다 새로 연결하게 됩니다.
+    """
+    async with pool.acquire() as conn:
+        try:
+            yield conn
+        finally:
+            if not conn.closed and conn.get_transaction_status():
+                try:
+                    await conn.rollback()
+                except Exception:
+                    conn.close()
+
+
+async def fetch_all(sql, params=()):
+    async with acquire() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(sql, params)
+            return await cur.fetchall()
+
+
+async def fetch_one(sql, params=()):
+    async with acquire() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(sql, params)
+            return await cur.fetchone()
+
+
+async def run_steps_async(cur, steps):
+    """ranking.run_steps() 의 비동기 버전"""
+    row = None
+    while True:
+        try:
+            sql, params = steps.send(row)
+        except StopIteration:
+            return
+        await cur.execute(sql, params)
+        row = await cur.fetchone()
+
+
+# ======================
+# JWT 데코레이터 (auth.py 의 비동기 버전)
+# ======================
+def login_required(f):
+    @wraps(f)
+    async def decorated(*args, **kwargs):
+        try:
+            payload = bearer_payload(request.headers.get("Authorization"),
+                                     app.config["SECRET_KEY"])
+        except AuthError as e:
+            return jsonify({"message": e.message}), e.status
+
+        if payload.get("user_id") is None or payload.get("name") is None:
+            return jsonify({"message": "유효하지 않은 사용자 토큰입니다."}), 401
+
+        g.user_id = payload.get("user_id")
+        g.user_name = payload.get("name")
+        g.role = payload.get("role")
+        return await f(*args, **kwargs)
+    return decorated
+
+
+def admin_required(f):
+    @wraps(f)
+    async def decorated(*args, **kwargs):
+        try:
+            payload = bearer_payload(request.headers.get("Authorization"),
+                                     app.config["SECRET_KEY"])
+        except AuthError as e:
+            return jsonify({'message': e.message}), e.status
+
+        if payload.get('role') != 'admin':
+            return jsonify({'message': '관리자 권한이 필요합니다.'}), 403
+
+        g.admin_id = payload.get('admin_id')
+        g.admin_name = payload.get('admin_name')
+        return await f(*args, **kwargs)
+    return decorated
+
+
+# ======================
+# 조건부 요청 (versions.conditional 의 비동기 버전, 같은 ETag)
+# ======================
+async def get_version(resource):
+    """versions.get_version() 의 비동기 버전 (같은 version_cache 사용)"""
+    cached = version_cache.get(resource)
+    if cached is not None:
+        return cached
+
+    generation = version_cache.generation
+    row = await fetch_one(VERSION_SQL, (resource,))
+    result = (row["version"], row["updated_at"]) if row else (0, None)
+    version_cache.set(resource, result, generation)
+    return result
+
+
+def conditional(resource, max_age=0, version=None):
+    cache_control = f"public, max-age={max_age}" if max_age else "no-cache"
+
+    def decorator(f):
+        @wraps(f)
+        async def decorated(*args, **kwargs):
+            name = resource(**kwargs) if callable(resource) else resource
+            # 핸들러보다 먼저 버전을 읽어야 그 사이에 쓰기가 있어도 ETag 가 응답보다 새것이 되지 않음
+            current, updated_at = (version() if version else None) or await get_version(name)
+            etag = make_etag(name, current, request.full_path)
+            last_modified = updated_at.replace(tzinfo=timezone.utc) if updated_at else None
+
+            if not is_resource_modified(http_if_none_match=request.headers.get("If-None-Match"),
+                                        http_if_modified_since=request.headers.get("If-Modified-Since"),
+                                        etag=etag, last_modified=last_modified):
+                response = await make_response("", 304)
+            else:
+                response = await make_response(await f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag)
+            if last_modified:
+                response.last_modified = last_modified
+            response.headers["Cache-Control"] = cache_control
+            return response
+        return decorated
+    return decorator
+
+
+def rank_version():
+    return snapshot_version(daily=wants_daily(request.args))
+
+
+def with_snapshot_age(f):
+    """app.with_snapshot_age 의 비동기 버전"""
+    @wraps(f)
+    async def decorated(*args, **kwargs):
+        response = await make_response(await f(*args, **kwargs))
+        snap = current_daily() if wants_daily(request.args) else current_snapshot()
+        if snap is not None and response.status_code == 200:
+            response.headers["X-Rank-Snapshot-Age"] = f"{snap.age():.1f}"
+        return response
+    return decorated
+
+
+# ======================
+# 랭킹 API (app.api_rank 와 같은 parse_rank_args() / 응답, rank_cache 공유)
+# GET /api/rank
+# - 랭킹 스냅샷이 있으면 동기 모드와 같은 함수로 메모리에서 잘라서 응답
+# - 없으면 같은 SQL 빌더로 aiomysql 에서 조회
+# ======================
+async def get_review_stats(store_ids):
+    """ranking.get_review_stats() 의 비동기 버전 (같은 캐시 키)"""
+    store_ids = sorted(set(store_ids))
+    if not store_ids:
+        return {}
+    key = ("review_stats", tuple(store_ids))
+    cached = rank_cache.get(key)
+    if cached is not None:
+        return cached
+
+    generation = rank_cache.generation
+    results = []
+    async with acquire() as conn:
+        async with conn.cursor() as cur:
+            for sql, params in review_stats_queries(store_ids):
+                await cur.execute(sql, params)
+                results.append(await cur.fetchall())
+    result = shape_review_stats_rows(*results)
+    rank_cache.set(key, result, generation)
+    return result
+
+
+async def rank_near_rows(q, common):
+    lat, lng, radius_km, sort = q["near"]
+    if current_snapshot() is not None:
+        return get_rank_near(lat, lng, radius_km, offset=q["offset"],
+                             use_adv=q["use_adv"], sort=sort, **common)
+    distances = dict(geo.within(lat, lng, radius_km))
+    rows = []
+    if distances:
+        rows = await fetch_all(*build_rank_stores_query(distances, q["min_reviews"], q["use_adv"],
+                                                        q["category_id"]))
+    return shape_rank_near(rows, distances, sort, q["offset"], q["limit"])
+
+
+async def rank_cursor_page(q, common):
+    if current_snapshot() is not None:
+        return get_rank_page(cursor=q["cursor"], use_adv=q["use_adv"], **common)
+
+    cursor, limit, use_adv = q["cursor"], q["limit"], q["use_adv"]
+    after = decode_cursor(cursor, use_adv) if cursor else None
+    key = ("rank_cursor", cursor, limit, q["min_reviews"], use_adv, q["category_id"])
+    page = rank_cache.get(key)
+    if page is None:
+        generation = rank_cache.generation
+        rows = await fetch_all(*build_rank_query(limit, 0, q["min_reviews"], use_adv,
+                                                 after, q["category_id"]))
+        next_cursor = encode_cursor(rows[-1], use_adv) if len(rows) == limit else None
+        page = (rows, next_cursor)
+        rank_cache.set(key, page, generation)
+    return page
+
+
+async def rank_offset_rows(q, common):
+    if current_snapshot() is not None:
+        return get_rank(offset=q["offset"], use_adv=q["use_adv"], **common)
+
+    key = ("rank", q["offset"], q["limit"], q["min_reviews"], q["use_adv"], q["category_id"])
+    rows = rank_cache.get(key)
+    if rows is None:
+        generation = rank_cache.generation
+        rows = await fetch_all(*build_rank_query(q["limit"], q["offset"], q["min_reviews"],
+                                                 q["use_adv"], category_id=q["category_id"]))
+        rank_cache.set(key, rows, generation)
+    return rows
+
+
+async def scored_rows(q, common):
+    snap = current_daily() if needs_daily(q["mode"]) else current_snapshot()
+    if snap is not None:
+        return get_scored_rank(q["mode"], offset=q["offset"], **common)
+    # 스냅샷이 아직 없으면 매장/일자 합계를 읽어 계산 (동기 함수, 스레드에서)
+    return await asyncio.to_thread(get_scored_rank, q["mode"], offset=q["offset"], **common)
+
+
+async def shape_rank(rows, q):
+    stats = await get_review_stats(row["store_id"] for row in rows) if q["with_stats"] else None
+    return shape_rank_rows(rows, q, stats)
+
+
+@app.route("/api/rank", methods=["GET"])
+@conditional("rank", max_age=RANK_MAX_AGE, version=rank_version)
+@with_snapshot_age
+async def api_rank():
+    try:
+        q = parse_rank_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    common = dict(limit=q["limit"], min_reviews=q["min_reviews"], category_id=q["category_id"])
+
+    if q["near"] is not None:
+        return jsonify(await shape_rank(await rank_near_rows(q, common), q))
+
+    if q["cursor"] is not None:
+        try:
+            rows, next_cursor = await rank_cursor_page(q, common)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        return jsonify({"items": await shape_rank(rows, q), "next_cursor": next_cursor})
+
+    if q["mode"] is not None:
+        return jsonify(await shape_rank(await scored_rows(q, common), q))
+
+    return jsonify(await shape_rank(await rank_offset_rows(q, common), q))
+
+
+# ======================
+# 랭킹 개수 조회
+# GET /api/rank/count
+# ======================
+@app.route("/api/rank/count", methods=["GET"])
+@conditional("rank", max_age=RANK_MAX_AGE, version=snapshot_version)
+@with_snapshot_age
+async def api_rank_count():
+    category_id = request.args.get("category_id", type=int)
+    if current_snapshot() is not None:
+        return jsonify({"count": get_rank_count(category_id)})
+
+    key = ("count", category_id)
+    cnt = rank_cache.get(key)
+    if cnt is None:
+        generation = rank_cache.generation
+        if category_id is None:
+            row = await fetch_one(RANK_COUNT_SQL)
+        else:
+            row = await fetch_one(RANK_COUNT_SQL + " WHERE category_id = %s", (category_id,))
+        cnt = row["cnt"]
+        rank_cache.set(key, cnt, generation)
+    return jsonify({"count": cnt})
+
+
+# ======================
+# 카테고리별 상위 매장 (카테고리 탭용)
+# GET /api/rank/categories?k=5
+# ======================
+@app.route("/api/rank/categories", methods=["GET"])
+@conditional("rank", max_age=RANK_MAX_AGE, version=snapshot_version)
+@with_snapshot_age
+async def api_rank_categories():
+    k = request.args.get("k", 5, type=int)
+    # 카테고리 이름은 rank_cache 에 캐시되므로 대부분 DB 를 읽지 않음 (동기 함수, 스레드에서)
+    return jsonify(await asyncio.to_thread(get_category_leaders, max(0, min(k, LEADERBOARD_SIZE))))
+
+
+@app.route("/api/admin/rank/cache", methods=["GET"])
+@admin_required
+async def admin_rank_cache_stats():
+    return jsonify(get_rank_cache_stats())
+
+
+# ======================
+# 매장 상세 정보 조회
+# GET /api/stores/<store_id>/detail
+# ======================
+@app.route("/api/stores/<int:store_id>/detail", methods=["GET"])
+async def get_store_detail(store_id):
+    try:
+        row = await fetch_one(STORE_DETAIL_SQL, (store_id, store_id))
+    except Exception as e:
+        print(f"매장 정보 조회 오류: {e}")
+        return jsonify({"error": "매장 정보를 불러오는 중 오류가 발생했습니다."}), 500
+
+    result = shape_store_detail(row)
+    if not result:
+        return jsonify({"error": "해당 매장을 찾을 수 없습니다."}), 404
+    return jsonify(result), 200
+
+
+# ======================
+# 매장 검색
+# GET /api/stores/search?q=...&scope=name,menu&limit=20&offset=0
+# ======================
+@app.route('/api/stores/search', methods=['GET'])
+async def search_store():
+    q = request.args.get('q')
+    if not q or not q.strip():
+        return jsonify({'error': '검색어가 없습니다.'}), 400
+
+    scopes = [s.strip() for s in request.args.get('scope', 'name').split(',') if s.strip()]
+    if not scopes or any(s not in SEARCH_SCOPES for s in scopes):
+        return jsonify({'error': f'scope 는 {", ".join(SEARCH_SCOPES)} 중에서 선택하세요.'}), 400
+
+    limit = request.args.get('limit', SEARCH_DEFAULT_LIMIT, type=int)
+    offset = request.args.get('offset', 0, type=int)
+    limit = max(1, min(limit, SEARCH_MAX_LIMIT))
+    offset = max(0, offset)
+
+    stores = await fetch_all(*build_search_query(q, scopes, limit, offset))
+
+    if not stores and offset == 0:
+        return jsonify({'error': '매장을 찾을 수 없습니다.'}), 404
+    return jsonify(stores)
+
+
+# ======================
+# 매장 이름 자동완성
+# GET /api/stores/autocomplete?q=...&k=10
+# 메모리 인덱스만 읽음 (다른 프로세스 쓰기 확인은 interval 초에 한 번, 버전 캐시 사용)
+# ======================
+@app.route('/api/stores/autocomplete', methods=['GET'])
+async def autocomplete_store():
+    q = (request.args.get('q') or '').strip()
+    if not q:
+        return jsonify([])
+
+    k = request.args.get('k', AUTOCOMPLETE_DEFAULT_K, type=int)
+    k = max(1, min(k, AUTOCOMPLETE_MAX_K))
+
+    return jsonify(autocomplete.suggest(q, k))
+
+
+# ======================
+# 일반 사용자 로그인
+# POST /api/login
+# ======================
+@app.route("/api/login", methods=["POST"])
+async def user_login():
+    data = await request.get_json() or {}
+    login_id = data.get("login_id")
+    password = data.get("password") or data.get("pw")
+
+    if not login_id or not password:
+        return jsonify({"message": "아이디와 비밀번호를 입력하세요."}), 400
+
+    user = await fetch_one(USER_LOGIN_SQL, (login_id,))
+    body, status = login_result(user, password)
+    return jsonify(body), status
+
+
+# ======================
+# 리뷰 작성
+# POST /api/reviews
+# ======================
+@app.route("/api/reviews", methods=["POST"])
+@login_required
+async def create_review():
+    data = await request.get_json() or {}
+    store_id = data.get("store_id")
+    rating = data.get("rating")
+    content = data.get("content")
+
+    if not store_id or not rating or not content:
+        return jsonify({"error": "store_id, rating, content는 필수입니다."}), 400
+
+    if not isinstance(rating, int) or rating < 1 or rating > 5:
+        return jsonify({"error": "평점은 1~5 사이의 숫자여야 합니다."}), 400
+
+    try:
+        async with acquire() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute("SELECT store_id FROM store WHERE store_id = %s", (store_id,))
+                if not await cur.fetchone():
+                    return jsonify({"error": "해당 매장을 찾을 수 없습니다."}), 404
+
+                await cur.execute("""
+                    INSERT INTO review (user_id, store_id, rating, content)
+                    VALUES (%s, %s, %s, %s)
+                """, (g.user_id, store_id, rating, content))
+                review_id = cur.lastrowid
+
+                # 랭킹 집계 반영
+                await run_steps_async(cur, review_delta_steps(store_id, rating))
+            await conn.commit()
+    except Exception as e:
+        print(f"리뷰 작성 오류: {e}")
+        return jsonify({"error": "리뷰 작성 중 오류가 발생했습니다."}), 500
+
+    invalidate_rank_cache()
+    return jsonify({"message": "리뷰가 작성되었습니다.", "review_id": review_id}), 201
+
+
+@app.route('/api/admin/review/<int:review_id>', methods=['DELETE'])
+async def admin_delete_review(review_id):
+    async with acquire() as conn:
+        async with conn.cursor() as cur:
+            # 같은 리뷰를 동시에 삭제해도 집계에서 한 번만 빼도록 리뷰 행을 잠금
+            await cur.execute("""
+                SELECT review_id, store_id, rating, created_at
+                FROM review
+                WHERE review_id = %s
+                FOR UPDATE
+            """, (review_id,))
+            review = await cur.fetchone()
+            if not review:
+                return jsonify({'message': '해당 리뷰를 찾을 수 없습니다.'}), 404
+
+            if await cur.execute("DELETE FROM review WHERE review_id = %s", (review_id,)) != 1:
+                return jsonify({'message': '해당 리뷰를 찾을 수 없습니다.'}), 404
+            await run_steps_async(cur, review_delta_steps(review["store_id"], review["rating"], sign=-1,
+                                                          created_at=review["created_at"]))
+        await conn.commit()
+
+    invalidate_rank_cache()
+    return jsonify({'message': '리뷰가 삭제되었습니다.'}), 200
+
+
+# ======================
+# 문의 등록 / 목록 / 상세
+# ======================
+@app.route("/api/inquiries", methods=["POST"])
+@login_required
+async def create_inquiry():
+    data = await request.get_json() or {}
+    title = data.get("title")
+    field = data.get("field")
+    content = data.get("content")
+
+    if not title or not content:
+        return jsonify({"error": "title, content는 필수입니다."}), 400
+
+    async with acquire() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute("""
+                INSERT INTO inquiry (user_id, title, writer, field, content)
+                VALUES (%s, %s, %s, %s, %s)
+            """, (g.user_id, title, g.user_name, field, content))
+            inquiry_id = cur.lastrowid
+        await conn.commit()
+
+    return jsonify({"inquiry_id": inquiry_id}), 201
+
+
+async def list_inquiry_page(user_id=None):
+    limit = request.args.get("limit", INQUIRY_PAGE_DEFAULT, type=int)
+    limit = max(1, min(limit, INQUIRY_PAGE_MAX))
+    try:
+        sql, params = build_inquiry_page_query(user_id, limit,
+                                               request.args.get("cursor") or None,
+                                               request.args.get("status"),
+                                               request.args.get("field"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify(shape_inquiry_page(await fetch_all(sql, params), limit))
+
+
+@app.route("/api/inquiries", methods=["GET"])
+@login_required
+async def list_inquiries():
+    user_id_param = request.args.get("user_id", type=int)
+    user_id = user_id_param if user_id_param is not None else g.user_id
+
+    if "cursor" in request.args:
+        return await list_inquiry_page(user_id)
+
+    rows = await fetch_all("""
+        SELECT inquiry_id, user_id, title, writer, field, content, answer, created_at
+        FROM inquiry
+        WHERE user_id = %s
+        ORDER BY inquiry_id DESC
+    """, (user_id,))
+    return jsonify(rows)
+
+
+@app.route('/api/inquiries/<int:inquiry_id>', methods=['GET'])
+@login_required
+async def get_inquiry_detail(inquiry_id):
+    inquiry = await fetch_one("""
+        SELECT inquiry_id, user_id, title, writer, created_at, content, answer, field
+        FROM inquiry
+        WHERE inquiry_id = %s
+    """, (inquiry_id,))
+
+    if not inquiry:
+        return jsonify({"error": "문의가 존재하지 않습니다."}), 404
+    if inquiry['user_id'] != g.user_id:
+        return jsonify({"error": "해당 문의에 접근할 권한이 없습니다."}), 403
+    return jsonify(inquiry)
+
+
+@app.route('/api/inquiries/<int:inquiry_id>/answer', methods=['PUT'])
+@admin_required
+async def update_inquiry_answer(inquiry_id):
+    data = await request.get_json() or {}
+    answer = data.get('answer')
+
+    if not answer or answer.strip() == "":
+        return jsonify({"error": "answer 값이 비어 있습니다."}), 400
+
+    async with acquire() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute("UPDATE inquiry SET answer = %s WHERE inquiry_id = %s",
+                              (answer, inquiry_id))
+        await conn.commit()
+
+    return jsonify({"result": "ok", "inquiry_id": inquiry_id, "answer": answer})
+
+
+@app.route('/api/inquiries_all', methods=['GET'])
+async def get_all_inquiries():
+    if "cursor" in request.args:
+        return await list_inquiry_page()
+
+    rows = await fetch_all("""
+        SELECT
+            inquiry_id,
+            user_id,
+            title,
+            writer,
+            DATE_FORMAT(created_at, '%%Y-%%m-%%d %%H:%%i') AS created_at,
+            content,
+            answer,
+            field
+        FROM inquiry
+        ORDER BY inquiry_id DESC
+    """)
+    return jsonify(rows), 200
+
+
+if __name__ == "__main__":
+    app.run(port=5001)
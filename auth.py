@@ -0,0 +1,143 @@
+"""
+auth.py
+----------------------------------------
+JWT 인증 공통 처리
+- login_required / admin_required 데코레이터
+- verify_token() : 한 번 검증한 토큰은 만료(exp) 전까지 캐시에서 바로 꺼내 씀
+- get_auth_stats() : 캐시 적중/미적중 수, 서명 검증 소요 시간
+"""
+
+import hashlib
+import threading
+import time
+from functools import wraps
+
+import jwt
+from flask import current_app, g, jsonify, request
+
+from cache import TTLCache
+
+# 검증 완료된 토큰 캐시 (key: 토큰의 sha256 digest, value: payload)
+token_cache = TTLCache(maxsize=10000, ttl=300)
+
+_verify_lock = threading.Lock()
+_verify_stats = {"count": 0, "total_ms": 0.0}
+
+
+class AuthError(Exception):
+    def __init__(self, message, status=401):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+def verify_token(token, secret):
+    """
+    토큰을 검증하고 payload 를 반환합니다. 실패하면 AuthError 를 발생시킵니다.
+    반환된 payload 는 캐시와 공유되므로 수정하지 마세요.
+    """
+    key = hashlib.sha256(f"{secret}\0{token}".encode("utf-8")).digest()
+
+    payload = token_cache.get(key)
+    if payload is not None:
+        return payload
+
+    start = time.perf_counter()
+    try:
+        payload = jwt.decode(token, secret, algorithms=["HS256"])
+    except jwt.ExpiredSignatureError:
+        raise AuthError("토큰이 만료되었습니다.")
+    except jwt.InvalidTokenError:
+        raise AuthError("유효하지 않은 토큰입니다.")
+    finally:
+        elapsed = (time.perf_counter() - start) * 1000
+        with _verify_lock:
+            _verify_stats["count"] += 1
+            _verify_stats["total_ms"] += elapsed
+
+    # exp 가 지나면 캐시에서도 사라지도록 남은 시간만큼만 보관
+    exp = payload.get("exp")
+    if exp is not None:
+        remaining = exp - time.time()
+        if remaining > 0:
+            token_cache.set(key, payload, ttl=remaining)
+    else:
+        token_cache.set(key, payload)
+    return payload
+
+
+def bearer_payload(auth_header, secret):
+    """Authorization 헤더("Bearer <token>")를 검증합니다."""
+    if not auth_header or not auth_header.startswith("Bearer "):
+        raise AuthError("인증 토큰이 필요합니다.")
+    return verify_token(auth_header.split(" ")[1], secret)
+
+
+def _bearer_payload():
+    return bearer_payload(request.headers.get("Authorization", None),
+                          current_app.config["SECRET_KEY"])
+
+
+def get_auth_stats():
+    stats = token_cache.get_stats()
+    with _verify_lock:
+        stats["verify_count"] = _verify_stats["count"]
+        stats["verify_total_ms"] = round(_verify_stats["total_ms"], 3)
+        stats["verify_avg_ms"] = (
+            round(_verify_stats["total_ms"] / _verify_stats["count"], 4)
+            if _verify_stats["count"] else 0
+        )
+    return stats
+
+
+# ======================
+# JWT 데코레이터들
+# ======================
+def login_required(f):
+    @wraps(f)
+    def decorated(*args, **kwargs):
+
+        if request.method == "OPTIONS":
+            return "", 200
+
+        try:
+            payload = _bearer_payload()
+        except AuthError as e:
+            return jsonify({"message": e.message}), e.status
+
+        user_id = payload.get("user_id")
+        name = payload.get("name")
+        role = payload.get("role")
+
+        if user_id is None or name is None:
+            return jsonify({"message": "유효하지 않은 사용자 토큰입니다."}), 401
+
+        g.user_id = user_id
+        g.user_name = name
+        g.role = role
+
+        return f(*args, **kwargs)
+
+    return decorated
+
+
+def admin_required(f):
+    @wraps(f)
+    def decorated(*args, **kwargs):
+
+        if request.method == "OPTIONS":
+            return "", 200
+
+        try:
+            payload = _bearer_payload()
+        except AuthError as e:
+            return jsonify({'message': e.message}), e.status
+
+        if payload.get('role') != 'admin':
+            return jsonify({'message': '관리자 권한이 필요합니다.'}), 403
+
+        g.admin_id = payload.get('admin_id')
+        g.admin_name = payload.get('admin_name')
+
+        return f(*args, **kwargs)
+    return decorated
@@ -0,0 +1,184 @@
+"""
+autocomplete.py
+----------------------------------------
+매장 이름 자동완성용 메모리 인덱스
+- 정렬된 배열 + bisect 로 접두사(prefix)를 찾습니다.
+- 한글 초성 검색 지원: "ㄱㅅ" → "금성이네"
+- 이름의 각 단어 시작 위치도 색인: "시화" → "스타벅스 시화로데오점"
+
+인덱스는 처음 사용할 때 store 테이블에서 읽어오고,
+매장 수정/삭제 시 upsert_store() / remove_store() 로 갱신합니다.
+다른 워커 프로세스(serve.py)에서 수정/삭제한 매장은 'stores' 리소스 버전을
+INDEX_VERSION_POLL 초마다 확인해 바뀌었으면 백그라운드에서 다시 읽어 반영합니다.
+"""
+
+import threading
+from bisect import bisect_left, insort
+
+from db import get_connection
+import versions
+
+CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+
+# 접두사가 너무 짧아 후보가 많을 때 정렬 대상으로 볼 최대 항목 수
+SCAN_LIMIT = 200
+
+# 다른 워커 프로세스의 매장 수정이 이 시간(초) + 다시 읽는 시간 안에 반영됨
+INDEX_VERSION_POLL = 5.0
+
+
+def normalize(text):
+    """소문자 + 공백 제거"""
+    return "".join(text.lower().split())
+
+
+def to_choseong(text):
+    """한글 음절은 초성으로 바꾸고 나머지 문자는 그대로 둡니다."""
+    out = []
+    for ch in normalize(text):
+        code = ord(ch)
+        if 0xAC00 <= code <= 0xD7A3:
+            out.append(CHOSEONG[(code - 0xAC00) // 588])
+        else:
+            out.append(ch)
+    return "".join(out)
+
+
+def has_jamo(text):
+    """호환용 자모(ㄱ~ㅣ)가 섞여 있으면 초성 검색으로 처리합니다."""
+    return any(0x3131 <= ord(ch) <= 0x318E for ch in text)
+
+
+class PrefixIndex:
+    def __init__(self):
+        # (일반 키 배열, 초성 키 배열, store_id -> name, store_id -> bayes_score)
+        # 배열 항목은 (key, 단어 위치, store_id), 점수는 동일 접두사 내 정렬용.
+        # 갱신 시 네 개를 모두 새로 만들어 튜플 하나로 통째로 교체하므로
+        # 조회는 튜플을 한 번만 읽고 락 없이 수행 (서로 다른 시점의 배열/이름이 섞이지 않음)
+        self._state = ([], [], {}, {})
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._loaded = False
+        self._watch = versions.VersionWatch("stores", INDEX_VERSION_POLL)
+
+    @staticmethod
+    def _entries(store_id, name):
+        words = name.split()
+        plain, cho = [], []
+        for pos in range(len(words)):
+            tail = " ".join(words[pos:])
+            plain.append((normalize(tail), pos, store_id))
+            cho.append((to_choseong(tail), pos, store_id))
+        return plain, cho
+
+    def load(self):
+        self._watch.mark()
+        conn = get_connection()
+        try:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    SELECT s.store_id, s.name, COALESCE(rs.bayes_score, 0) AS score
+                    FROM store s
+                    LEFT JOIN store_rank_stats rs ON rs.store_id = s.store_id
+                """)
+                rows = cur.fetchall()
+        finally:
+            conn.close()
+
+        plain, cho, names, scores = [], [], {}, {}
+        for row in rows:
+            p, c = self._entries(row["store_id"], row["name"])
+            plain.extend(p)
+            cho.extend(c)
+            names[row["store_id"]] = row["name"]
+            scores[row["store_id"]] = float(row["score"])
+        plain.sort()
+        cho.sort()
+
+        with self._lock:
+            self._state = (plain, cho, names, scores)
+            self._loaded = True
+
+    def ensure_loaded(self):
+        if self._loaded:
+            try:
+                self._watch.poll(self.load)
+            except Exception as e:
+                print(f"자동완성 인덱스 버전 확인 오류: {e}")
+            return
+        # 동시에 들어온 첫 요청들이 각자 load() 하지 않도록 하나만 읽고 나머지는 기다림
+        with self._load_lock:
+            if not self._loaded:
+                self.load()
+
+    def upsert_store(self, store_id, name):
+        if not self._loaded:
+            return
+        with self._lock:
+            plain, cho, names, scores = self._without(store_id)
+            p, c = self._entries(store_id, name)
+            for entry in p:
+                insort(plain, entry)
+            for entry in c:
+                insort(cho, entry)
+            names[store_id] = name
+            scores[store_id] = self._state[3].get(store_id, 0.0)
+            self._state = (plain, cho, names, scores)
+
+    def remove_store(self, store_id):
+        if not self._loaded:
+            return
+        with self._lock:
+            self._state = self._without(store_id)
+
+    def _without(self, store_id):
+        """store_id 를 뺀 새 (배열, 배열, 이름, 점수). 기존 것은 조회 중일 수 있으므로 복사"""
+        plain, cho, names, scores = self._state
+        names, scores = dict(names), dict(scores)
+        names.pop(store_id, None)
+        scores.pop(store_id, None)
+        return ([e for e in plain if e[2] != store_id],
+                [e for e in cho if e[2] != store_id],
+                names, scores)
+
+    def suggest(self, q, k=10):
+        self.ensure_loaded()
+
+        plain, cho, names, scores = self._state
+        if has_jamo(q):
+            key, array = to_choseong(q), cho
+        else:
+            key, array = normalize(q), plain
+        if not key:
+            return []
+
+        best = {}   # store_id -> 가장 앞쪽 단어 위치
+        i = bisect_left(array, (key,))
+        while i < len(array) and len(best) < SCAN_LIMIT:
+            entry_key, pos, store_id = array[i]
+            if not entry_key.startswith(key):
+                break
+            if store_id not in best or pos < best[store_id]:
+                best[store_id] = pos
+            i += 1
+
+        ranked = sorted(
+            (sid for sid in best if sid in names),
+            key=lambda sid: (best[sid], -scores.get(sid, 0.0), names[sid]),
+        )
+        return [{"store_id": sid, "name": names[sid]} for sid in ranked[:k]]
+
+
+index = PrefixIndex()
+
+
+def suggest(q, k=10):
+    return index.suggest(q, k)
+
+
+def upsert_store(store_id, name):
+    index.upsert_store(store_id, name)
+
+
+def remove_store(store_id):
+    index.remove_store(store_id)
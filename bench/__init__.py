@@ -0,0 +1,18 @@
+"""
+bench
+----------------------------------------
+HTTP API 부하 테스트 / 벤치마크 도구 (표준 라이브러리 + 앱의 db 모듈만 사용)
+
+- seed.py      : 로컬 MySQL 에 가상 데이터(매장/메뉴/사용자/리뷰/문의) 생성·삭제
+- client.py    : asyncio 기반 동시 HTTP 클라이언트와 지연 시간 통계
+- scenarios.py : 실제 API 를 호출하는 시나리오(랭킹, 상세, 검색, 리뷰 작성, 로그인)
+- json_encode.py : JSON 응답 직렬화 마이크로 벤치마크 (DB / 서버 필요 없음)
+
+사용법 (저장소 루트에서):
+    python -m bench seed --stores 10000 --users 1000 --reviews 1000000 --inquiries 10000
+    python -m bench run --url http://127.0.0.1:5000 --scenario mixed \\
+        --concurrency 100 --duration 30 --out result.json
+    python -m bench run ... --baseline result.json        # 이전 결과와 비교
+    python -m bench clean                                 # 가상 데이터 삭제
+    python -m bench.json_encode --rows 10000 --repeat 20  # JSON 직렬화만 측정
+"""
@@ -0,0 +1,133 @@
+"""
+python -m bench {seed,clean,run}
+
+run 결과는 JSON 으로 출력(--out 으로 파일 저장)되며,
+--baseline 으로 이전 결과를 주면 비교 결과를 함께 담고
+느려진 엔드포인트가 있으면 종료 코드 1 을 반환합니다 (CI 에서 회귀 감지용).
+"""
+
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+from datetime import datetime
+from urllib.parse import urlsplit
+
+from bench.scenarios import SCENARIOS
+
+if sys.platform.startswith("win"):
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8")
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def cmd_seed(args):
+    from bench.seed import seed
+    seed(stores=args.stores, menus_per_store=args.menus_per_store, users=args.users,
+         reviews=args.reviews, inquiries=args.inquiries, chunk=args.chunk, rng_seed=args.rng_seed)
+
+
+def cmd_clean(args):
+    from bench.seed import clean
+    clean()
+
+
+def cmd_run(args):
+    from bench.client import compare, run_load
+    from bench.scenarios import fixed_path, setup
+
+    parts = urlsplit(args.url)
+    host, port = parts.hostname, parts.port or 80
+
+    async def main():
+        if args.path:
+            ctx = {"headers": {"Accept-Encoding": "gzip"} if args.compress else {}}
+            scenario = [(1, fixed_path(args.path))]
+        else:
+            scenario = SCENARIOS[args.scenario]
+            ctx = await setup(host, port, scenario, compress=args.compress)
+        return await run_load(host, port, scenario, ctx, args.concurrency,
+                              args.duration, warmup=args.warmup)
+
+    try:
+        total, endpoints = asyncio.run(main())
+    except RuntimeError as e:
+        # setup() 이 서버 준비 상태 문제를 알려 줌 (가상 데이터 없음, 로그인 불가 등)
+        print(f"벤치마크를 실행하지 않았습니다: {e}", file=sys.stderr)
+        return 2
+    result = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "url": args.url,
+            "scenario": args.path or args.scenario,
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "warmup_s": args.warmup,
+            "compress": args.compress,
+        },
+        "total": total,
+        "endpoints": endpoints,
+    }
+
+    regressed = False
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            result["compare"] = compare(result, json.load(f), args.threshold)
+        regressed = bool(result["compare"]["regressions"])
+
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    return 1 if regressed else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m bench", description="HTTP API 벤치마크")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("seed", help="가상 데이터 생성")
+    p.add_argument("--stores", type=int, default=10000)
+    p.add_argument("--menus-per-store", type=int, default=5)
+    p.add_argument("--users", type=int, default=1000)
+    p.add_argument("--reviews", type=int, default=1000000)
+    p.add_argument("--inquiries", type=int, default=10000)
+    p.add_argument("--chunk", type=int, default=10000, help="executemany 한 번에 넣을 행 수")
+    p.add_argument("--rng-seed", type=int, default=42)
+    p.set_defaults(func=cmd_seed)
+
+    p = sub.add_parser("clean", help="가상 데이터 삭제")
+    p.set_defaults(func=cmd_clean)
+
+    p = sub.add_parser("run", help="부하 테스트 실행")
+    p.add_argument("--url", default="http://127.0.0.1:5000")
+    p.add_argument("--scenario", default="mixed",
+                   choices=sorted(SCENARIOS))
+    p.add_argument("--path", help="시나리오 대신 이 경로(GET) 하나만 반복")
+    p.add_argument("--concurrency", type=int, default=100)
+    p.add_argument("--duration", type=float, default=30.0)
+    p.add_argument("--warmup", type=float, default=3.0)
+    p.add_argument("--no-compress", dest="compress", action="store_false",
+                   help="Accept-Encoding: gzip 을 보내지 않음")
+    p.add_argument("--out", help="결과 JSON 저장 경로")
+    p.add_argument("--baseline", help="비교할 이전 결과 JSON")
+    p.add_argument("--threshold", type=float, default=0.2,
+                   help="p99 증가 / rps 감소가 이 비율 이상이면 회귀로 판단")
+    p.set_defaults(func=cmd_run)
+
+    args = parser.parse_args()
+    sys.exit(args.func(args) or 0)
+
+
+if __name__ == "__main__":
+    main()
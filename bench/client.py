@@ -0,0 +1,180 @@
+"""
+bench/client.py
+----------------------------------------
+asyncio 기반 동시 HTTP 클라이언트와 통계
+
+- http_request() : HTTP/1.1 요청 한 번 (Connection: close, 의존성 없음)
+- run_load()     : concurrency 개의 워커가 duration 초 동안 시나리오의 요청을 반복
+- 결과는 엔드포인트별 처리량(rps)과 지연 시간 백분위수(p50/p90/p99/max, ms)
+- compare()      : 이전 결과(JSON)와 비교해 느려진 엔드포인트를 찾음
+"""
+
+import asyncio
+import gzip
+import json
+import random
+import time
+from collections import defaultdict
+
+REQUEST_TIMEOUT = 30.0
+
+
+async def http_request(host, port, method, path, headers=None, body=None):
+    """(status, headers, body) 를 반환. gzip 응답은 풀어서 돌려줍니다."""
+    if body is not None and not isinstance(body, bytes):
+        body = json.dumps(body).encode("utf-8")
+        headers = {"Content-Type": "application/json", **(headers or {})}
+
+    lines = [f"{method} {path} HTTP/1.1", f"Host: {host}:{port}", "Connection: close"]
+    lines += [f"{k}: {v}" for k, v in (headers or {}).items()]
+    if body is not None:
+        lines.append(f"Content-Length: {len(body)}")
+    payload = ("\r\n".join(lines) + "\r\n\r\n").encode("utf-8") + (body or b"")
+
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.write(payload)
+        await writer.drain()
+        status_line = await reader.readline()
+        resp_headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            key, _, value = line.decode("latin-1").partition(":")
+            resp_headers[key.strip().lower()] = value.strip()
+        length = resp_headers.get("content-length")
+        data = await (reader.readexactly(int(length)) if length else reader.read())
+    finally:
+        writer.close()
+
+    if resp_headers.get("content-encoding") == "gzip":
+        data = gzip.decompress(data)
+    return int(status_line.split()[1]), resp_headers, data
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return None
+    idx = min(len(sorted_values) - 1, int(len(sorted_values) * p / 100))
+    return round(sorted_values[idx], 3)
+
+
+def summarize(latencies, errors, elapsed, nbytes=0):
+    latencies = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "mean_ms": round(sum(latencies) / len(latencies), 3) if latencies else None,
+        "p50_ms": percentile(latencies, 50),
+        "p90_ms": percentile(latencies, 90),
+        "p99_ms": percentile(latencies, 99),
+        "max_ms": round(latencies[-1], 3) if latencies else None,
+        "bytes": nbytes,
+        "errors": dict(errors),
+    }
+
+
+class Recorder:
+    """엔드포인트(이름)별 지연 시간 / 오류 / 전송량 기록"""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(lambda: defaultdict(int))
+        self.bytes = defaultdict(int)
+
+    def ok(self, name, ms, nbytes):
+        self.latencies[name].append(ms)
+        self.bytes[name] += nbytes
+
+    def error(self, name, kind):
+        self.errors[name][kind] += 1
+
+    def report(self, elapsed):
+        names = sorted(set(self.latencies) | set(self.errors))
+        endpoints = {name: summarize(self.latencies[name], self.errors[name], elapsed,
+                                     self.bytes[name])
+                     for name in names}
+        all_latencies = [ms for name in names for ms in self.latencies[name]]
+        all_errors = defaultdict(int)
+        for name in names:
+            for kind, cnt in self.errors[name].items():
+                all_errors[kind] += cnt
+        total = summarize(all_latencies, all_errors, elapsed, sum(self.bytes.values()))
+        return total, endpoints
+
+
+async def run_load(host, port, scenario, ctx, concurrency, duration, warmup=0.0):
+    """
+    scenario : [(weight, build), ...]  build(ctx, rng) → (name, method, path, headers, body)
+    warmup   : 처음 warmup 초 동안의 요청은 기록하지 않음 (캐시/커넥션 풀 준비)
+    """
+    recorder = Recorder()
+    weights = [w for w, _ in scenario]
+    builders = [b for _, b in scenario]
+
+    start = time.perf_counter()
+    measure_from = start + warmup
+    deadline = measure_from + duration
+
+    async def worker(seed):
+        rng = random.Random(seed)
+        while True:
+            now = time.perf_counter()
+            if now >= deadline:
+                return
+            name, method, path, headers, body = rng.choices(builders, weights)[0](ctx, rng)
+            t0 = time.perf_counter()
+            try:
+                status, _, data = await asyncio.wait_for(
+                    http_request(host, port, method, path, headers, body), REQUEST_TIMEOUT)
+            except asyncio.TimeoutError:
+                if t0 >= measure_from:
+                    recorder.error(name, "timeout")
+                continue
+            except (OSError, IndexError, ValueError, asyncio.IncompleteReadError):
+                if t0 >= measure_from:
+                    recorder.error(name, "connect")
+                continue
+            if t0 < measure_from:
+                continue
+            if status >= 400:
+                recorder.error(name, str(status))
+                continue
+            recorder.ok(name, (time.perf_counter() - t0) * 1000, len(data))
+
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - measure_from
+    total, endpoints = recorder.report(elapsed)
+    total["duration_s"] = round(elapsed, 3)
+    return total, endpoints
+
+
+def _change(new, old):
+    if new is None or not old:
+        return None
+    return round((new - old) / old, 4)
+
+
+def compare(result, baseline, threshold=0.2):
+    """
+    baseline 대비 변화율(+0.1 = 10% 증가)과, p99 가 threshold 이상 늘었거나
+    rps 가 threshold 이상 줄어든 엔드포인트 목록(regressions)을 반환합니다.
+    """
+    changes, regressions = {}, []
+    old_endpoints = baseline.get("endpoints", {})
+    for name, new in result["endpoints"].items():
+        old = old_endpoints.get(name)
+        if not old:
+            continue
+        change = {
+            "rps": _change(new["rps"], old["rps"]),
+            "p50_ms": _change(new["p50_ms"], old["p50_ms"]),
+            "p99_ms": _change(new["p99_ms"], old["p99_ms"]),
+        }
+        changes[name] = change
+        if ((change["p99_ms"] is not None and change["p99_ms"] >= threshold)
+                or (change["rps"] is not None and change["rps"] <= -threshold)):
+            regressions.append(name)
+    return {"baseline": baseline.get("meta", {}), "threshold": threshold,
+            "changes": changes, "regressions": regressions}
@@ -0,0 +1,107 @@
+"""
+bench/json_encode.py
+----------------------------------------
+JSON 응답 직렬화 마이크로 벤치마크 (DB 필요 없음)
+
+랭킹 응답과 같은 형태의 10,000행 payload 로
+- 기존 방식 : convert_decimal() 로 행 복사 + Flask 기본 JSON provider
+- 변경 방식 : FastJSONProvider (표준 json / orjson)
+을 비교합니다.
+
+사용법:
+    python -m bench.json_encode --rows 10000 --repeat 20
+"""
+
+import argparse
+import decimal
+import json
+import random
+import time
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+import json_provider
+from json_provider import FastJSONProvider
+
+
+def make_rows(n):
+    return [
+        {
+            "store_id": i,
+            "name": f"매장{i}",
+            "distance_km": decimal.Decimal(f"{random.uniform(0.1, 5.0):.2f}"),
+            "review_cnt": random.randint(0, 500),
+            "avg_rating": decimal.Decimal(f"{random.uniform(1, 5):.6f}"),
+            "score": decimal.Decimal(f"{random.uniform(1, 5):.6f}"),
+        }
+        for i in range(n)
+    ]
+
+
+def convert_decimal(rows):
+    """기존 app.convert_decimal 과 동일"""
+    converted = []
+    for row in rows:
+        new_row = {}
+        for k, v in row.items():
+            if isinstance(v, decimal.Decimal):
+                new_row[k] = float(v)
+            else:
+                new_row[k] = v
+        converted.append(new_row)
+    return converted
+
+
+def timeit(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {"median_ms": round(timings[len(timings) // 2], 3),
+            "min_ms": round(timings[0], 3)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON 직렬화 벤치마크")
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+
+    legacy_app = Flask("legacy")
+    legacy_app.json = DefaultJSONProvider(legacy_app)
+    fast_app = Flask("fast")
+    fast_app.json = FastJSONProvider(fast_app)
+
+    def legacy():
+        with legacy_app.app_context():
+            legacy_app.json.response(convert_decimal(rows)).get_data()
+
+    def fast():
+        with fast_app.app_context():
+            fast_app.json.response(rows).get_data()
+
+    result = {
+        "rows": args.rows,
+        "legacy": timeit(legacy, args.repeat),
+        "fast": timeit(fast, args.repeat),
+    }
+
+    if json_provider.orjson is not None:
+        # orjson 이 없는 환경의 성능도 함께 측정
+        saved, json_provider.orjson = json_provider.orjson, None
+        try:
+            result["fast_stdlib"] = timeit(fast, args.repeat)
+        finally:
+            json_provider.orjson = saved
+    result["orjson"] = json_provider.orjson is not None
+
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+bench/scenarios.py
+----------------------------------------
+부하 테스트 시나리오
+
+각 요청 생성 함수는 build(ctx, rng) → (이름, method, path, headers, body) 를 반환하고,
+시나리오는 [(가중치, build), ...] 입니다. 이름별로 통계가 따로 집계됩니다.
+
+ctx 는 setup() 이 서버에서 미리 받아 둔 값입니다.
+- store_ids   : /api/rank 로 받은 매장 id
+- category_ids: /api/rank/categories 로 받은 카테고리 id
+- tokens      : 가상 사용자(bench.seed) 로그인 토큰 (리뷰 작성용)
+
+동기(app.py)와 비동기(asgi_app.py) 서버 모두 같은 엔드포인트를 제공하므로 어느 쪽에도 실행할 수 있습니다.
+로그인이 필요한 시나리오(review_create, login)는 setup() 에서 토큰을 하나도 받지 못하면
+부하를 걸기 전에 이유(응답 상태)를 담아 중단합니다.
+"""
+
+import json
+from urllib.parse import quote
+
+from bench.client import http_request
+from bench.seed import BENCH_LOGIN_PREFIX, BENCH_PASSWORD, FOODS, LAT_RANGE, LNG_RANGE
+
+SETUP_RANK_PAGES = 10     # 매장 id 를 모을 랭킹 페이지 수 (페이지당 100개)
+SETUP_LOGIN_USERS = 20    # 리뷰 작성에 쓸 토큰 수
+
+
+async def setup(host, port, scenario, compress=True):
+    ctx = {"store_ids": [], "category_ids": [], "tokens": [],
+           "headers": {"Accept-Encoding": "gzip"} if compress else {}}
+
+    for page in range(SETUP_RANK_PAGES):
+        status, _, data = await http_request(host, port, "GET",
+                                             f"/api/rank?limit=100&offset={page * 100}")
+        rows = json.loads(data) if status == 200 else []
+        if not rows:
+            break
+        ctx["store_ids"].extend(r["store_id"] for r in rows)
+
+    # 실패하면 rank_category 가 일반 랭킹 페이지로 대신함
+    status, _, data = await http_request(host, port, "GET", "/api/rank/categories?k=0")
+    if status == 200:
+        ctx["category_ids"] = [c["category_id"] for c in json.loads(data)]
+
+    login_status = None
+    for i in range(SETUP_LOGIN_USERS):
+        login_status, _, data = await http_request(host, port, "POST", "/api/login", body={
+            "login_id": f"{BENCH_LOGIN_PREFIX}{i:06d}", "password": BENCH_PASSWORD})
+        if login_status == 200:
+            ctx["tokens"].append(json.loads(data)["token"])
+
+    if not ctx["store_ids"]:
+        raise RuntimeError("랭킹에서 매장을 찾지 못했습니다. python -m bench seed 를 먼저 실행하세요.")
+    if not ctx["tokens"] and any(build in LOGIN_BUILDERS for _, build in scenario):
+        if login_status == 404:
+            reason = "서버에 POST /api/login 이 없습니다"
+        else:
+            reason = f"POST /api/login 응답 {login_status}, python -m bench seed 로 가상 사용자를 먼저 만드세요"
+        raise RuntimeError(f"리뷰 작성 / 로그인 시나리오에 쓸 토큰을 받지 못했습니다 ({reason}). "
+                           f"--scenario read 등 조회 시나리오를 사용하세요.")
+    return ctx
+
+
+# ======================
+# 요청 생성
+# ======================
+def rank_page(ctx, rng):
+    return ("rank", "GET", f"/api/rank?limit=20&offset={rng.randrange(10) * 20}",
+            ctx["headers"], None)
+
+
+def rank_category(ctx, rng):
+    if not ctx["category_ids"]:
+        return rank_page(ctx, rng)
+    return ("rank_category", "GET",
+            f"/api/rank?limit=20&category_id={rng.choice(ctx['category_ids'])}",
+            ctx["headers"], None)
+
+
+def rank_near(ctx, rng):
+    lat, lng = rng.uniform(*LAT_RANGE), rng.uniform(*LNG_RANGE)
+    return ("rank_near", "GET", f"/api/rank?limit=20&lat={lat:.5f}&lng={lng:.5f}&radius_km=3",
+            ctx["headers"], None)
+
+
+def store_detail(ctx, rng):
+    return ("store_detail", "GET", f"/api/stores/{rng.choice(ctx['store_ids'])}/detail",
+            ctx["headers"], None)
+
+
+def search(ctx, rng):
+    return ("search", "GET", f"/api/stores/search?q={quote(rng.choice(FOODS))}",
+            ctx["headers"], None)
+
+
+def autocomplete(ctx, rng):
+    return ("autocomplete", "GET", f"/api/stores/autocomplete?q={quote('벤치 ' + rng.choice(FOODS)[0])}",
+            ctx["headers"], None)
+
+
+def review_create(ctx, rng):
+    headers = {**ctx["headers"], "Authorization": f"Bearer {rng.choice(ctx['tokens'])}"}
+    body = {"store_id": rng.choice(ctx["store_ids"]), "rating": rng.randint(1, 5),
+            "content": "부하 테스트 리뷰입니다."}
+    return ("review_create", "POST", "/api/reviews", headers, body)
+
+
+def login(ctx, rng):
+    body = {"login_id": f"{BENCH_LOGIN_PREFIX}{rng.randrange(SETUP_LOGIN_USERS):06d}",
+            "password": BENCH_PASSWORD}
+    return ("login", "POST", "/api/login", ctx["headers"], body)
+
+
+# setup() 에서 로그인 토큰이 필요한 요청
+LOGIN_BUILDERS = (review_create, login)
+
+
+def fixed_path(path):
+    """--path 로 지정한 경로 하나만 반복 (이전 bench_load.py 와 같은 방식)"""
+    def build(ctx, rng):
+        return (path, "GET", path, ctx["headers"], None)
+    return build
+
+
+SCENARIOS = {
+    # 실제 트래픽과 비슷한 비율: 조회 위주 + 약간의 쓰기
+    "mixed": [(30, rank_page), (10, rank_category), (5, rank_near), (30, store_detail),
+              (10, search), (5, autocomplete), (5, review_create), (5, login)],
+    "read": [(40, rank_page), (10, rank_category), (5, rank_near), (30, store_detail),
+             (10, search), (5, autocomplete)],
+    "rank": [(70, rank_page), (20, rank_category), (10, rank_near)],
+    "detail": [(1, store_detail)],
+    "search": [(2, search), (1, autocomplete)],
+    "write": [(1, review_create)],
+    "login": [(1, login)],
+}
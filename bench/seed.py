@@ -0,0 +1,167 @@
+"""
+bench/seed.py
+----------------------------------------
+벤치마크용 가상 데이터 생성 / 삭제
+
+- 매장   : 주소가 BENCH_ADDRESS 인 행 (이름은 "벤치 치킨 123" 형태라 검색/자동완성에 걸림)
+- 사용자 : login_id 가 BENCH_LOGIN_PREFIX 로 시작, 비밀번호 BENCH_PASSWORD
+- 리뷰   : 매장마다 평균 평점과 인기도(리뷰 수)를 다르게 주어 랭킹이 의미 있게 나오도록 분포
+- 문의   : 가상 사용자가 작성, 절반은 답변 완료
+
+삭제는 매장/사용자만 지우면 메뉴/리뷰/문의는 FK(ON DELETE CASCADE)로 함께 지워집니다.
+생성/삭제 후 랭킹 집계는 ranking.rebuild_rank_stats() 로 다시 만듭니다.
+"""
+
+import random
+import time
+from datetime import datetime, timedelta
+
+from db import get_connection
+from ranking import rebuild_rank_stats
+
+BENCH_ADDRESS = "벤치마크시 가상동"
+BENCH_LOGIN_PREFIX = "bench_"
+BENCH_PASSWORD = "bench1234"
+
+FOODS = ["치킨", "피자", "국밥", "짜장면", "초밥", "떡볶이", "햄버거", "돈까스", "냉면", "카레"]
+INQUIRY_FIELDS = ["매장 정보", "리뷰", "계정", "기타"]
+
+# 매장 좌표 범위 (정왕동 주변 약 20km x 20km)
+LAT_RANGE = (37.25, 37.43)
+LNG_RANGE = (126.62, 126.84)
+
+
+def _insert_chunks(conn, cur, sql, rows_iter, total, chunk):
+    """rows_iter 에서 chunk 행씩 꺼내 executemany + commit"""
+    done = 0
+    while done < total:
+        n = min(chunk, total - done)
+        cur.executemany(sql, [next(rows_iter) for _ in range(n)])
+        conn.commit()
+        done += n
+
+
+def seed(stores=10000, menus_per_store=5, users=1000, reviews=1000000,
+         inquiries=10000, chunk=10000, rng_seed=42, log=print):
+    rng = random.Random(rng_seed)
+    started = time.perf_counter()
+
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            # 부모 행은 방금 만든 것만 참조하므로 대량 입력 동안 검사를 끔
+            cur.execute("SET SESSION foreign_key_checks = 0, unique_checks = 0")
+
+            cur.execute("SELECT category_id FROM category")
+            category_ids = [r["category_id"] for r in cur.fetchall()] or [None]
+
+            # ---------- 사용자 ----------
+            cur.execute("SELECT COUNT(*) AS cnt FROM user WHERE login_id LIKE %s",
+                        (BENCH_LOGIN_PREFIX + "%",))
+            offset = cur.fetchone()["cnt"]
+            user_rows = ((f"{BENCH_LOGIN_PREFIX}{offset + i:06d}", BENCH_PASSWORD, f"벤치{offset + i}")
+                         for i in range(users))
+            _insert_chunks(conn, cur, "INSERT INTO user (login_id, pw, name) VALUES (%s, %s, %s)",
+                           user_rows, users, chunk)
+            cur.execute("SELECT user_id, name FROM user WHERE login_id LIKE %s",
+                        (BENCH_LOGIN_PREFIX + "%",))
+            bench_users = cur.fetchall()
+            log(f"사용자 {users}명 생성")
+
+            # ---------- 매장 ----------
+            def store_rows():
+                for i in range(stores):
+                    yield (f"벤치 {rng.choice(FOODS)} {i}", BENCH_ADDRESS, "09:00", "22:00",
+                           "000-0000-0000", round(rng.uniform(0.1, 5.0), 2), rng.choice(category_ids),
+                           round(rng.uniform(*LAT_RANGE), 6), round(rng.uniform(*LNG_RANGE), 6))
+            _insert_chunks(conn, cur, """
+                INSERT INTO store (name, address, open_time, close_time, phone,
+                                   distance_km, category_id, lat, lng)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+            """, store_rows(), stores, chunk)
+            cur.execute("SELECT store_id FROM store WHERE address = %s ORDER BY store_id",
+                        (BENCH_ADDRESS,))
+            store_ids = [r["store_id"] for r in cur.fetchall()]
+            log(f"매장 {stores}개 생성")
+
+            # ---------- 메뉴 ----------
+            def menu_rows():
+                for sid in store_ids[-stores:]:
+                    for j in range(menus_per_store):
+                        yield (sid, f"{rng.choice(FOODS)} 메뉴{j}", rng.randint(10, 300) * 100,
+                               int(j == 0))
+            _insert_chunks(conn, cur, """
+                INSERT INTO menu (store_id, name, price, recommend)
+                VALUES (%s, %s, %s, %s)
+            """, menu_rows(), stores * menus_per_store, chunk)
+            log(f"메뉴 {stores * menus_per_store}개 생성")
+
+            # ---------- 리뷰 ----------
+            # 매장별 평균 평점과, 소수 매장에 리뷰가 몰리는(Zipf) 인기도
+            quality = {sid: rng.uniform(2.5, 4.8) for sid in store_ids}
+            cum_weights, acc = [], 0.0
+            for rank in range(1, len(store_ids) + 1):
+                acc += 1.0 / rank ** 0.8
+                cum_weights.append(acc)
+            popular = store_ids[:]
+            rng.shuffle(popular)
+            user_ids = [u["user_id"] for u in bench_users]
+            now = datetime.now()
+
+            def review_rows():
+                while True:
+                    for sid in rng.choices(popular, cum_weights=cum_weights, k=chunk):
+                        rating = min(5, max(1, round(rng.gauss(quality[sid], 0.9))))
+                        yield (rng.choice(user_ids), sid, "벤치마크 리뷰입니다. " * rng.randint(1, 5),
+                               rating, now - timedelta(minutes=rng.randint(0, 60 * 24 * 365 * 3)))
+            rows = review_rows()
+            for done in range(0, reviews, chunk):
+                n = min(chunk, reviews - done)
+                cur.executemany("""
+                    INSERT INTO review (user_id, store_id, content, rating, created_at)
+                    VALUES (%s, %s, %s, %s, %s)
+                """, [next(rows) for _ in range(n)])
+                conn.commit()
+                if (done // chunk) % 20 == 19:
+                    log(f"리뷰 {done + n}/{reviews}")
+            log(f"리뷰 {reviews}개 생성")
+
+            # ---------- 문의 ----------
+            def inquiry_rows():
+                for i in range(inquiries):
+                    user = rng.choice(bench_users)
+                    answer = "벤치마크 답변입니다." if i % 2 else None
+                    yield (user["user_id"], f"벤치마크 문의 {i}", user["name"],
+                           "문의 내용입니다. " * rng.randint(1, 10), answer, rng.choice(INQUIRY_FIELDS))
+            _insert_chunks(conn, cur, """
+                INSERT INTO inquiry (user_id, title, writer, content, answer, field)
+                VALUES (%s, %s, %s, %s, %s, %s)
+            """, inquiry_rows(), inquiries, chunk)
+            log(f"문의 {inquiries}개 생성")
+
+            cur.execute("SET SESSION foreign_key_checks = 1, unique_checks = 1")
+    except Exception:
+        # 검사를 끈 세션 설정이 남은 연결은 풀에 돌려주지 않음
+        conn.discard()
+        raise
+    conn.close()
+
+    rebuild_rank_stats()
+    log(f"랭킹 집계 재계산 완료 ({time.perf_counter() - started:.1f}s). "
+        "자동완성/좌표 인덱스 반영을 위해 서버를 재시작하세요.")
+
+
+def clean(log=print):
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("DELETE FROM store WHERE address = %s", (BENCH_ADDRESS,))
+            stores = cur.rowcount
+            cur.execute("DELETE FROM user WHERE login_id LIKE %s", (BENCH_LOGIN_PREFIX + "%",))
+            users = cur.rowcount
+        conn.commit()
+    finally:
+        conn.close()
+
+    rebuild_rank_stats()
+    log(f"매장 {stores}개, 사용자 {users}명(과 관련 메뉴/리뷰/문의) 삭제")
@@ -0,0 +1,96 @@
+"""
+compression.py
+----------------------------------------
+응답 압축 (gzip / brotli)
+
+- Accept-Encoding 에 따라 br(brotli 설치 시) 또는 gzip 으로 압축합니다.
+- COMPRESS_MIN_SIZE 바이트보다 작은 응답은 압축 이득보다 CPU 비용이 커서 그대로 보냅니다.
+- 스트리밍 응답(export.py)과 정적 파일(send_from_directory)은 압축하지 않습니다.
+- 압축하면 본문이 달라지므로 ETag 를 약한(W/) ETag 로 바꿉니다.
+  If-None-Match 는 약한 비교를 하므로 versions.conditional() 의 304 는 그대로 동작합니다.
+
+사용법: compression.init_app(app)
+"""
+
+import gzip
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # brotli 는 선택 사항 (없으면 gzip 만 사용)
+    brotli = None
+
+COMPRESS_MIN_SIZE = 1024
+COMPRESS_GZIP_LEVEL = 6
+COMPRESS_BROTLI_QUALITY = 5     # 동적 응답용 (11 은 너무 느림)
+
+COMPRESS_MIMETYPES = {
+    "application/json",
+    "application/javascript",
+    "text/html",
+    "text/css",
+    "text/javascript",
+    "text/plain",
+    "image/svg+xml",
+}
+
+
+def choose_encoding():
+    """클라이언트가 받을 수 있는 인코딩 중 br > gzip 순으로 선택. 없으면 None"""
+    accept = request.accept_encodings
+    gzip_q = accept.quality("gzip")
+    if brotli is not None and accept.quality("br") > 0 and accept.quality("br") >= gzip_q:
+        return "br"
+    if gzip_q > 0:
+        return "gzip"
+    return None
+
+
+def compress(data, encoding):
+    if encoding == "br":
+        return brotli.compress(data, quality=COMPRESS_BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=COMPRESS_GZIP_LEVEL, mtime=0)
+
+
+def _weaken_etag(response):
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+
+
+def compress_response(response):
+    if response.status_code == 304:
+        # 압축된 200 응답과 같은 ETag/Vary 를 돌려줘야 캐시가 갱신됨
+        if response.headers.get("ETag") and choose_encoding():
+            _weaken_etag(response)
+            response.vary.add("Accept-Encoding")
+        return response
+
+    if response.mimetype not in COMPRESS_MIMETYPES:
+        return response
+    response.vary.add("Accept-Encoding")
+
+    if (response.status_code < 200
+            or response.status_code == 204
+            or response.direct_passthrough
+            or response.is_streamed
+            or "Content-Encoding" in response.headers):
+        return response
+
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_SIZE:
+        return response
+
+    encoding = choose_encoding()
+    if encoding is None:
+        return response
+
+    response.set_data(compress(data, encoding))
+    response.headers["Content-Encoding"] = encoding
+    _weaken_etag(response)
+    return response
+
+
+def init_app(app):
+    app.after_request(compress_response)
@@ -1,12 +1,347 @@
+"""
+db.py
+----------------------------------------
+MySQL 커넥션 풀
+- get_connection() : 풀에서 커넥션을 하나 빌려옵니다.
+  반환된 커넥션의 close()는 실제로 연결을 끊지 않고 풀에 반납합니다.
+- get_pool_stats() : 풀 사용 현황(생성/재활용/대기/고갈 횟수 등)
+
+커넥션의 cursor() 는 실행 시간을 profiling 모듈에 기록하는 ProfiledCursor 를 돌려줍니다.
+
+풀은 프로세스마다 따로 가집니다. fork 된 워커(serve.py)에서 처음 사용하면
+부모에게서 물려받은 커넥션은 버리고 새로 만듭니다.
+"""
+
+import os
+import threading
+import time
+
 import pymysql
+from pymysql.constants import SERVER_STATUS
+
+import profiling
+
+DB_CONFIG = dict(
+    host='localhost',
+    user='root',
+    password='fooddb',
+    db='fooddb',
+    charset='utf8mb4',
+    cursorclass=pymysql.cursors.DictCursor
+)
+
+# 풀 설정
+POOL_MIN_SIZE = 2          # 최초 사용 시 미리 만들어 둘 커넥션 수
+POOL_MAX_SIZE = 20         # 동시에 열 수 있는 최대 커넥션 수
+POOL_TIMEOUT = 5.0         # 풀이 고갈됐을 때 반납을 기다리는 최대 시간(초)
+POOL_MAX_LIFETIME = 1800   # 이 시간(초)보다 오래된 커넥션은 새로 만듭니다
+POOL_PING_INTERVAL = 5     # 이 시간(초) 이상 놀고 있던 커넥션은 빌려줄 때 ping
+
+
+class PoolTimeout(Exception):
+    """풀이 고갈되어 제한 시간 안에 커넥션을 얻지 못했을 때 발생합니다."""
+
+
+class ProfiledCursor:
+    """
+    pymysql 커서 래퍼. execute / executemany 의 실행 시간과 행 수를
+    profiling.record_query() 로 넘기고 나머지는 실제 커서로 그대로 전달합니다.
+    """
+
+    def __init__(self, cur):
+        self._cur = cur
+
+    def __getattr__(self, name):
+        return getattr(self._cur, name)
+
+    def __iter__(self):
+        return iter(self._cur)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self._cur.close()
+
+    def _run(self, method, query, args):
+        start = time.perf_counter()
+        try:
+            return method(query, args)
+        finally:
+            rows = self._cur.rowcount
+            # unbuffered(SSCursor) 커서는 행 수를 미리 알 수 없음
+            profiling.record_query(query, (time.perf_counter() - start) * 1000,
+                                   rows if 0 <= rows < 2 ** 63 else None)
+
+    def execute(self, query, args=None):
+        return self._run(self._cur.execute, query, args)
+
+    def executemany(self, query, args):
+        return self._run(self._cur.executemany, query, args)
+
+
+class PooledConnection:
+    """
+    pymysql 커넥션 래퍼.
+    commit(), rollback() 등은 실제 커넥션으로 그대로 전달하고
+    cursor()는 ProfiledCursor 로 감싸며, close()는 풀 반납으로 바꿉니다.
+    """
+
+    def __init__(self, pool, raw):
+        self._pool = pool
+        self._raw = raw
+        self._closed = False
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def cursor(self, cursor=None):
+        return ProfiledCursor(self._raw.cursor(cursor))
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._pool._release(self._raw)
+
+    def discard(self):
+        """
+        풀에 돌려보내지 않고 연결을 끊습니다.
+        읽다 만 unbuffered(SSCursor) 결과가 남아 있을 때처럼 재사용하면 안 되는 경우에 사용합니다.
+        """
+        if self._closed:
+            return
+        try:
+            self._raw._force_close()
+        except Exception:
+            pass
+        self.close()
+
+
+class ConnectionPool:
+    def __init__(self, config, min_size=POOL_MIN_SIZE, max_size=POOL_MAX_SIZE,
+                 timeout=POOL_TIMEOUT, max_lifetime=POOL_MAX_LIFETIME,
+                 ping_interval=POOL_PING_INTERVAL):
+        self.config = config
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.ping_interval = ping_interval
+
+        self._cond = threading.Condition()
+        self._idle = []        # [(raw, last_used)]
+        self._created_at = {}  # id(raw) -> 생성 시각
+        self._size = 0         # 현재 열려 있는 커넥션 수 (idle + 사용 중)
+        self._warmed = False
+        self._pid = os.getpid()
+
+        self.stats = {
+            "created": 0,
+            "recycled": 0,
+            "ping_failed": 0,
+            "checkouts": 0,
+            "waits": 0,
+            "timeouts": 0,
+            "peak_in_use": 0,
+        }
+
+    # ----------------------
+    # 내부 함수
+    # - 연결 / ping / 닫기처럼 네트워크를 쓰는 작업은 _cond 락 밖에서 합니다
+    #   (느린 DB 하나 때문에 다른 스레드의 반납/대기가 모두 멈추지 않도록).
+    #   락 안에서는 _size 로 자리를 먼저 잡거나 돌려주기만 합니다.
+    # ----------------------
+    def _connect(self):
+        raw = pymysql.connect(**self.config)
+        with self._cond:
+            self._created_at[id(raw)] = time.monotonic()
+            self.stats["created"] += 1
+        return raw
+
+    def _discard(self, raw):
+        """락 밖에서 호출 (COM_QUIT 전송)"""
+        self._created_at.pop(id(raw), None)
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    def _warm_up(self):
+        """최초 사용 시 min_size만큼 커넥션을 미리 만듭니다 (자리만 락 안에서 잡고 연결은 락 밖에서)."""
+        with self._cond:
+            if self._warmed:
+                return
+            self._warmed = True
+            need = max(0, self.min_size - self._size)
+            self._size += need
+
+        for made in range(need):
+            try:
+                raw = self._connect()
+            except Exception as e:
+                print(f"커넥션 풀 초기화 오류: {e}")
+                with self._cond:
+                    self._size -= need - made
+                    self._cond.notify_all()
+                break
+            with self._cond:
+                self._idle.append((raw, time.monotonic()))
+                self._cond.notify()
+
+    def _reset_after_fork(self):
+        """
+        fork 로 물려받은 상태를 버립니다.
+        부모와 같은 소켓을 쓰게 되므로 COM_QUIT 을 보내지 않고 소켓만 닫습니다.
+        """
+        for raw, _ in self._idle:
+            try:
+                raw._force_close()
+            except Exception:
+                pass
+        self._cond = threading.Condition()
+        self._idle = []
+        self._created_at = {}
+        self._size = 0
+        self._warmed = False
+        self._pid = os.getpid()
+        self.stats = dict.fromkeys(self.stats, 0)
+
+    def _check(self, raw, last_used):
+        """
+        idle 에서 꺼낸 커넥션을 그대로 빌려줘도 되는지 확인 (락 밖에서 호출, ping 포함).
+        쓸 수 있으면 None, 아니면 올릴 통계 이름("recycled" / "ping_failed").
+        """
+        now = time.monotonic()
+        created = self._created_at.get(id(raw), now)
+        if self.max_lifetime and now - created > self.max_lifetime:
+            return "recycled"
+        if now - last_used >= self.ping_interval:
+            try:
+                raw.ping(reconnect=False)
+            except Exception:
+                return "ping_failed"
+        return None
+
+    # ----------------------
+    # 빌리기 / 반납
+    # ----------------------
+    def get_connection(self):
+        if self._pid != os.getpid():
+            self._reset_after_fork()
+        deadline = time.monotonic() + self.timeout
+        self._warm_up()
+
+        waited = False
+        while True:
+            with self._cond:
+                while True:
+                    if self._idle:
+                        # 꺼낸 커넥션은 _size 에 그대로 포함 (검사하는 동안 다른 스레드가 자리를 못 가져감)
+                        raw, last_used = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        raw = None
+                        break
+
+                    if not waited:
+                        waited = True
+                        self.stats["waits"] += 1
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or not self._cond.wait(remaining):
+                        if not self._idle:
+                            self.stats["timeouts"] += 1
+                            raise PoolTimeout(
+                                f"커넥션 풀이 고갈되었습니다 (max_size={self.max_size})"
+                            )
+
+            if raw is None:
+                # 잡아 둔 자리로 새로 연결
+                break
+
+            reason = self._check(raw, last_used)
+            if reason is None:
+                with self._cond:
+                    return self._checkout(raw)
+            self._discard(raw)
+            with self._cond:
+                self.stats[reason] += 1
+                self._size -= 1
+                self._cond.notify()
+
+        try:
+            raw = self._connect()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+        with self._cond:
+            return self._checkout(raw)
+
+    def _checkout(self, raw):
+        self.stats["checkouts"] += 1
+        in_use = self._size - len(self._idle)
+        if in_use > self.stats["peak_in_use"]:
+            self.stats["peak_in_use"] = in_use
+        return PooledConnection(self, raw)
+
+    def _release(self, raw):
+        if self._pid != os.getpid():
+            # fork 전에 빌린 커넥션은 이 프로세스의 풀에 넣지 않음
+            return
+        healthy = raw.open
+        if healthy and raw.server_status & SERVER_STATUS.SERVER_STATUS_IN_TRANS:
+            # 커밋되지 않은 트랜잭션(SELECT로 열린 스냅샷 포함)은 정리 후 반납
+            try:
+                raw.rollback()
+            except Exception:
+                healthy = False
+
+        if not healthy:
+            self._discard(raw)
+        with self._cond:
+            if healthy:
+                self._idle.append((raw, time.monotonic()))
+            else:
+                self._size -= 1
+            self._cond.notify()
+
+    def close_all(self):
+        """idle 상태의 커넥션을 모두 닫습니다."""
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            self._warmed = False
+            self._cond.notify_all()
+        for raw, _ in idle:
+            self._discard(raw)
+
+    def get_stats(self):
+        with self._cond:
+            stats = dict(self.stats)
+            stats["size"] = self._size
+            stats["idle"] = len(self._idle)
+            stats["in_use"] = self._size - len(self._idle)
+            stats["min_size"] = self.min_size
+            stats["max_size"] = self.max_size
+        return stats
+
+
+pool = ConnectionPool(DB_CONFIG)
+
 
 def get_connection():
-    return pymysql.connect(
-        host='localhost',
-        user='root',
-        password='fooddb',   
-        db='fooddb',
-        charset='utf8mb4',
-        cursorclass=pymysql.cursors.DictCursor
-    )
+    return pool.get_connection()
+
 
+def get_pool_stats():
+    return pool.get_stats()
@@ -0,0 +1,153 @@
+"""
+export.py
+----------------------------------------
+관리자용 데이터 내보내기 API (NDJSON / CSV 스트리밍)
+- GET /api/admin/export/ranking   : ?format=ndjson|csv&use_adv=1&min_reviews=0
+- GET /api/admin/export/reviews   : ?format=ndjson|csv&store_id=
+- GET /api/admin/export/inquiries : ?format=ndjson|csv
+
+서버 측 unbuffered 커서(SSDictCursor)로 EXPORT_FETCH_SIZE 행씩 읽어 바로 전송하므로
+행 수와 관계없이 메모리 사용량이 일정하고 첫 바이트가 곧바로 나갑니다.
+"""
+
+import csv
+import io
+from datetime import datetime
+
+import pymysql
+from flask import Blueprint, Response, current_app, jsonify, request
+
+from auth import admin_required
+from db import get_connection
+from ranking import build_rank_query
+
+bp = Blueprint('export', __name__)
+
+EXPORT_FETCH_SIZE = 500     # 한 번에 읽어서 전송할 행 수
+EXPORT_NO_LIMIT = 2 ** 63 - 1
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def stream_rows(cur, fmt, dumps, state):
+    """조회 중인 SSDictCursor 의 행을 NDJSON / CSV 조각으로 내놓는 제너레이터"""
+    if fmt == "csv":
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        # 엑셀에서 한글이 깨지지 않도록 BOM 추가
+        buf.write("\ufeff")
+        writer.writerow([col[0] for col in cur.description])
+
+    while True:
+        rows = cur.fetchmany(EXPORT_FETCH_SIZE)
+        if fmt == "csv":
+            for row in rows:
+                writer.writerow(["" if v is None else v for v in row.values()])
+            chunk = buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+        else:
+            chunk = "".join(dumps(row) + "\n" for row in rows)
+        if chunk:
+            yield chunk.encode("utf-8")
+        if not rows:
+            break
+    state["finished"] = True
+
+
+def export_response(name, sql, params=()):
+    fmt = request.args.get("format", "ndjson")
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({"error": f"format 은 {', '.join(EXPORT_FORMATS)} 중에서 선택하세요."}), 400
+
+    conn = get_connection()
+    try:
+        cur = conn.cursor(pymysql.cursors.SSDictCursor)
+        cur.execute(sql, params)
+    except Exception:
+        conn.discard()
+        raise
+
+    state = {"finished": False}
+
+    def cleanup():
+        # 끝까지 보내지 못했으면(클라이언트 중단 등) 남은 결과를 읽지 않고 연결을 버림
+        if state["finished"]:
+            cur.close()
+            conn.close()
+        else:
+            conn.discard()
+
+    filename = f"{name}_{datetime.now():%Y%m%d_%H%M%S}.{fmt}"
+    response = Response(
+        stream_rows(cur, fmt, current_app.json.dumps, state),
+        mimetype=EXPORT_FORMATS[fmt],
+        headers={
+            "Content-Disposition": f"attachment; filename={filename}",
+            # 프록시(nginx)가 응답을 모아두지 않고 바로 전달하도록
+            "X-Accel-Buffering": "no",
+        },
+    )
+    response.call_on_close(cleanup)
+    return response
+
+
+# ======================
+# 랭킹 내보내기
+# GET /api/admin/export/ranking
+# ======================
+@bp.route('/api/admin/export/ranking', methods=['GET'])
+@admin_required
+def export_ranking():
+    min_reviews = request.args.get("min_reviews", 0, type=int)
+    use_adv = request.args.get("use_adv", "1") == "1"
+    sql, params = build_rank_query(EXPORT_NO_LIMIT, 0, min_reviews, use_adv)
+    return export_response("ranking", sql, params)
+
+
+# ======================
+# 리뷰 내보내기
+# GET /api/admin/export/reviews
+# ======================
+@bp.route('/api/admin/export/reviews', methods=['GET'])
+@admin_required
+def export_reviews():
+    store_id = request.args.get("store_id", type=int)
+    where, params = "", ()
+    if store_id is not None:
+        where, params = "WHERE store_id = %s", (store_id,)
+
+    sql = f"""
+        SELECT review_id, store_id, user_id, rating, helpful_cnt, created_at, content
+        FROM review
+        {where}
+        ORDER BY review_id
+    """
+    return export_response("reviews", sql, params)
+
+
+# ======================
+# 문의 내보내기
+# GET /api/admin/export/inquiries
+# ======================
+@bp.route('/api/admin/export/inquiries', methods=['GET'])
+@admin_required
+def export_inquiries():
+    sql = """
+        SELECT
+            inquiry_id,
+            user_id,
+            title,
+            writer,
+            field,
+            is_answered AS answered,
+            created_at,
+            content,
+            answer
+        FROM inquiry
+        ORDER BY inquiry_id DESC
+    """
+    return export_response("inquiries", sql)
@@ -0,0 +1,192 @@
+"""
+geo.py
+----------------------------------------
+매장 좌표(lat, lng)용 메모리 격자(grid) 인덱스
+- 위도/경도를 GEO_CELL_DEG 크기의 칸으로 나눠 칸마다 매장 목록을 둡니다.
+- within(lat, lng, radius_km) : 반경 안의 매장을 (store_id, 거리 km) 로 반환
+  반경을 덮는 칸들만 살펴보므로 매장이 10만 개여도 몇 ms 안에 끝납니다.
+
+인덱스는 처음 사용할 때 store 테이블에서 읽어오고,
+매장 수정/삭제 시 upsert_store() / remove_store() 로 갱신합니다.
+다른 워커 프로세스(serve.py)에서 수정/삭제한 매장은 'stores' 리소스 버전을
+INDEX_VERSION_POLL 초마다 확인해 바뀌었으면 백그라운드에서 다시 읽어 반영합니다.
+좌표가 없는(NULL) 매장은 색인하지 않습니다.
+"""
+
+import math
+import threading
+
+from db import get_connection
+import versions
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEG_LAT = 111.32
+
+# 격자 한 칸의 크기(도). 0.01도 ≈ 위도 1.1km / 경도 0.9km(위도 37도 기준)
+GEO_CELL_DEG = 0.01
+
+# 다른 워커 프로세스의 매장 수정이 이 시간(초) + 다시 읽는 시간 안에 반영됨
+INDEX_VERSION_POLL = 5.0
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp = p2 - p1
+    dl = math.radians(lng2 - lng1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def _cell(lat, lng):
+    return (math.floor(lat / GEO_CELL_DEG), math.floor(lng / GEO_CELL_DEG))
+
+
+class GridIndex:
+    def __init__(self):
+        # (lat 칸, lng 칸) -> ((store_id, lat, lng), ...)
+        # 갱신 시 dict 를 복사해 바꾼 뒤 참조를 교체하므로 조회는 락 없이 수행
+        # (조회 중인 dict 는 바뀌지 않음)
+        self._cells = {}
+        self._points = {}   # store_id -> (lat, lng)
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._loaded = False
+        self._watch = versions.VersionWatch("stores", INDEX_VERSION_POLL)
+
+    def load(self):
+        self._watch.mark()
+        conn = get_connection()
+        try:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    SELECT store_id, lat, lng
+                    FROM store
+                    WHERE lat IS NOT NULL AND lng IS NOT NULL
+                """)
+                rows = cur.fetchall()
+        finally:
+            conn.close()
+
+        self._replace({row["store_id"]: (float(row["lat"]), float(row["lng"])) for row in rows})
+
+    def _replace(self, points):
+        """인덱스 전체를 points(store_id -> (lat, lng)) 로 새로 만들어 교체"""
+        cells = {}
+        for store_id, (lat, lng) in points.items():
+            cells.setdefault(_cell(lat, lng), []).append((store_id, lat, lng))
+
+        with self._lock:
+            self._cells = {key: tuple(items) for key, items in cells.items()}
+            self._points = points
+            self._loaded = True
+
+    def ensure_loaded(self):
+        if self._loaded:
+            try:
+                self._watch.poll(self.load)
+            except Exception as e:
+                print(f"좌표 인덱스 버전 확인 오류: {e}")
+            return
+        # 동시에 들어온 첫 요청들이 각자 load() 하지 않도록 하나만 읽고 나머지는 기다림
+        with self._load_lock:
+            if not self._loaded:
+                self.load()
+
+    def __len__(self):
+        return len(self._points)
+
+    def upsert_store(self, store_id, lat, lng):
+        if not self._loaded:
+            return
+        with self._lock:
+            cells, points = self._without(store_id)
+            if lat is not None and lng is not None:
+                lat, lng = float(lat), float(lng)
+                key = _cell(lat, lng)
+                cells[key] = cells.get(key, ()) + ((store_id, lat, lng),)
+                points[store_id] = (lat, lng)
+            self._cells, self._points = cells, points
+
+    def remove_store(self, store_id):
+        if not self._loaded:
+            return
+        with self._lock:
+            self._cells, self._points = self._without(store_id)
+
+    def _without(self, store_id):
+        """store_id 를 뺀 새 (cells, points). 기존 dict 는 조회 중일 수 있으므로 복사"""
+        cells, points = dict(self._cells), dict(self._points)
+        old = points.pop(store_id, None)
+        if old is not None:
+            key = _cell(*old)
+            items = tuple(e for e in cells.get(key, ()) if e[0] != store_id)
+            if items:
+                cells[key] = items
+            else:
+                cells.pop(key, None)
+        return cells, points
+
+    def within(self, lat, lng, radius_km):
+        """반경 radius_km 안의 매장을 [(store_id, distance_km), ...] 로 반환 (순서 없음)"""
+        self.ensure_loaded()
+
+        # 반경을 덮는 사각형 범위의 칸 (경도 1도의 길이는 위도에 따라 줄어듦)
+        dlat = radius_km / KM_PER_DEG_LAT
+        dlng = radius_km / (KM_PER_DEG_LAT * max(math.cos(math.radians(lat)), 0.01))
+        lat0, lng0 = _cell(lat - dlat, lng - dlng)
+        lat1, lng1 = _cell(lat + dlat, lng + dlng)
+
+        cells = self._cells
+        if (lat1 - lat0 + 1) * (lng1 - lng0 + 1) > len(cells):
+            # 반경이 매우 넓으면 칸을 하나씩 찾는 것보다 전체를 훑는 편이 빠름
+            buckets = list(cells.values())
+        else:
+            buckets = [cells[key]
+                       for key in ((i, j) for i in range(lat0, lat1 + 1)
+                                          for j in range(lng0, lng1 + 1))
+                       if key in cells]
+
+        result = []
+        for bucket in buckets:
+            for store_id, s_lat, s_lng in bucket:
+                # 위도 차이만으로 먼저 걸러내고 나머지만 정확한 거리 계산
+                if abs(s_lat - lat) > dlat:
+                    continue
+                d = haversine_km(lat, lng, s_lat, s_lng)
+                if d <= radius_km:
+                    result.append((store_id, d))
+        return result
+
+
+index = GridIndex()
+
+
+def within(lat, lng, radius_km):
+    return index.within(lat, lng, radius_km)
+
+
+def upsert_store(store_id, lat, lng):
+    index.upsert_store(store_id, lat, lng)
+
+
+def remove_store(store_id):
+    index.remove_store(store_id)
+
+
+# 터미널에서 단독 실행: 임의 좌표 10만 개로 반경 검색 속도 측정 (DB 필요 없음)
+if __name__ == "__main__":
+    import random
+    import time
+
+    grid = GridIndex()
+    random.seed(1)
+    # 수도권 범위(약 100km x 100km)에 분포
+    grid._replace({sid: (random.uniform(37.0, 37.9), random.uniform(126.6, 127.7))
+                   for sid in range(100000)})
+
+    for radius in (1, 3, 10):
+        start = time.perf_counter()
+        for _ in range(100):
+            found = grid.within(37.34, 126.73, radius)
+        ms = (time.perf_counter() - start) * 1000 / 100
+        print(f"반경 {radius}km : {len(found)}개, 평균 {ms:.3f} ms")
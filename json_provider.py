@@ -0,0 +1,59 @@
+"""
+json_provider.py
+----------------------------------------
+Flask JSON 직렬화 설정
+- Decimal   → float
+- datetime  → "YYYY-MM-DD HH:MM:SS"
+- date      → "YYYY-MM-DD"
+- timedelta → "HH:MM" (MySQL TIME 컬럼)
+
+orjson 이 설치되어 있으면 orjson 으로, 없으면 표준 json 으로 직렬화합니다.
+DB 에서 읽은 행을 복사/변환하지 않고 jsonify() 에 그대로 넘기면 됩니다.
+"""
+
+import decimal
+from datetime import date, datetime, time, timedelta
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # orjson 은 선택 사항
+    orjson = None
+
+
+def encode_value(o):
+    """표준 json / orjson 이 직접 처리하지 못하는 타입 변환"""
+    if isinstance(o, decimal.Decimal):
+        return float(o)
+    if isinstance(o, datetime):
+        return o.strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(o, date):
+        return o.strftime("%Y-%m-%d")
+    if isinstance(o, timedelta):
+        total_seconds = o.seconds
+        hours = total_seconds // 3600
+        minutes = (total_seconds % 3600) // 60
+        return f"{hours:02d}:{minutes:02d}"
+    if isinstance(o, time):
+        return o.strftime("%H:%M")
+    if isinstance(o, (set, frozenset)):
+        return list(o)
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    default = staticmethod(encode_value)
+
+    def dumps(self, obj, **kwargs):
+        indent = kwargs.get("indent")
+        # orjson 이 지원하지 않는 옵션이 오면 표준 json 사용
+        if orjson is None or indent not in (None, 2) or kwargs.get("cls"):
+            return super().dumps(obj, **kwargs)
+
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if indent == 2:
+            option |= orjson.OPT_INDENT_2
+        if kwargs.get("sort_keys", self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=encode_value, option=option).decode("utf-8")
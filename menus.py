@@ -0,0 +1,171 @@
+"""
+menus.py
+----------------------------------------
+매장 메뉴 캐시 + 관리자 메뉴 일괄 관리 API
+- POST /api/admin/store/<store_id>/menus : 메뉴 추가/수정/삭제를 트랜잭션 하나로 처리
+    {"name": "...", "price": 8000}                        → 메뉴 하나 추가 (같은 이름이면 가격 수정)
+    {"upsert": [{"name", "price", "recommend"}, ...],
+     "delete": [menu_id 또는 메뉴 이름, ...]}             → 삭제 후 추가/수정
+  같은 매장 안에서 이름이 같으면(uq_menu_store_name) 새로 만들지 않고 가격/추천 문구를 수정합니다.
+
+메뉴 캐시 (menu_cache)
+- 매장별 메뉴 목록을 'store:<id>' 리소스 버전과 함께 저장합니다 (versions.py).
+  매장 상세 조회는 ETag 를 만들 때 읽은 버전과 같을 때만 캐시를 쓰므로
+  다른 워커 프로세스에서 메뉴를 바꿔도(버전 증가) 바로 다시 조회하고, ETag 보다 오래된 메뉴를 돌려주지 않습니다.
+- 이 프로세스의 메뉴 쓰기는 invalidate_menus() 로 바로 지웁니다.
+"""
+
+from flask import Blueprint, jsonify, request
+import pymysql
+
+from cache import TTLCache
+from db import get_connection
+import versions
+
+bp = Blueprint('menus', __name__)
+
+MENU_CACHE_SIZE = 4096
+MENU_CACHE_TTL = 600
+
+# 요청 하나에서 추가/수정 + 삭제할 수 있는 최대 메뉴 수
+MENU_BULK_MAX = 200
+MENU_NAME_MAX = 60   # menu.name VARCHAR(60)
+
+# store_id -> (매장 리소스 버전, [메뉴, ...])
+menu_cache = TTLCache(maxsize=MENU_CACHE_SIZE, ttl=MENU_CACHE_TTL)
+
+
+def get_cached_menus(store_id, version):
+    """version 에 저장된 메뉴 목록 (없거나 버전이 다르면 None). 반환된 리스트는 수정하지 마세요."""
+    entry = menu_cache.get(store_id)
+    if entry is None or entry[0] != version:
+        return None
+    return entry[1]
+
+
+def cache_menus(store_id, version, menus, generation=None):
+    menu_cache.set(store_id, (version, menus), generation)
+
+
+def invalidate_menus(*store_ids):
+    for store_id in store_ids:
+        menu_cache.pop(store_id)
+
+
+def get_menu_cache_stats():
+    return menu_cache.get_stats()
+
+
+def parse_menu_changes(data):
+    """
+    요청 본문을 (upserts, delete_ids, delete_names) 로 바꿉니다. 잘못된 값은 ValueError.
+    upserts : [(name, price, recommend), ...]
+    """
+    if "upsert" not in data and "delete" not in data:
+        data = {"upsert": [data]}
+    items = data.get("upsert") or []
+    deletes = data.get("delete") or []
+    if not isinstance(items, list) or not isinstance(deletes, list):
+        raise ValueError("upsert / delete 는 목록이어야 합니다.")
+    if not items and not deletes:
+        raise ValueError("변경할 메뉴가 없습니다.")
+    if len(items) + len(deletes) > MENU_BULK_MAX:
+        raise ValueError(f"한 번에 {MENU_BULK_MAX}개까지 변경할 수 있습니다.")
+
+    upserts, seen = [], set()
+    for item in items:
+        if not isinstance(item, dict):
+            raise ValueError("upsert 항목은 {name, price} 형식이어야 합니다.")
+        name = (item.get("name") or "").strip()
+        price = item.get("price")
+        recommend = item.get("recommend")
+        if not name:
+            raise ValueError("메뉴 이름은 필수입니다.")
+        if len(name) > MENU_NAME_MAX:
+            raise ValueError(f"메뉴 이름은 {MENU_NAME_MAX}자 이하여야 합니다.")
+        if isinstance(price, bool) or not isinstance(price, (int, float)) or price < 0 or price != int(price):
+            raise ValueError(f"'{name}' 의 가격이 올바르지 않습니다.")
+        if name in seen:
+            raise ValueError(f"'{name}' 메뉴가 중복되었습니다.")
+        seen.add(name)
+        upserts.append((name, int(price), recommend))
+
+    delete_ids, delete_names = [], []
+    for target in deletes:
+        if isinstance(target, int) and not isinstance(target, bool):
+            delete_ids.append(target)
+        elif isinstance(target, str) and target.strip():
+            delete_names.append(target.strip())
+        else:
+            raise ValueError("delete 항목은 메뉴 id 또는 메뉴 이름이어야 합니다.")
+    return upserts, delete_ids, delete_names
+
+
+# ======================
+# 메뉴 일괄 추가/수정/삭제
+# POST /api/admin/store/<store_id>/menus
+# ======================
+@bp.route("/api/admin/store/<int:store_id>/menus", methods=["POST"])
+def bulk_update_menus(store_id):
+    try:
+        upserts, delete_ids, delete_names = parse_menu_changes(request.get_json() or {})
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            # 매장 행을 잠가서 같은 매장의 메뉴 변경끼리 순서대로 처리
+            cur.execute("SELECT store_id FROM store WHERE store_id = %s FOR UPDATE", (store_id,))
+            if not cur.fetchone():
+                return jsonify({"message": "해당 매장을 찾을 수 없습니다."}), 404
+
+            deleted = 0
+            if delete_ids or delete_names:
+                where, params = [], [store_id]
+                if delete_ids:
+                    where.append(f"menu_id IN ({', '.join(['%s'] * len(delete_ids))})")
+                    params.extend(delete_ids)
+                if delete_names:
+                    where.append(f"name IN ({', '.join(['%s'] * len(delete_names))})")
+                    params.extend(delete_names)
+                deleted = cur.execute(
+                    f"DELETE FROM menu WHERE store_id = %s AND ({' OR '.join(where)})", params)
+
+            if upserts:
+                # uq_menu_store_name(store_id, name) 에 걸리면 새 행 대신 기존 메뉴를 수정
+                # recommend 를 보내지 않은 메뉴는 기존 추천 문구를 유지
+                cur.execute(f"""
+                    INSERT INTO menu (store_id, name, price, recommend)
+                    VALUES {", ".join(["(%s, %s, %s, %s)"] * len(upserts))}
+                    ON DUPLICATE KEY UPDATE
+                        price = VALUES(price),
+                        recommend = COALESCE(VALUES(recommend), recommend)
+                """, [v for name, price, recommend in upserts
+                      for v in (store_id, name, price, recommend)])
+
+            versions.bump(cur, f"store:{store_id}")
+            cur.execute("""
+                SELECT menu_id, name, price, recommend
+                FROM menu
+                WHERE store_id = %s
+                ORDER BY menu_id
+            """, (store_id,))
+            menus = cur.fetchall()
+        conn.commit()
+    except pymysql.MySQLError as e:
+        conn.rollback()
+        print(f"메뉴 일괄 변경 오류: {e}")
+        return jsonify({"message": "메뉴를 저장하는 중 오류가 발생했습니다."}), 500
+    finally:
+        conn.close()
+
+    invalidate_menus(store_id)
+    versions.clear_local()
+
+    return jsonify({
+        "message": "메뉴가 저장되었습니다.",
+        "upserted": len(upserts),
+        "deleted": deleted,
+        "menus": menus,
+    }), 200
@@ -0,0 +1,194 @@
+"""
+profiling.py
+----------------------------------------
+쿼리 프로파일링
+
+db.get_connection() 이 돌려주는 커서는 execute / executemany 마다 record_query() 를 호출합니다.
+- 쿼리 지문(fingerprint) : 값/IN 목록/여러 행 VALUES 를 ? 로 바꾼 SQL. 같은 모양의 쿼리끼리 집계
+- 전체 통계             : 지문별 횟수/총·최대 시간/행 수 + 실행 시간 히스토그램
+                          + 엔드포인트별 요청당 쿼리 수 / DB 시간 (N+1 찾기용)
+- 요청별 기록           : 응답에 Server-Timing 헤더 (db 시간, 쿼리 수, 전체 처리 시간)
+- 느린 쿼리 로그        : SLOW_QUERY_MS 이상 걸린 쿼리를 출력
+
+사용법: profiling.init_app(app), 통계는 get_query_stats() / reset_query_stats()
+"""
+
+import re
+import threading
+import time
+from functools import lru_cache
+
+from flask import g, has_request_context, request
+
+# 이 시간(ms) 이상 걸린 쿼리는 느린 쿼리로 출력
+SLOW_QUERY_MS = 200
+
+# True 면 Server-Timing 에 가장 느린 쿼리 몇 개의 지문도 싣습니다 (SQL 이 노출되므로 개발용)
+SERVER_TIMING_DETAIL = False
+SERVER_TIMING_DETAIL_COUNT = 5
+
+# 실행 시간 히스토그램 구간 상한(ms). 마지막 구간은 그 이상 전부
+HISTOGRAM_BOUNDS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+# 집계할 최대 지문 수 (넘으면 OTHER_FINGERPRINT 로 합산)
+MAX_FINGERPRINTS = 1000
+OTHER_FINGERPRINT = "(other)"
+
+_COMMENT_RE = re.compile(r"/\*.*?\*/|--[^\n]*", re.S)
+_STRING_RE = re.compile(r"'(?:[^'\\]|\\.)*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_VALUES_RE = re.compile(r"(\(\?, \.\.\.\)|\(\?\))(?:\s*,\s*(?:\(\?, \.\.\.\)|\(\?\)))+")
+_SPACE_RE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(sql):
+    """
+    SELECT ... WHERE id IN (%s, %s, %s)  →  SELECT ... WHERE id IN (?, ...)
+    값의 개수가 달라 SQL 문자열이 달라지는 쿼리도 하나로 모읍니다.
+    """
+    text = _COMMENT_RE.sub(" ", sql)
+    text = _STRING_RE.sub("?", text)
+    text = text.replace("%s", "?")
+    text = _NUMBER_RE.sub("?", text)
+    text = _SPACE_RE.sub(" ", text).strip()
+    text = _IN_LIST_RE.sub("(?, ...)", text)
+    text = _VALUES_RE.sub(r"\1, ...", text)
+    return text
+
+
+class QueryStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.started_at = time.time()
+            self.queries = {}     # 지문 -> [count, total_ms, max_ms, rows]
+            self.endpoints = {}   # 엔드포인트 -> [requests, queries, db_ms]
+            self.histogram = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+            self.slow = 0
+
+    def record(self, fp, ms, rows):
+        bucket = len(HISTOGRAM_BOUNDS_MS)
+        for i, bound in enumerate(HISTOGRAM_BOUNDS_MS):
+            if ms <= bound:
+                bucket = i
+                break
+        with self._lock:
+            self.histogram[bucket] += 1
+            if ms >= SLOW_QUERY_MS:
+                self.slow += 1
+            entry = self.queries.get(fp)
+            if entry is None:
+                if len(self.queries) >= MAX_FINGERPRINTS:
+                    fp = OTHER_FINGERPRINT
+                entry = self.queries.setdefault(fp, [0, 0.0, 0.0, 0])
+            entry[0] += 1
+            entry[1] += ms
+            if ms > entry[2]:
+                entry[2] = ms
+            entry[3] += rows or 0
+
+    def record_request(self, endpoint, queries, db_ms):
+        with self._lock:
+            entry = self.endpoints.setdefault(endpoint, [0, 0, 0.0])
+            entry[0] += 1
+            entry[1] += queries
+            entry[2] += db_ms
+
+    def snapshot(self, top=20, sort="total"):
+        key = {"total": 1, "max": 2, "count": 0}.get(sort, 1)
+        with self._lock:
+            if sort == "mean":
+                ordered = sorted(self.queries.items(), key=lambda kv: kv[1][1] / kv[1][0], reverse=True)
+            else:
+                ordered = sorted(self.queries.items(), key=lambda kv: kv[1][key], reverse=True)
+            queries = [{
+                "fingerprint": fp,
+                "count": count,
+                "total_ms": round(total, 3),
+                "mean_ms": round(total / count, 3),
+                "max_ms": round(max_ms, 3),
+                "rows": rows,
+            } for fp, (count, total, max_ms, rows) in ordered[:top]]
+            endpoints = [{
+                "endpoint": name,
+                "requests": reqs,
+                "queries_per_request": round(n / reqs, 2),
+                "db_ms_per_request": round(db_ms / reqs, 3),
+            } for name, (reqs, n, db_ms) in sorted(self.endpoints.items(),
+                                                   key=lambda kv: kv[1][2], reverse=True)]
+            histogram = [{"le_ms": bound, "count": cnt}
+                         for bound, cnt in zip(HISTOGRAM_BOUNDS_MS + (None,), self.histogram)]
+            return {
+                "since": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.started_at)),
+                "slow_query_ms": SLOW_QUERY_MS,
+                "slow_queries": self.slow,
+                "total_queries": sum(self.histogram),
+                "fingerprints": len(self.queries),
+                "histogram": histogram,
+                "top": queries,
+                "endpoints": endpoints,
+            }
+
+
+stats = QueryStats()
+
+
+def record_query(sql, ms, rows):
+    """db.ProfiledCursor 에서 쿼리 한 번이 끝날 때마다 호출"""
+    if isinstance(sql, bytes):
+        sql = sql.decode("utf-8", "replace")
+    fp = fingerprint(sql)
+    stats.record(fp, ms, rows)
+
+    in_request = has_request_context()
+    if in_request and "query_log" in g:
+        g.query_log.append((ms, fp))
+    if ms >= SLOW_QUERY_MS:
+        where = f"{request.method} {request.path} " if in_request else ""
+        print(f"[slow query] {ms:.1f}ms rows={rows} {where}:: {fp[:500]}")
+
+
+def get_query_stats(top=20, sort="total"):
+    return stats.snapshot(top, sort)
+
+
+def reset_query_stats():
+    stats.reset()
+
+
+# ======================
+# 요청별 기록 / Server-Timing
+# ======================
+def _start_request():
+    g.query_log = []
+    g.request_started = time.perf_counter()
+
+
+def _server_timing(response):
+    log = g.pop("query_log", None)
+    started = g.pop("request_started", None)
+    if log is None or started is None:
+        return response
+
+    db_ms = sum(ms for ms, _ in log)
+    stats.record_request(request.endpoint or request.path, len(log), db_ms)
+
+    metrics = [f'db;dur={db_ms:.3f};desc="{len(log)} queries"',
+               f"app;dur={(time.perf_counter() - started) * 1000:.3f}"]
+    if SERVER_TIMING_DETAIL:
+        slowest = sorted(log, reverse=True)[:SERVER_TIMING_DETAIL_COUNT]
+        for i, (ms, fp) in enumerate(slowest):
+            desc = fp[:80].replace("\\", "\\\\").replace('"', '\\"')
+            metrics.append(f'q{i};dur={ms:.3f};desc="{desc}"')
+    response.headers["Server-Timing"] = ", ".join(metrics)
+    return response
+
+
+def init_app(app):
+    app.before_request(_start_request)
+    app.after_request(_server_timing)
@@ -0,0 +1,55 @@
+"""
+projection.py
+----------------------------------------
+응답 필드 선택 (?fields=)
+
+목록 화면이 실제로 그리는 필드만 요청해서 전송량과 JSON 직렬화 시간을 줄입니다.
+- ?fields=store_id,name,score            → 각 행에서 해당 키만
+- ?fields=store,reviews.rating,reviews.created_at
+                                         → 한 단계 아래(리스트/객체 안)의 키까지 지정
+fields 가 없으면 전체 응답을 그대로 보냅니다.
+"""
+
+from flask import request
+
+
+def parse_fields(allowed, arg="fields", args=None):
+    """
+    ?fields= 값을 {필드: None(전체) | {하위 필드, ...}} 로 바꿉니다. 없으면 None.
+    allowed : {필드: None | {허용 하위 필드}}  (하위 필드가 None 이면 하위 지정 불가)
+    args    : 쿼리 파라미터 (기본은 flask request.args, asgi_app 은 quart request.args 를 넘김)
+    허용되지 않은 필드가 있으면 ValueError
+    """
+    raw = (request.args if args is None else args).get(arg)
+    if raw is None:
+        return None
+
+    fields = {}
+    for item in raw.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        name, _, sub = item.partition(".")
+        if name not in allowed or (sub and sub not in (allowed[name] or ())):
+            raise ValueError(f"알 수 없는 필드입니다: {item}")
+        if not sub:
+            fields[name] = None
+        elif name not in fields:
+            fields[name] = {sub}
+        elif fields[name] is not None:
+            fields[name].add(sub)
+    if not fields:
+        raise ValueError("fields 에 필드를 하나 이상 지정하세요.")
+    return fields
+
+
+def project(obj, fields):
+    """dict / dict 리스트에서 fields 에 해당하는 키만 남긴 새 객체 (원본은 수정하지 않음)"""
+    if fields is None:
+        return obj
+    if isinstance(obj, list):
+        return [project(item, fields) for item in obj]
+    # 키 순서는 원본을 따름 (워커마다 set 순서가 달라도 같은 응답 바이트 → 같은 ETag)
+    if isinstance(fields, set):
+        return {k: v for k, v in obj.items() if k in fields}
+    return {k: project(v, fields[k]) for k, v in obj.items() if k in fields}
@@ -1,4 +1,11 @@
 import sys, io
+import os
+import threading
+import time
+import base64
+import decimal
+import json
+from datetime import date, datetime
 import pymysql
 from db import get_connection  
 
@@ -9,26 +16,959 @@ else:
 
 
 from db import get_connection
+from cache import TTLCache
+import geo
+import numpy as np
+import scoring
+import versions
 
-def get_rank(limit=20, offset=0, min_reviews=0, use_adv=True):
-    score_expr = "bayes_score" if use_adv else "avg_rating"
+# 계산된 랭킹 페이지 캐시. 리뷰/매장 쓰기 API 에서 invalidate_rank_cache() 로 비웁니다.
+rank_cache = TTLCache(maxsize=256, ttl=60)
 
-    sql = f"""
+# 베이지안 점수의 임계 리뷰 수 (v_store_scores_bayesian 의 m 과 동일)
+M_PRIOR = 5
+# 전체 평균 C 가 이 값 이상 바뀌면 모든 매장의 bayes_score 를 다시 계산 (refresh_global_score)
+BAYES_C_TOLERANCE = 0.001
+# 모든 매장 점수를 다시 계산할 때 트랜잭션 하나에서 갱신할 매장 수
+RESCORE_CHUNK = 2000
+
+# 별점 단계 (store_rank_stats.cnt_1 ~ cnt_5)
+RATING_LEVELS = (1, 2, 3, 4, 5)
+
+# store_review_daily 에서 최근 30일 / 그 전 30일 / 최근 90일 합계를 구하는 집계 식 (별칭 d)
+# WHERE d.day > CURDATE() - INTERVAL 90 DAY 와 함께 사용 (매장당 최대 90행)
+REVIEW_WINDOW_COLUMNS = {
+    "sum_30d": "SUM(IF(d.day > CURDATE() - INTERVAL 30 DAY, d.rating_sum, 0))",
+    "cnt_30d": "SUM(IF(d.day > CURDATE() - INTERVAL 30 DAY, d.review_cnt, 0))",
+    "sum_prev_30d": "SUM(IF(d.day <= CURDATE() - INTERVAL 30 DAY"
+                    " AND d.day > CURDATE() - INTERVAL 60 DAY, d.rating_sum, 0))",
+    "cnt_prev_30d": "SUM(IF(d.day <= CURDATE() - INTERVAL 30 DAY"
+                    " AND d.day > CURDATE() - INTERVAL 60 DAY, d.review_cnt, 0))",
+    "sum_90d": "SUM(d.rating_sum)",
+    "cnt_90d": "SUM(d.review_cnt)",
+}
+
+# 점수 방식(scoring.py) 파라미터 범위
+SCORE_M_MAX = 1000
+SCORE_DAYS_MAX = 3650
+
+# 카테고리별 상위 매장(get_category_leaders)으로 돌려주는 최대 매장 수
+LEADERBOARD_SIZE = 100
+
+# 내 주변 랭킹: 종합 점수(combined)는 GEO_HALF_KM 멀어질 때마다 점수가 절반이 됨
+GEO_HALF_KM = 2.0
+# 반경 안 매장이 이보다 많으면 IN (...) 대신 집계 테이블 전체를 읽어서 거름
+GEO_IN_LIMIT = 2000
+
+
+# ======================
+# 랭킹 집계 테이블(store_rank_stats) 증분 갱신
+# - 호출한 쪽의 커서/트랜잭션 안에서 실행되고, commit 은 호출한 쪽에서 합니다.
+# - *_steps 제너레이터는 실행할 (sql, params) 를 차례로 내놓고 fetchone() 결과를 받습니다.
+#   동기 커서는 run_steps(), 비동기 커서(asgi_app)는 run_steps_async() 로 실행합니다.
+# - 잠금 순서 (교착 상태 방지): (review 행) → review_global_stats → store_rank_stats(store_id 순)
+#   → store_review_daily → resource_version(이름순). 모든 쓰기가 이 순서를 지킵니다.
+#   리뷰 삭제는 review 행을 FOR UPDATE 로 잠그고 DELETE 가 1행일 때만 집계에서 뺍니다.
+# - 쓰기 트랜잭션은 자기 매장 점수만 현재 c_snapshot 으로 계산하고,
+#   C 가 바뀌어 모든 매장을 다시 계산하는 일은 백그라운드(refresh_global_score)에서
+#   RESCORE_CHUNK 개씩 짧은 트랜잭션으로 나눠 합니다.
+# ======================
+def run_steps(cur, steps):
+    row = None
+    while True:
+        try:
+            sql, params = steps.send(row)
+        except StopIteration:
+            return
+        cur.execute(sql, params)
+        row = cur.fetchone()
+
+
+def _global_delta_steps(rating_sum, review_cnt):
+    """전체 합계를 바꾸고(이 행을 가장 먼저 잠금) 쓰기 트랜잭션에서 쓸 c_snapshot 을 돌려받습니다."""
+    yield ("""
+        UPDATE review_global_stats
+        SET rating_sum = rating_sum + %s,
+            review_cnt = review_cnt + %s
+        WHERE id = 1
+    """, (rating_sum, review_cnt))
+    g = yield ("SELECT c_snapshot FROM review_global_stats WHERE id = 1", ())
+    return float(g["c_snapshot"]) if g else 0.0
+
+
+def _store_score_steps(store_ids, c_used):
+    """store_ids 매장의 avg_rating / bayes_score 를 c_used 로 다시 계산"""
+    placeholders = ", ".join(["%s"] * len(store_ids))
+    yield (f"""
+        UPDATE store_rank_stats
+        SET avg_rating  = IF(review_cnt > 0, rating_sum / review_cnt, 0),
+            bayes_score = (rating_sum + %s * %s) / (review_cnt + %s)
+        WHERE store_id IN ({placeholders})
+    """, (M_PRIOR, c_used, M_PRIOR, *store_ids))
+
+
+def review_delta_steps(store_id, rating, sign=1, created_at=None):
+    yield from review_batch_steps([(store_id, rating, created_at, sign)])
+
+
+def review_batch_steps(reviews):
+    """
+    여러 리뷰의 작성/삭제를 집계에 한 번에 반영합니다.
+    reviews : [(store_id, rating, created_at, sign), ...]
+              created_at 이 None 이면 지금 작성된 리뷰, sign 은 작성 1 / 삭제 -1
+    - store_rank_stats   : 매장별 합계 + 별점(1~5)별 개수
+    - store_review_daily : 매장별 일자 합계 (최근 30/90일 통계용)
+    """
+    deltas, daily = {}, {}
+    for store_id, rating, created_at, sign in reviews:
+        d = deltas.setdefault(store_id, [0] * (2 + len(RATING_LEVELS)))
+        d[0] += sign * (rating or 0)
+        d[1] += sign
+        if rating in RATING_LEVELS:
+            d[1 + rating] += sign
+        day = created_at.date() if isinstance(created_at, datetime) else created_at
+        key = (store_id, day)
+        dd = daily.setdefault(key, [0, 0])
+        dd[0] += sign * (rating or 0)
+        dd[1] += sign
+    if not deltas:
+        return
+
+    c_used = yield from _global_delta_steps(sum(d[0] for d in deltas.values()),
+                                            sum(d[1] for d in deltas.values()))
+
+    store_ids = sorted(deltas)
+    hist_cols = [f"cnt_{r}" for r in RATING_LEVELS]
+    values = ", ".join([f"({', '.join(['%s'] * (3 + len(hist_cols)))})"] * len(store_ids))
+    params = []
+    for sid in store_ids:
+        params.extend((sid, *deltas[sid]))
+    updates = ",\n            ".join(f"{col} = {col} + VALUES({col})"
+                                     for col in ["rating_sum", "review_cnt", *hist_cols])
+    yield (f"""
+        INSERT INTO store_rank_stats (store_id, rating_sum, review_cnt, {", ".join(hist_cols)})
+        VALUES {values}
+        ON DUPLICATE KEY UPDATE
+            {updates}
+    """, params)
+
+    # 잠금 순서를 맞추기 위해 정렬 (오늘 작성분(None)은 DB 의 CURDATE() 로)
+    keys = sorted(daily, key=lambda k: (k[0], k[1] is None, k[1] or date.min))
+    params = []
+    for sid, day in keys:
+        params.extend((sid, day, *daily[(sid, day)]))
+    yield (f"""
+        INSERT INTO store_review_daily (store_id, day, rating_sum, review_cnt)
+        VALUES {", ".join(["(%s, COALESCE(%s, CURDATE()), %s, %s)"] * len(keys))}
+        ON DUPLICATE KEY UPDATE
+            rating_sum = rating_sum + VALUES(rating_sum),
+            review_cnt = review_cnt + VALUES(review_cnt)
+    """, params)
+
+    yield from _store_score_steps(store_ids, c_used)
+    # 상세 페이지(최근 리뷰)와 랭킹 응답의 ETag 를 바꿈
+    yield from versions.bump_steps("rank", *(f"store:{sid}" for sid in store_ids))
+
+
+def remove_store_steps(store_id):
+    # 잠금 순서를 지키기 위해 전체 합계 행을 먼저 잠근 뒤 매장 집계를 읽음
+    yield ("SELECT id FROM review_global_stats WHERE id = 1 FOR UPDATE", ())
+    row = yield ("""
+        SELECT rating_sum, review_cnt
+        FROM store_rank_stats
+        WHERE store_id = %s
+        FOR UPDATE
+    """, (store_id,))
+    if not row or not row["review_cnt"]:
+        return
+    yield ("""
+        UPDATE review_global_stats
+        SET rating_sum = rating_sum - %s,
+            review_cnt = review_cnt - %s
+        WHERE id = 1
+    """, (row["rating_sum"], row["review_cnt"]))
+    yield ("DELETE FROM store_rank_stats WHERE store_id = %s", (store_id,))
+    # C 가 바뀌었으면 백그라운드 refresh_global_score() 가 모든 매장 점수를 다시 계산
+
+
+def apply_review_delta(cur, store_id, rating, sign=1, created_at=None):
+    """
+    리뷰 1건 작성(sign=1) / 삭제(sign=-1)를 집계에 반영합니다.
+    삭제할 때는 최근 30/90일 통계에서 빼기 위해 리뷰의 created_at 을 넘겨주세요.
+    """
+    run_steps(cur, review_delta_steps(store_id, rating, sign, created_at))
+
+
+def apply_review_batch(cur, reviews):
+    """리뷰 여러 건 [(store_id, rating, created_at, sign), ...] 을 집계에 한 번에 반영합니다."""
+    run_steps(cur, review_batch_steps(reviews))
+
+
+def remove_store_stats(cur, store_id):
+    """매장 삭제 전에 호출: 해당 매장의 리뷰를 전체 평균에서 빼 둡니다."""
+    run_steps(cur, remove_store_steps(store_id))
+
+
+def rebuild_rank_stats():
+    """store / review 테이블에서 랭킹 집계를 처음부터 다시 만듭니다 (점검/복구용)."""
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("""
+                INSERT INTO store_rank_stats
+                    (store_id, category_id, rating_sum, review_cnt,
+                     cnt_1, cnt_2, cnt_3, cnt_4, cnt_5)
+                SELECT s.store_id, s.category_id, COALESCE(SUM(r.rating), 0), COUNT(r.review_id),
+                       COUNT(IF(r.rating = 1, 1, NULL)), COUNT(IF(r.rating = 2, 1, NULL)),
+                       COUNT(IF(r.rating = 3, 1, NULL)), COUNT(IF(r.rating = 4, 1, NULL)),
+                       COUNT(IF(r.rating = 5, 1, NULL))
+                FROM store s
+                LEFT JOIN review r ON r.store_id = s.store_id
+                GROUP BY s.store_id, s.category_id
+                ON DUPLICATE KEY UPDATE
+                    category_id = VALUES(category_id),
+                    rating_sum = VALUES(rating_sum),
+                    review_cnt = VALUES(review_cnt),
+                    cnt_1 = VALUES(cnt_1),
+                    cnt_2 = VALUES(cnt_2),
+                    cnt_3 = VALUES(cnt_3),
+                    cnt_4 = VALUES(cnt_4),
+                    cnt_5 = VALUES(cnt_5)
+            """)
+            cur.execute("DELETE FROM store_review_daily")
+            cur.execute("""
+                INSERT INTO store_review_daily (store_id, day, rating_sum, review_cnt)
+                SELECT store_id, DATE(created_at), COALESCE(SUM(rating), 0), COUNT(*)
+                FROM review
+                GROUP BY store_id, DATE(created_at)
+            """)
+            cur.execute("""
+                INSERT INTO review_global_stats (id, rating_sum, review_cnt)
+                SELECT 1, COALESCE(SUM(rating), 0), COUNT(review_id)
+                FROM review
+                ON DUPLICATE KEY UPDATE
+                    rating_sum = VALUES(rating_sum),
+                    review_cnt = VALUES(review_cnt)
+            """)
+            versions.bump(cur, "rank")
+        conn.commit()
+    finally:
+        conn.close()
+    refresh_global_score(force=True)
+    invalidate_rank_cache()
+
+
+def refresh_global_score(force=False):
+    """
+    전체 평균 C 가 c_snapshot 과 BAYES_C_TOLERANCE 이상 다르면(force 면 항상)
+    c_snapshot 을 바꾸고 모든 매장의 bayes_score 를 다시 계산합니다. 다시 계산했으면 True.
+    - c_snapshot 변경은 짧은 트랜잭션으로 먼저 commit 하므로 그 뒤의 쓰기는 새 C 를 씀
+    - 매장 점수는 store_id 순으로 RESCORE_CHUNK 개씩 나눠 commit (쓰기 요청을 오래 막지 않음)
+      다 끝날 때까지 아직 안 바뀐 매장은 이전 C 로 계산된 점수입니다.
+    백그라운드 워커(RankSnapshotWorker)가 'rank' 버전이 바뀔 때마다 호출합니다.
+    """
+    def drift(g):
+        c_new = float(g["rating_sum"]) / g["review_cnt"] if g["review_cnt"] else 0.0
+        return abs(c_new - float(g["c_snapshot"])) >= BAYES_C_TOLERANCE
+
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            # 대부분은 바뀐 것이 없으므로 잠그지 않고 먼저 확인 (전체 합계 행은 모든 쓰기가 잠그는 행)
+            sql = "SELECT rating_sum, review_cnt, c_snapshot FROM review_global_stats WHERE id = 1"
+            cur.execute(sql)
+            g = cur.fetchone()
+            if not force and (not g or not drift(g)):
+                conn.commit()
+                return False
+            cur.execute(sql + " FOR UPDATE")
+            g = cur.fetchone()
+            if not g or (not force and not drift(g)):
+                conn.commit()
+                return False
+            c_new = float(g["rating_sum"]) / g["review_cnt"] if g["review_cnt"] else 0.0
+            cur.execute("UPDATE review_global_stats SET c_snapshot = %s WHERE id = 1", (c_new,))
+            conn.commit()
+
+            last = 0
+            while True:
+                cur.execute("""
+                    SELECT MAX(store_id) AS last
+                    FROM (
+                        SELECT store_id FROM store_rank_stats
+                        WHERE store_id > %s
+                        ORDER BY store_id
+                        LIMIT %s
+                    ) chunk
+                """, (last, RESCORE_CHUNK))
+                upto = cur.fetchone()["last"]
+                if upto is None:
+                    break
+                cur.execute("""
+                    UPDATE store_rank_stats
+                    SET avg_rating  = IF(review_cnt > 0, rating_sum / review_cnt, 0),
+                        bayes_score = (rating_sum + %s * %s) / (review_cnt + %s)
+                    WHERE store_id > %s AND store_id <= %s
+                """, (M_PRIOR, c_new, M_PRIOR, last, upto))
+                conn.commit()
+                last = upto
+
+            versions.bump(cur, "rank")
+            conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    invalidate_rank_cache()
+    return True
+
+
+def shape_review_stats(row, window=None):
+    """
+    별점 분포 + 최근 평점 통계
+    row    : cnt_1 ~ cnt_5 를 가진 행 (store_rank_stats)
+    window : REVIEW_WINDOW_COLUMNS 값을 가진 dict (없으면 최근 리뷰 없음)
+    → {"rating_hist": [1점 개수, ..., 5점 개수], "avg_30d", "cnt_30d", "avg_90d", "cnt_90d", "trend_30d"}
+      trend_30d = 최근 30일 평균 - 그 전 30일 평균 (둘 중 하나라도 리뷰가 없으면 None)
+    """
+    window = window or {}
+
+    def avg(prefix):
+        cnt = int(window.get(f"cnt_{prefix}") or 0)
+        return (round(float(window[f"sum_{prefix}"]) / cnt, 4) if cnt > 0 else None), cnt
+
+    avg_30d, cnt_30d = avg("30d")
+    avg_prev, _ = avg("prev_30d")
+    avg_90d, cnt_90d = avg("90d")
+    return {
+        "rating_hist": [int(row.get(f"cnt_{r}") or 0) for r in RATING_LEVELS],
+        "avg_30d": avg_30d,
+        "cnt_30d": cnt_30d,
+        "avg_90d": avg_90d,
+        "cnt_90d": cnt_90d,
+        "trend_30d": round(avg_30d - avg_prev, 4) if avg_30d is not None and avg_prev is not None else None,
+    }
+
+
+def get_review_stats(store_ids):
+    """
+    매장들의 별점 분포 / 최근 평점 통계를 {store_id: shape_review_stats()} 로 반환합니다.
+    review 테이블은 읽지 않고 store_rank_stats + store_review_daily(매장당 최대 90행)만 읽습니다.
+    """
+    store_ids = sorted(set(store_ids))
+    if not store_ids:
+        return {}
+    key = ("review_stats", tuple(store_ids))
+    cached = rank_cache.get(key)
+    if cached is not None:
+        return cached
+
+    generation = rank_cache.generation
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            results = []
+            for sql, params in review_stats_queries(store_ids):
+                cur.execute(sql, params)
+                results.append(cur.fetchall())
+    finally:
+        conn.close()
+
+    result = shape_review_stats_rows(*results)
+    rank_cache.set(key, result, generation)
+    return result
+
+
+def review_stats_queries(store_ids):
+    """get_review_stats() 가 실행하는 (sql, params) 2개: 별점 분포, 최근 90일 합계 (asgi_app 과 공유)"""
+    placeholders = ", ".join(["%s"] * len(store_ids))
+    window_cols = ", ".join(f"{expr} AS {name}" for name, expr in REVIEW_WINDOW_COLUMNS.items())
+    return [
+        (f"""
+            SELECT store_id, cnt_1, cnt_2, cnt_3, cnt_4, cnt_5
+            FROM store_rank_stats
+            WHERE store_id IN ({placeholders})
+        """, store_ids),
+        (f"""
+            SELECT d.store_id, {window_cols}
+            FROM store_review_daily d
+            WHERE d.store_id IN ({placeholders})
+              AND d.day > CURDATE() - INTERVAL 90 DAY
+            GROUP BY d.store_id
+        """, store_ids),
+    ]
+
+
+def shape_review_stats_rows(hists, windows):
+    """review_stats_queries() 결과 → {store_id: shape_review_stats()}"""
+    windows = {row["store_id"]: row for row in windows}
+    return {row["store_id"]: shape_review_stats(row, windows.get(row["store_id"]))
+            for row in hists}
+
+
+def attach_review_stats(rows, stats=None):
+    """
+    랭킹 행마다 get_review_stats() 값을 붙인 새 리스트 (캐시와 공유하는 원본 행은 수정하지 않음)
+    stats 를 주면 DB 를 읽지 않고 그 값을 씁니다 (asgi_app 이 비동기로 읽은 값).
+    """
+    if stats is None:
+        stats = get_review_stats(row["store_id"] for row in rows)
+    empty = shape_review_stats({})
+    return [{**row, **stats.get(row["store_id"], empty)} for row in rows]
+
+
+def invalidate_rank_cache():
+    """랭킹 캐시와 이 프로세스의 리소스 버전 캐시(versions)를 비우고 백그라운드 워커를 깨웁니다."""
+    rank_cache.clear()
+    versions.clear_local()
+    snapshots.notify()
+
+
+def get_rank_cache_stats():
+    return rank_cache.get_stats()
+
+
+def get_rank(limit=20, offset=0, min_reviews=0, use_adv=True, category_id=None):
+    """
+    랭킹 페이지 조회. 결과는 rank_cache 에 저장되며
+    반환된 리스트는 캐시와 공유되므로 수정하지 말고 복사해서 사용하세요.
+    category_id 를 주면 해당 카테고리 안의 랭킹입니다 (idx_rank_cat_* 인덱스 범위 조회).
+    랭킹 스냅샷이 있으면 DB 대신 스냅샷에서 잘라서 돌려줍니다.
+    """
+    snap = current_snapshot()
+    if snap is not None:
+        return snap.ranked[use_adv].filter(min_reviews, category_id).rows(offset, limit)
+
+    key = ("rank", offset, limit, min_reviews, use_adv, category_id)
+    rows = rank_cache.get(key)
+    if rows is not None:
+        return rows
+
+    generation = rank_cache.generation
+    rows = _query_rank(limit, offset, min_reviews, use_adv, category_id=category_id)
+    rank_cache.set(key, rows, generation)
+    return rows
+
+
+def parse_score_mode(m=None, half_life_days=None, window_days=None, use_adv=True):
+    """
+    점수 방식 파라미터 검사. 기본 방식(베이지안 m=M_PRIOR 또는 단순 평균, 감쇠/기간 없음)이면
+    None 을 반환하고(집계 테이블 인덱스로 조회), 아니면 (m, half_life_days, window_days) 를 반환합니다.
+    값이 범위를 벗어나면 ValueError.
+    """
+    if m is None:
+        m = M_PRIOR if use_adv else 0
+    if not (0 <= m <= SCORE_M_MAX):
+        raise ValueError(f"m 은 0 이상 {SCORE_M_MAX} 이하여야 합니다.")
+    if half_life_days is not None and not (0 < half_life_days <= SCORE_DAYS_MAX):
+        raise ValueError(f"half_life_days 는 0 초과 {SCORE_DAYS_MAX} 이하여야 합니다.")
+    if window_days is not None and not (1 <= window_days <= SCORE_DAYS_MAX):
+        raise ValueError(f"window_days 는 1 이상 {SCORE_DAYS_MAX} 이하여야 합니다.")
+    if half_life_days is None and window_days is None and m == (M_PRIOR if use_adv else 0):
+        return None
+    return (float(m), half_life_days, window_days)
+
+
+def needs_daily(mode):
+    """감쇠/기간을 쓰는 점수 방식이면 True (일자 합계가 필요, 아니면 매장별 합계로 충분)"""
+    return mode is not None and (mode[1] is not None or mode[2] is not None)
+
+
+def _score_aggregates(daily=True):
+    """scoring 엔진용 매장/일자 합계 배열 (rank_cache 에 저장, 리뷰/매장 쓰기 시 다시 읽음)"""
+    key = ("score_data", daily)
+    data = rank_cache.get(key)
+    if data is None:
+        generation = rank_cache.generation
+        data = scoring.load_aggregates() if daily else scoring.load_totals()
+        rank_cache.set(key, data, generation)
+    return data
+
+
+def get_scored_rank(mode, limit=20, offset=0, min_reviews=0, category_id=None):
+    """
+    parse_score_mode() 가 돌려준 점수 방식으로 계산한 랭킹 페이지.
+    정렬 결과(RankedList)를 캐시해 두고 페이지마다 잘라서 행을 만듭니다.
+    감쇠/기간 방식은 일자 합계 스냅샷(current_daily), 나머지는 랭킹 스냅샷을 씁니다.
+    """
+    snap = current_daily() if needs_daily(mode) else current_snapshot()
+    if snap is not None:
+        return snap.scored(mode, min_reviews, category_id).rows(offset, limit)
+
+    key = ("scored", mode, min_reviews, category_id)
+    ranked = rank_cache.get(key)
+    if ranked is None:
+        generation = rank_cache.generation
+        m, half_life_days, window_days = mode
+        ranked = _score_aggregates(needs_daily(mode)).rank(
+            m, half_life_days, window_days, min_reviews=min_reviews, category_id=category_id)
+        rank_cache.set(key, ranked, generation)
+    return ranked.rows(offset, limit)
+
+
+def get_category_leaders(k=5):
+    """
+    카테고리별 상위 k개 매장 (카테고리 탭 첫 화면용)
+    [{"category_id", "name", "items": [...]}, ...]
+    랭킹 스냅샷이 있으면 스냅샷에서, 없으면 카테고리마다 인덱스(category_id, bayes_score, review_cnt)
+    앞쪽 k행만 읽는 LATERAL 조인으로 조회합니다 (쿼리 1회).
+    """
+    k = min(k, LEADERBOARD_SIZE)
+    snap = current_snapshot()
+    if snap is not None:
+        ranked = snap.ranked[True]
+        return [{"category_id": c["category_id"], "name": c["name"],
+                 "items": ranked.filter(0, c["category_id"]).rows(0, k)}
+                for c in _categories()]
+
+    key = ("leaders", k)
+    result = rank_cache.get(key)
+    if result is not None:
+        return result
+
+    generation = rank_cache.generation
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("""
+                SELECT
+                    c.category_id,
+                    c.name AS category_name,
+                    top_k.store_id,
+                    top_k.name,
+                    top_k.distance_km,
+                    top_k.review_cnt,
+                    top_k.avg_rating,
+                    top_k.score
+                FROM category c
+                LEFT JOIN LATERAL (
+                    SELECT s.store_id, s.name, s.distance_km,
+                           rs.review_cnt, rs.avg_rating, rs.bayes_score AS score
+                    FROM store_rank_stats rs
+                    JOIN store s ON s.store_id = rs.store_id
+                    WHERE rs.category_id = c.category_id
+                    ORDER BY rs.bayes_score DESC, rs.review_cnt DESC, rs.store_id DESC
+                    LIMIT %s
+                ) top_k ON TRUE
+                ORDER BY c.category_id, top_k.score DESC, top_k.review_cnt DESC, top_k.store_id DESC
+            """, (k,))
+            rows = cur.fetchall()
+    finally:
+        conn.close()
+
+    result, by_id = [], {}
+    for row in rows:
+        category_id = row.pop("category_id")
+        category_name = row.pop("category_name")
+        if category_id not in by_id:
+            by_id[category_id] = {"category_id": category_id, "name": category_name, "items": []}
+            result.append(by_id[category_id])
+        if row["store_id"] is not None:
+            by_id[category_id]["items"].append(row)
+
+    rank_cache.set(key, result, generation)
+    return result
+
+
+def _categories():
+    """[{"category_id", "name"}, ...] (rank_cache 에 저장)"""
+    rows = rank_cache.get(("categories",))
+    if rows is None:
+        generation = rank_cache.generation
+        conn = get_connection()
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT category_id, name FROM category ORDER BY category_id")
+                rows = cur.fetchall()
+        finally:
+            conn.close()
+        rank_cache.set(("categories",), rows, generation)
+    return rows
+
+
+RANK_COUNT_SQL = "SELECT COUNT(*) AS cnt FROM store"
+
+
+def get_rank_count(category_id=None):
+    """랭킹 대상 매장 수 (스냅샷 또는 캐시 사용)"""
+    snap = current_snapshot()
+    if snap is not None:
+        return snap.count(category_id)
+
+    key = ("count", category_id)
+    cnt = rank_cache.get(key)
+    if cnt is not None:
+        return cnt
+
+    generation = rank_cache.generation
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            if category_id is None:
+                cur.execute(RANK_COUNT_SQL)
+            else:
+                cur.execute(RANK_COUNT_SQL + " WHERE category_id = %s", (category_id,))
+            cnt = cur.fetchone()["cnt"]
+    finally:
+        conn.close()
+    rank_cache.set(key, cnt, generation)
+    return cnt
+
+
+def get_rank_page(limit=20, cursor=None, min_reviews=0, use_adv=True, category_id=None):
+    """
+    커서(keyset) 방식 랭킹 조회.
+    cursor 는 이전 페이지 마지막 행의 (score, review_cnt, store_id) 를 담은 문자열이며
+    (rows, next_cursor) 를 반환합니다. 마지막 페이지면 next_cursor 는 None 입니다.
+    잘못된 cursor 는 ValueError 를 발생시킵니다.
+    """
+    after = decode_cursor(cursor, use_adv) if cursor else None
+
+    snap = current_snapshot()
+    if snap is not None:
+        ranked = snap.ranked[use_adv].filter(min_reviews, category_id)
+        if after is not None:
+            ranked = ranked.after(float(after[0]), after[1], after[2])
+        rows = ranked.rows(0, limit)
+        return rows, (encode_cursor(rows[-1], use_adv) if len(rows) == limit else None)
+
+    key = ("rank_cursor", cursor or "", limit, min_reviews, use_adv, category_id)
+    page = rank_cache.get(key)
+    if page is not None:
+        return page
+
+    generation = rank_cache.generation
+    rows = _query_rank(limit, 0, min_reviews, use_adv, after=after, category_id=category_id)
+    next_cursor = encode_cursor(rows[-1], use_adv) if len(rows) == limit else None
+    page = (rows, next_cursor)
+    rank_cache.set(key, page, generation)
+    return page
+
+
+def get_rank_near(lat, lng, radius_km, limit=20, offset=0, min_reviews=0,
+                  use_adv=True, sort="score", category_id=None):
+    """
+    (lat, lng) 반경 radius_km 안의 매장 랭킹 (category_id 를 주면 해당 카테고리만).
+    - sort="score"    : 점수(bayes/평균) 순
+    - sort="combined" : score * 0.5 ** (거리 / GEO_HALF_KM) 순 (가까울수록 유리)
+    각 행의 distance_km 는 요청 위치로부터의 거리입니다.
+    """
+    snap = current_snapshot()
+    # 약 10m 단위로 반올림한 위치를 캐시 키로 사용 (스냅샷이 있으면 캐시하지 않음)
+    key = ("near", round(lat, 4), round(lng, 4), radius_km, sort,
+           offset, limit, min_reviews, use_adv, category_id)
+    rows = rank_cache.get(key) if snap is None else None
+    if rows is not None:
+        return rows
+
+    generation = rank_cache.generation
+    distances = dict(geo.within(lat, lng, radius_km))
+    if snap is not None:
+        rows = snap.ranked[use_adv].rows_for(distances, min_reviews, category_id)
+    else:
+        rows = (_query_rank_stores(distances, min_reviews, use_adv, category_id)
+                if distances else [])
+
+    rows = shape_rank_near(rows, distances, sort, offset, limit)
+    if snap is None:
+        rank_cache.set(key, rows, generation)
+    return rows
+
+
+def shape_rank_near(rows, distances, sort, offset, limit):
+    """
+    반경 안 매장 행에 거리(및 combined_score)를 붙이고 정렬해서 한 페이지를 자릅니다.
+    distances : {store_id: 거리 km} (geo.within), 여기에 없는 행은 버림
+    """
+    rows = [row for row in rows if row["store_id"] in distances]
+    for row in rows:
+        d = distances[row["store_id"]]
+        row["distance_km"] = round(d, 3)
+        if sort == "combined":
+            row["combined_score"] = round(float(row["score"]) * 0.5 ** (d / GEO_HALF_KM), 6)
+
+    if sort == "combined":
+        rows.sort(key=lambda r: (-r["combined_score"], r["distance_km"], -r["store_id"]))
+    else:
+        rows.sort(key=lambda r: (-r["score"], -r["review_cnt"], -r["store_id"]))
+    return rows[offset:offset + limit]
+
+
+def _query_rank_stores(store_ids, min_reviews, use_adv, category_id=None):
+    """store_ids 매장들의 랭킹 행 (정렬 없음, store_ids 밖의 행이 섞일 수 있음)"""
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(*build_rank_stores_query(store_ids, min_reviews, use_adv, category_id))
+            return cur.fetchall()
+    finally:
+        conn.close()
+
+
+def build_rank_stores_query(store_ids, min_reviews, use_adv, category_id=None):
+    """
+    store_ids 매장들의 랭킹 행을 읽는 (sql, params). 동기/비동기(asgi_app) 모드가 함께 사용합니다.
+    매장이 GEO_IN_LIMIT 개보다 많으면 IN (...) 없이 읽으므로 호출한 쪽에서 store_ids 로 걸러야 합니다.
+    """
+    score_col = "rs.bayes_score" if use_adv else "rs.avg_rating"
+    params = [min_reviews]
+    where = "rs.review_cnt >= %s"
+    if category_id is not None:
+        where += " AND rs.category_id = %s"
+        params.append(category_id)
+    if len(store_ids) <= GEO_IN_LIMIT:
+        where += f" AND rs.store_id IN ({', '.join(['%s'] * len(store_ids))})"
+        params.extend(store_ids)
+
+    return f"""
         SELECT
-            store_id,
-            name,
-            distance_km,
-            review_cnt,
-            avg_rating,
-            {score_expr} AS score
-        FROM v_store_ranking
-        WHERE review_cnt >= %s
-        ORDER BY score DESC, review_cnt DESC
-        LIMIT 20 OFFSET %s
+            s.store_id,
+            s.name,
+            rs.review_cnt,
+            rs.avg_rating,
+            {score_col} AS score
+        FROM store_rank_stats rs
+        JOIN store s ON s.store_id = rs.store_id
+        WHERE {where}
+    """, params
+
+
+# ======================
+# 랭킹 스냅샷 (백그라운드 재계산)
+# - 프로세스마다 워커 스레드 하나가 전체 랭킹을 계산해 정렬된 스냅샷(RankSnapshot)을 만들고
+#   참조를 바꿔 끼웁니다. 만들어진 스냅샷은 바꾸지 않으므로 조회(get_rank / get_rank_page /
+#   get_rank_near / get_rank_count / get_scored_rank)는 락 없이 메모리에서 잘라서 돌려줍니다.
+# - 랭킹 스냅샷은 store + store_rank_stats(매장마다 1행, scoring.load_totals) 로 만듭니다.
+#   감쇠/기간 점수 방식에 필요한 일자 합계(store_review_daily 전체)는 그 방식이 조회될 때만
+#   따로 읽어 일자 합계 스냅샷(daily)으로 두고, 더 긴 간격(RANK_DAILY_*)으로 갱신합니다.
+# - 이 프로세스의 쓰기(invalidate_rank_cache)는 바로 깨우고, 다른 워커 프로세스의 쓰기는
+#   'rank' 리소스 버전을 RANK_SNAPSHOT_POLL 초마다 확인해 반영합니다.
+# - 다시 계산하는 간격은 지난 계산에 걸린 시간의 RANK_SNAPSHOT_LOAD_FACTOR 배 이상이므로
+#   매장이 많아 계산이 느려져도 워커마다 DB 를 읽는 비율은 일정하게 유지됩니다.
+# - 스냅샷이 RANK_SNAPSHOT_MAX_AGE 초보다 오래되면(DB 오류 등) 쓰지 않고 DB 에서 읽습니다.
+# - 응답의 X-Rank-Snapshot-Age 헤더 = 스냅샷 계산을 시작한 뒤 지난 시간(초)
+# ======================
+RANK_SNAPSHOT_ENABLED = True
+RANK_SNAPSHOT_POLL = 1.0
+# 쓰기가 몰려도 이 간격(초)보다 자주 다시 계산하지 않음
+RANK_SNAPSHOT_MIN_INTERVAL = 1.0
+# 다시 계산하기 전에 지난 계산 시간의 이 배수만큼은 기다림 (DB 읽기가 전체 시간의 1/10 이하)
+RANK_SNAPSHOT_LOAD_FACTOR = 10
+# 변경이 없어도 이 간격(초)마다 다시 계산 (버전을 올리지 않는 직접 SQL 수정 대비)
+RANK_SNAPSHOT_REFRESH = 60.0
+RANK_SNAPSHOT_MAX_AGE = 180.0
+# 스냅샷마다 기억해 둘 점수 방식(get_scored_rank) 정렬 결과 수
+RANK_SNAPSHOT_SCORED_MAX = 32
+# 일자 합계 스냅샷 (감쇠/기간 점수 방식용)
+RANK_DAILY_MIN_INTERVAL = 30.0
+RANK_DAILY_REFRESH = 300.0
+RANK_DAILY_MAX_AGE = 900.0
+# 이 시간(초) 동안 감쇠/기간 방식 조회가 없으면 일자 합계를 더 이상 다시 읽지 않음
+RANK_DAILY_IDLE = 600.0
+
+
+class RankSnapshot:
+    """
+    한 시점의 전체 랭킹.
+    ranked[True]  : bayes 점수(m=M_PRIOR) 순, ranked[False] : 평균 평점 순 (scoring.RankedList)
+    version       : 계산 직전에 읽은 'rank' 리소스 버전 (ETag 용)
+    build_seconds : 데이터를 읽고 정렬하는 데 걸린 시간 (다음 계산까지의 간격에 사용)
+    day           : 계산한 날짜 (일자 합계의 '지난 일수' 는 날짜가 바뀌면 맞지 않음)
+    """
+
+    def __init__(self, data, version, updated_at, started_at):
+        self.data = data
+        self.version = version
+        self.updated_at = updated_at
+        self.built_at = started_at
+        self.day = date.today()
+        self.ranked = {True: data.rank(M_PRIOR), False: data.rank(0)}
+
+        categories = data.category[data.exists]
+        ids, counts = np.unique(categories[categories >= 0], return_counts=True)
+        self._counts = dict(zip(ids.tolist(), counts.tolist()))
+        self._counts[None] = len(data)
+
+        self._scored = {}
+        self._lock = threading.Lock()
+        self.build_seconds = time.time() - started_at
+
+    def age(self):
+        return time.time() - self.built_at
+
+    def interval(self, minimum, maximum):
+        """다시 계산하기까지 기다릴 시간: 계산 시간의 RANK_SNAPSHOT_LOAD_FACTOR 배 (minimum ~ maximum)"""
+        return min(max(minimum, self.build_seconds * RANK_SNAPSHOT_LOAD_FACTOR), maximum)
+
+    def count(self, category_id=None):
+        return self._counts.get(category_id, 0)
+
+    def scored(self, mode, min_reviews=0, category_id=None):
+        key = (mode, min_reviews, category_id)
+        ranked = self._scored.get(key)
+        if ranked is None:
+            m, half_life_days, window_days = mode
+            ranked = self.data.rank(m, half_life_days, window_days,
+                                    min_reviews=min_reviews, category_id=category_id)
+            with self._lock:
+                if len(self._scored) >= RANK_SNAPSHOT_SCORED_MAX:
+                    self._scored.clear()
+                self._scored[key] = ranked
+        return ranked
+
+
+class RankSnapshotWorker:
+    """
+    프로세스마다 하나인 랭킹 백그라운드 스레드
+    - 'rank' 버전이 바뀌면 refresh_global_score() (C 가 바뀌었으면 전체 점수 재계산)
+    - 스냅샷을 쓰는 프로세스(current_snapshot() 호출)면 랭킹 스냅샷 재계산
+    - 최근 RANK_DAILY_IDLE 초 안에 감쇠/기간 방식 조회(current_daily() 호출)가 있었으면 일자 합계 스냅샷 재계산
+    """
+
+    def __init__(self):
+        self.snapshot = None
+        self.daily = None
+        self.wanted = False
+        self.daily_wanted_at = 0.0
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._pid = None
+        self._maintained_version = None
+
+    def rebuild(self):
+        """랭킹 스냅샷을 새로 계산해서 바꿔 끼웁니다 (참조 대입 한 번이라 조회 쪽은 이전/새 것 중 하나만 봄)"""
+        self.snapshot = self._build(scoring.load_totals)
+        return self.snapshot
+
+    def rebuild_daily(self):
+        """일자 합계 스냅샷을 새로 계산해서 바꿔 끼웁니다"""
+        self.daily = self._build(scoring.load_aggregates)
+        return self.daily
+
+    def _build(self, load):
+        started_at = time.time()
+        # 데이터보다 버전을 먼저 읽어야 ETag 가 스냅샷 내용보다 새것이 되지 않음
+        versions.clear_local()
+        version, updated_at = versions.get_version("rank")
+        return RankSnapshot(load(), version, updated_at, started_at)
+
+    def ensure_started(self):
+        """이 프로세스에서 워커 스레드를 시작 (serve.py 가 fork 한 워커마다 따로 시작)"""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._wake.clear()
+            threading.Thread(target=self._run, name="rank-snapshot", daemon=True).start()
+
+    def notify(self):
+        """이 프로세스에서 랭킹 집계를 바꾼 뒤 호출 (invalidate_rank_cache)"""
+        self.ensure_started()
+        self._wake.set()
+
+    def _maintain(self, version, woke):
+        if woke or version != self._maintained_version:
+            self._maintained_version = version
+            refresh_global_score()
+
+    def _is_stale(self, snap, version, woke):
+        if snap is None:
+            return True
+        if snap.age() < snap.interval(RANK_SNAPSHOT_MIN_INTERVAL, RANK_SNAPSHOT_REFRESH):
+            return False
+        return woke or version != snap.version or snap.age() >= RANK_SNAPSHOT_REFRESH
+
+    def _is_daily_stale(self, daily, version):
+        if time.time() - self.daily_wanted_at > RANK_DAILY_IDLE:
+            return False
+        if daily is None or daily.day != date.today():
+            return True
+        if daily.age() < daily.interval(RANK_DAILY_MIN_INTERVAL, RANK_DAILY_REFRESH):
+            return False
+        return version != daily.version or daily.age() >= RANK_DAILY_REFRESH
+
+    def _run(self):
+        while True:
+            woke = self._wake.wait(RANK_SNAPSHOT_POLL)
+            self._wake.clear()
+            try:
+                version = versions.get_version("rank")[0]
+                self._maintain(version, woke)
+                if self.wanted and self._is_stale(self.snapshot, version, woke):
+                    self.rebuild()
+                if self._is_daily_stale(self.daily, version):
+                    self.rebuild_daily()
+            except Exception as e:
+                print(f"랭킹 백그라운드 작업 오류: {e}")
+
+
+snapshots = RankSnapshotWorker()
+
+
+def current_snapshot():
+    """쓸 수 있는 랭킹 스냅샷 (없거나 너무 오래됐으면 None → DB 에서 조회)"""
+    # 스냅샷을 끄더라도 워커는 점수 갱신(refresh_global_score)을 위해 시작
+    snapshots.ensure_started()
+    if not RANK_SNAPSHOT_ENABLED:
+        return None
+    snapshots.wanted = True
+    snap = snapshots.snapshot
+    if snap is None or snap.age() > RANK_SNAPSHOT_MAX_AGE:
+        return None
+    return snap
+
+
+def current_daily():
+    """
+    감쇠/기간 점수 방식용 일자 합계 스냅샷 (없거나 너무 오래됐으면 None → DB 에서 계산).
+    호출되면 워커가 RANK_DAILY_IDLE 초 동안 일자 합계를 읽어 둡니다.
     """
+    snapshots.ensure_started()
+    if not RANK_SNAPSHOT_ENABLED:
+        return None
+    snapshots.daily_wanted_at = time.time()
+    snap = snapshots.daily
+    if snap is None or snap.age() > RANK_DAILY_MAX_AGE or snap.day != date.today():
+        return None
+    return snap
+
+
+def snapshot_version(daily=False):
+    """versions.conditional(version=...) 용: 스냅샷으로 응답할 때는 스냅샷의 버전으로 ETag 를 만듦"""
+    snap = current_daily() if daily else current_snapshot()
+    return (snap.version, snap.updated_at) if snap is not None else None
+
+
+def encode_cursor(row, use_adv):
+    raw = json.dumps([
+        "b" if use_adv else "a",
+        str(row["score"]),
+        row["review_cnt"],
+        row["store_id"],
+    ])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
 
-    
-    params = (min_reviews, offset)
+
+def decode_cursor(cursor, use_adv):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        mode, score, review_cnt, store_id = json.loads(
+            base64.urlsafe_b64decode(padded.encode("ascii"))
+        )
+        after = (decimal.Decimal(score), int(review_cnt), int(store_id))
+    except Exception:
+        raise ValueError("잘못된 cursor 입니다.")
+
+    if mode != ("b" if use_adv else "a"):
+        raise ValueError("cursor 와 use_adv 값이 일치하지 않습니다.")
+    return after
+
+
+def _query_rank(limit, offset, min_reviews, use_adv, after=None, category_id=None):
+    sql, params = build_rank_query(limit, offset, min_reviews, use_adv, after, category_id)
 
     conn = get_connection()
     try:
@@ -40,6 +980,44 @@ def get_rank(limit=20, offset=0, min_reviews=0, use_adv=True):
         conn.close()
 
 
+def build_rank_query(limit, offset, min_reviews, use_adv, after=None, category_id=None):
+    """랭킹 조회 SQL 과 파라미터 (동기/비동기 모드 공용)"""
+    score_col = "rs.bayes_score" if use_adv else "rs.avg_rating"
+
+    where = ["rs.review_cnt >= %s"]
+    params = [min_reviews]
+    if category_id is not None:
+        # → 인덱스(category_id, score, review_cnt) 범위 스캔
+        where.append("rs.category_id = %s")
+        params.append(category_id)
+    if after is not None:
+        # (score, review_cnt, store_id) 가 직전 페이지 마지막 행보다 뒤에 오는 행만.
+        # 행 생성자 비교 (a, b, c) < (...) 는 category_id = %s 와 함께 쓰면 MySQL 이 범위로 바꾸지 못해
+        # 카테고리 전체를 읽으므로 풀어서 씀 → 인덱스([category_id,] score, review_cnt, PK) 범위 스캔
+        where.append(f"""({score_col} < %s OR ({score_col} = %s AND
+                         (rs.review_cnt < %s OR (rs.review_cnt = %s AND rs.store_id < %s))))""")
+        score, review_cnt, store_id = after
+        params.extend([score, score, review_cnt, review_cnt, store_id])
+    params.extend([limit, offset])
+
+    # v_store_ranking 뷰(리뷰 전체 재집계) 대신 store_rank_stats 를 인덱스 순으로 읽음
+    sql = f"""
+        SELECT
+            s.store_id,
+            s.name,
+            s.distance_km,
+            rs.review_cnt,
+            rs.avg_rating,
+            {score_col} AS score
+        FROM store_rank_stats rs
+        JOIN store s ON s.store_id = rs.store_id
+        WHERE {" AND ".join(where)}
+        ORDER BY {score_col} DESC, rs.review_cnt DESC, rs.store_id DESC
+        LIMIT %s OFFSET %s
+    """
+    return sql, params
+
+
 # 터미널에서 단독 실행 테스트용
 if __name__ == "__main__":
     rows = get_rank(limit=10, min_reviews=0, use_adv=True)
@@ -0,0 +1,157 @@
+"""
+review_bulk.py
+----------------------------------------
+리뷰 일괄 등록 API (제휴 키오스크 리뷰 가져오기용)
+- POST /api/admin/reviews/bulk
+
+본문 형식
+- Content-Type: application/json     → [{"user_id", "store_id", "rating", "content"}, ...]
+- Content-Type: application/x-ndjson → 한 줄에 리뷰 하나 (스트리밍으로 읽으면서 처리)
+
+REVIEW_BULK_CHUNK 건씩 나눠서 처리합니다. 묶음마다
+1. user_id / store_id 존재 여부를 IN (...) 쿼리 한 번씩으로 확인
+2. executemany 로 여러 행을 한 번에 INSERT
+3. 랭킹 집계(store_rank_stats / store_review_daily)를 매장별 합계로 한 번만 갱신
+4. commit
+잘못된 행은 건너뛰고 응답의 errors 에 (index, error) 로 알려줍니다.
+"""
+
+import json
+from itertools import islice
+
+from flask import Blueprint, jsonify, request
+
+from auth import admin_required
+from db import get_connection
+from ranking import apply_review_batch, invalidate_rank_cache
+
+bp = Blueprint('review_bulk', __name__)
+
+REVIEW_BULK_CHUNK = 500       # 트랜잭션 하나에 넣을 최대 행 수
+REVIEW_BULK_MAX_ERRORS = 1000  # 응답에 담을 최대 오류 수 (나머지는 개수만)
+
+
+def validate_review(item):
+    """형식 검사. 문제가 있으면 오류 메시지, 없으면 None"""
+    if not isinstance(item, dict):
+        return "리뷰는 객체여야 합니다."
+    for key in ("user_id", "store_id", "rating"):
+        value = item.get(key)
+        if not isinstance(value, int) or isinstance(value, bool):
+            return f"{key} 는 정수여야 합니다."
+    if item["rating"] < 1 or item["rating"] > 5:
+        return "평점은 1~5 사이의 숫자여야 합니다."
+    content = item.get("content")
+    if not isinstance(content, str) or not content.strip():
+        return "content는 필수입니다."
+    return None
+
+
+def iter_ndjson(stream):
+    """NDJSON 본문을 한 줄씩 읽어 (index, item) 을 내놓습니다. 빈 줄은 건너뜁니다."""
+    index = 0
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield index, json.loads(line)
+        except ValueError:
+            yield index, None
+        index += 1
+
+
+def insert_chunk(cur, chunk, errors):
+    """
+    (index, item) 묶음 하나를 검사/저장합니다. 저장한 행 수를 반환합니다.
+    commit 은 호출한 쪽에서 합니다.
+    """
+    valid = []
+    for index, item in chunk:
+        error = "JSON 형식이 올바르지 않습니다." if item is None else validate_review(item)
+        if error:
+            errors.append({"index": index, "error": error})
+        else:
+            valid.append((index, item))
+    if not valid:
+        return 0
+
+    # 존재하는 user_id / store_id 를 집합 쿼리 한 번씩으로 확인
+    known = {}
+    for table, key in (("user", "user_id"), ("store", "store_id")):
+        ids = sorted({item[key] for _, item in valid})
+        placeholders = ", ".join(["%s"] * len(ids))
+        cur.execute(f"SELECT {key} FROM {table} WHERE {key} IN ({placeholders})", ids)
+        known[key] = {row[key] for row in cur.fetchall()}
+
+    rows, reviews = [], []
+    for index, item in valid:
+        if item["store_id"] not in known["store_id"]:
+            errors.append({"index": index, "error": "해당 매장을 찾을 수 없습니다."})
+            continue
+        if item["user_id"] not in known["user_id"]:
+            errors.append({"index": index, "error": "해당 사용자를 찾을 수 없습니다."})
+            continue
+        rows.append((item["user_id"], item["store_id"], item["rating"], item["content"]))
+        reviews.append((item["store_id"], item["rating"], None, 1))
+
+    if rows:
+        # pymysql 이 여러 행 INSERT 문 하나로 묶어서 전송
+        cur.executemany("""
+            INSERT INTO review (user_id, store_id, rating, content)
+            VALUES (%s, %s, %s, %s)
+        """, rows)
+        apply_review_batch(cur, reviews)
+    return len(rows)
+
+
+# ======================
+# 리뷰 일괄 등록
+# POST /api/admin/reviews/bulk
+# ======================
+@bp.route('/api/admin/reviews/bulk', methods=['POST'])
+@admin_required
+def bulk_create_reviews():
+    if request.mimetype in ("application/x-ndjson", "application/jsonl"):
+        items = iter_ndjson(request.stream)
+    else:
+        data = request.get_json(silent=True)
+        if not isinstance(data, list):
+            return jsonify({"error": "리뷰 배열(JSON) 또는 NDJSON 본문이 필요합니다."}), 400
+        items = enumerate(data)
+
+    inserted, total, errors = 0, 0, []
+    conn = get_connection()
+    try:
+        while True:
+            chunk = list(islice(items, REVIEW_BULK_CHUNK))
+            if not chunk:
+                break
+            total += len(chunk)
+            chunk_errors = []
+            try:
+                with conn.cursor() as cur:
+                    n = insert_chunk(cur, chunk, chunk_errors)
+                conn.commit()
+                inserted += n
+            except Exception as e:
+                conn.rollback()
+                print(f"리뷰 일괄 등록 오류: {e}")
+                # 묶음 전체가 저장되지 않았으므로 형식 오류가 아닌 행도 실패로 보고
+                failed = {err["index"] for err in chunk_errors}
+                chunk_errors += [{"index": index, "error": "저장 중 오류가 발생했습니다."}
+                                 for index, _ in chunk if index not in failed]
+            errors.extend(chunk_errors)
+    finally:
+        conn.close()
+
+    if inserted:
+        invalidate_rank_cache()
+
+    errors.sort(key=lambda err: err["index"])
+    return jsonify({
+        "total": total,
+        "inserted": inserted,
+        "failed": len(errors),
+        "errors": errors[:REVIEW_BULK_MAX_ERRORS],
+    }), 200
@@ -0,0 +1,294 @@
+"""
+scoring.py
+----------------------------------------
+랭킹 점수 계산 엔진 (NumPy)
+
+store_review_daily(매장별 일자 합계)를 store_id 로 색인한 배열로 읽어 두고,
+점수 방식마다 벡터 연산 몇 번으로 모든 매장의 점수를 한꺼번에 계산합니다.
+- m              : 베이지안 사전 리뷰 수. score = (합계 + m*C) / (개수 + m), C = 전체 평균
+                   m = 0 이면 단순 평균 (리뷰 없는 매장은 0)
+- half_life_days : 지수 시간 감쇠. 리뷰 가중치 = 0.5 ** (지난 일수 / half_life_days)
+- window_days    : 최근 window_days 일(오늘 포함) 안의 리뷰만 사용
+
+기본 방식(m=5, 감쇠/기간 없음)은 store_rank_stats.bayes_score 와 같은 점수입니다.
+(bayes_score 는 전체 평균 C 의 변화가 BAYES_C_TOLERANCE 미만이면 이전 C 를 쓰므로 그 이하의 차이는 있음)
+일자 단위 합계를 쓰므로 감쇠도 하루 단위입니다 (같은 날 작성된 리뷰는 같은 가중치).
+
+사용법: data = load_aggregates() → data.rank(m, half_life_days, window_days).rows(offset, limit)
+감쇠/기간을 쓰지 않으면 load_totals() (매장별 합계 1행씩, store_rank_stats) 로 충분합니다.
+"""
+
+import numpy as np
+import pymysql
+
+from db import get_connection
+
+# 점수는 store_rank_stats.bayes_score(DECIMAL(10,6)) 와 같은 자리수로 반올림해서 정렬
+SCORE_DECIMALS = 6
+
+
+class ReviewAggregates:
+    """
+    매장 / 일자 합계 배열. 매장별 배열은 store_id 를 그대로 색인으로 씁니다 (없는 id 는 exists=False).
+    stores : [(store_id, name, distance_km, category_id), ...]
+    daily  : [(store_id, 지난 일수, rating_sum, review_cnt), ...]
+    """
+
+    def __init__(self, stores, daily):
+        size = max((row[0] for row in stores), default=-1) + 1
+        self.exists = np.zeros(size, dtype=bool)
+        self.category = np.full(size, -1, dtype=np.int64)   # NULL 카테고리는 -1
+        self.info = {}   # store_id -> (name, distance_km)
+        for store_id, name, distance_km, category_id in stores:
+            self.exists[store_id] = True
+            if category_id is not None:
+                self.category[store_id] = category_id
+            self.info[store_id] = (name, distance_km)
+
+        # 삭제된 매장의 합계 행은 버림 (FK CASCADE 로 보통은 없음)
+        arr = np.array(daily, dtype=np.int64).reshape(-1, 4)
+        arr = arr[(arr[:, 0] < size) & (arr[:, 3] != 0)]
+        arr = arr[self.exists[arr[:, 0]]]
+        self.d_store = arr[:, 0]
+        self.d_age = np.maximum(arr[:, 1], 0)
+        self.d_sum = arr[:, 2].astype(np.float64)
+        self.d_cnt = arr[:, 3].astype(np.float64)
+
+    def __len__(self):
+        return len(self.info)
+
+    def score(self, m, half_life_days=None, window_days=None):
+        """
+        모든 매장의 (score, avg_rating, review_cnt) 배열 (store_id 색인).
+        review_cnt 는 기간 안의 실제 리뷰 수, avg_rating / score 는 감쇠 가중치를 적용한 값입니다.
+        """
+        size = len(self.exists)
+        weight = np.ones(len(self.d_age))
+        if half_life_days:
+            weight = np.exp2(-self.d_age / half_life_days)
+        if window_days:
+            weight = np.where(self.d_age < window_days, weight, 0.0)
+
+        s = np.bincount(self.d_store, weights=self.d_sum * weight, minlength=size)
+        c = np.bincount(self.d_store, weights=self.d_cnt * weight, minlength=size)
+        cnt = np.bincount(self.d_store, weights=self.d_cnt * (weight > 0), minlength=size)
+
+        has = c > 0
+        avg = np.divide(s, c, out=np.zeros(size), where=has)
+        if m > 0:
+            total = c.sum()
+            c_mean = s.sum() / total if total > 0 else 0.0
+            score = (s + m * c_mean) / (c + m)
+        else:
+            score = avg
+        return (np.round(score, SCORE_DECIMALS), np.round(avg, SCORE_DECIMALS),
+                np.rint(cnt).astype(np.int64))
+
+    def rank(self, m, half_life_days=None, window_days=None, min_reviews=0, category_id=None):
+        """score DESC, review_cnt DESC, store_id DESC 순으로 정렬한 RankedList"""
+        score, avg, cnt = self.score(m, half_life_days, window_days)
+        mask = self.exists & (cnt >= min_reviews)
+        if category_id is not None:
+            mask &= self.category == category_id
+        ids = np.flatnonzero(mask)
+        # lexsort 는 마지막 키가 1순위
+        order = ids[np.lexsort((-ids, -cnt[ids], -score[ids]))]
+        return RankedList(self, order, score, avg, cnt)
+
+
+class RankedList:
+    """정렬된 store_id 배열과 점수 배열. 페이지를 자를 때만 행(dict)을 만듭니다."""
+
+    def __init__(self, data, order, score, avg, cnt):
+        self.data = data
+        self.order = order
+        self._score, self._avg, self._cnt = score, avg, cnt
+
+    def __len__(self):
+        return len(self.order)
+
+    def _with_order(self, order):
+        return RankedList(self.data, order, self._score, self._avg, self._cnt)
+
+    def filter(self, min_reviews=0, category_id=None):
+        """순서를 유지한 채 리뷰 수 / 카테고리 조건으로 거른 RankedList"""
+        order = self.order
+        if min_reviews:
+            order = order[self._cnt[order] >= min_reviews]
+        if category_id is not None:
+            order = order[self.data.category[order] == category_id]
+        return self._with_order(order)
+
+    def after(self, score, review_cnt, store_id):
+        """(score, review_cnt, store_id) 행 다음부터의 RankedList (keyset 커서용)"""
+        s, c, ids = self._score[self.order], self._cnt[self.order], self.order
+        # 정렬되어 있으므로 커서 행과 같거나 앞에 오는 행은 앞부분에 모여 있음
+        ahead = (s > score) | ((s == score) & ((c > review_cnt) | ((c == review_cnt) & (ids >= store_id))))
+        return self._with_order(self.order[int(ahead.sum()):])
+
+    def rows(self, offset=0, limit=20):
+        return self._rows(self.order[offset:offset + limit].tolist())
+
+    def rows_for(self, store_ids, min_reviews=0, category_id=None):
+        """store_ids 중 있는 매장의 행 (정렬 없음)"""
+        ids = [sid for sid in store_ids
+               if sid in self.data.info and self._cnt[sid] >= min_reviews
+               and (category_id is None or self.data.category[sid] == category_id)]
+        return self._rows(ids)
+
+    def _rows(self, store_ids):
+        result = []
+        for store_id in store_ids:
+            name, distance_km = self.data.info[store_id]
+            result.append({
+                "store_id": store_id,
+                "name": name,
+                "distance_km": distance_km,
+                "review_cnt": int(self._cnt[store_id]),
+                "avg_rating": float(self._avg[store_id]),
+                "score": float(self._score[store_id]),
+            })
+        return result
+
+
+def load_aggregates():
+    """store / store_review_daily 를 읽어 ReviewAggregates 를 만듭니다 (review 테이블은 읽지 않음)."""
+    conn = get_connection()
+    try:
+        # 행이 많으므로 dict 대신 튜플 커서로 읽음
+        with conn.cursor(pymysql.cursors.Cursor) as cur:
+            cur.execute("SELECT store_id, name, distance_km, category_id FROM store")
+            stores = cur.fetchall()
+            cur.execute("""
+                SELECT store_id, DATEDIFF(CURDATE(), day), rating_sum, review_cnt
+                FROM store_review_daily
+            """)
+            daily = cur.fetchall()
+    finally:
+        conn.close()
+    return ReviewAggregates(stores, daily)
+
+
+def load_totals():
+    """
+    store / store_rank_stats(매장별 전체 합계) 로 ReviewAggregates 를 만듭니다.
+    매장마다 '지난 일수 0' 인 행 하나로 읽으므로 감쇠/기간이 없는 점수 방식만 정확합니다.
+    일자 행을 모두 읽는 load_aggregates() 보다 훨씬 가볍습니다 (매장 수만큼의 행).
+    """
+    conn = get_connection()
+    try:
+        with conn.cursor(pymysql.cursors.Cursor) as cur:
+            cur.execute("""
+                SELECT s.store_id, s.name, s.distance_km, s.category_id, rs.rating_sum, rs.review_cnt
+                FROM store s
+                LEFT JOIN store_rank_stats rs ON rs.store_id = s.store_id
+            """)
+            rows = cur.fetchall()
+    finally:
+        conn.close()
+    stores = [row[:4] for row in rows]
+    totals = [(row[0], 0, row[4], row[5]) for row in rows if row[5]]
+    return ReviewAggregates(stores, totals)
+
+
+# 터미널에서 단독 실행: 기본 방식이 bayes_score 공식과 같은지 / 감쇠·기간 계산 확인 (DB 필요 없음)
+# python scoring.py --db 이면 실제 DB 의 store_rank_stats.bayes_score 와 비교
+if __name__ == "__main__":
+    import random
+    import sys
+    import time
+
+    M = 5
+    random.seed(7)
+    stores = [(sid, f"매장{sid}", None, sid % 4 or None) for sid in range(1, 5001, 2)]
+    reviews = []   # (store_id, 지난 일수, rating)
+    for store_id, *_ in stores:
+        for _ in range(random.randrange(0, 30)):
+            reviews.append((store_id, random.randrange(0, 400), random.randint(1, 5)))
+    daily = {}
+    for store_id, age, rating in reviews:
+        d = daily.setdefault((store_id, age), [0, 0])
+        d[0] += rating
+        d[1] += 1
+    data = ReviewAggregates(stores, [(sid, age, s, c) for (sid, age), (s, c) in daily.items()])
+
+    def expected(half_life=None, window=None, m=M):
+        """리뷰 하나씩 직접 계산한 점수 {store_id: score}"""
+        sums, cnts = {}, {}
+        for store_id, age, rating in reviews:
+            if window and age >= window:
+                continue
+            w = 0.5 ** (age / half_life) if half_life else 1.0
+            sums[store_id] = sums.get(store_id, 0.0) + w * rating
+            cnts[store_id] = cnts.get(store_id, 0.0) + w
+        c_mean = sum(sums.values()) / sum(cnts.values())
+        return {sid: (sums.get(sid, 0.0) + m * c_mean) / (cnts.get(sid, 0.0) + m)
+                for sid, *_ in stores}
+
+    def legacy_bayesian():
+        """Main_food.sql 의 v_store_scores_bayesian 뷰 정의를 그대로 옮긴 계산 {store_id: bayes_score}
+        C = 전체 리뷰 AVG(rating), R = 매장 AVG(rating) (없으면 0), v = 매장 리뷰 수
+        bayes_score = (v/(v + 5.0))*R + (5.0/(v + 5.0))*C"""
+        ratings = {}
+        for store_id, _, rating in reviews:
+            ratings.setdefault(store_id, []).append(rating)
+        all_ratings = [rating for _, _, rating in reviews]
+        c = sum(all_ratings) / len(all_ratings) if all_ratings else 0
+        result = {}
+        for store_id, *_ in stores:
+            rs = ratings.get(store_id, [])
+            r, v = (sum(rs) / len(rs) if rs else 0), len(rs)
+            result[store_id] = (v / (v + 5.0)) * r + (5.0 / (v + 5.0)) * c
+        return result
+
+    # 기본 방식(m=5, 감쇠/기간 없음)은 원래 v_store_scores_bayesian 뷰와 같은 점수여야 함
+    score, _, _ = data.score(M)
+    diff = max(abs(score[sid] - v) for sid, v in legacy_bayesian().items())
+    assert diff < 1e-6, ("v_store_scores_bayesian", diff)
+    print(f"{'v_store_scores_bayesian':<20} 최대 오차 {diff:.2e}")
+
+    for label, kwargs in [("기본 (m=5)", {}), ("감쇠 180일", {"half_life": 180}),
+                          ("최근 90일", {"window": 90}), ("감쇠 30일 + 최근 60일", {"half_life": 30, "window": 60})]:
+        want = expected(**kwargs)
+        score, _, _ = data.score(M, kwargs.get("half_life"), kwargs.get("window"))
+        diff = max(abs(score[sid] - v) for sid, v in want.items())
+        assert diff < 1e-6, (label, diff)
+        print(f"{label:<20} 최대 오차 {diff:.2e}")
+
+    ranked = data.rank(M, min_reviews=3, category_id=1)
+    rows = ranked.rows(0, len(ranked))
+    keys = [(-r["score"], -r["review_cnt"], -r["store_id"]) for r in rows]
+    assert keys == sorted(keys) and all(r["review_cnt"] >= 3 for r in rows)
+
+    start = time.perf_counter()
+    for _ in range(20):
+        data.rank(M, half_life_days=90).rows(0, 20)
+    print(f"매장 {len(data)}개 / 일자 행 {len(data.d_age)}개 : 정렬까지 평균 "
+          f"{(time.perf_counter() - start) * 1000 / 20:.2f} ms")
+
+    if "--db" in sys.argv:
+        data = load_aggregates()
+        score, _, _ = data.score(M)
+        conn = get_connection()
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT store_id, bayes_score FROM store_rank_stats")
+                stats = cur.fetchall()
+        finally:
+            conn.close()
+        diff = max((abs(score[r["store_id"]] - float(r["bayes_score"])) for r in stats), default=0.0)
+        # 차이는 C 의 오차(ranking.BAYES_C_TOLERANCE) 이하여야 함
+        print(f"DB bayes_score 와의 최대 차이 {diff:.6f}")
+        assert diff <= 0.001 + 1e-6
+
+        # 원래 랭킹 뷰(리뷰 전체 재집계)와는 오차 없이 같아야 함
+        conn = get_connection()
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT store_id, bayes_score FROM v_store_scores_bayesian")
+                legacy = cur.fetchall()
+        finally:
+            conn.close()
+        diff = max((abs(score[r["store_id"]] - float(r["bayes_score"])) for r in legacy), default=0.0)
+        print(f"v_store_scores_bayesian 과의 최대 차이 {diff:.2e}")
+        assert diff < 1e-6
@@ -0,0 +1,236 @@
+"""
+serve.py
+----------------------------------------
+운영용 WSGI 실행기 (pre-fork, Linux/macOS 전용)
+
+- 마스터 프로세스가 app.create_app() 으로 앱을 한 번 만들고(템플릿/자동완성·좌표 인덱스 적재)
+  소켓을 연 뒤 워커 N 개를 fork 합니다. 워커는 적재된 메모리를 copy-on-write 로 공유합니다.
+- DB 커넥션 풀은 워커마다 fork 이후 새로 만들어집니다 (db.ConnectionPool 참고).
+- 자동완성·좌표 인덱스와 랭킹 스냅샷은 워커마다 따로 갱신됩니다. 다른 워커의 쓰기는
+  리소스 버전('stores' / 'rank', versions.py)을 확인해 몇 초 안에 반영합니다.
+- 워커는 max_requests(+지터) 건을 처리하면 새 요청을 받지 않고 진행 중인 요청을 마친 뒤 종료되고,
+  마스터가 새 워커로 교체합니다 (메모리 증가 방지).
+
+시그널:
+- SIGTERM / SIGINT : 진행 중인 요청을 마치고 종료 (graceful shutdown)
+- SIGHUP           : 새 워커를 먼저 띄운 뒤 기존 워커를 graceful 하게 교체
+                     (app 은 마스터에 적재된 것을 그대로 쓰므로 코드 변경은 재시작 필요)
+
+사용법:
+    python serve.py --bind 0.0.0.0:5000 --workers 4 --max-requests 1000
+"""
+
+import argparse
+import os
+import random
+import signal
+import socket
+import sys
+import threading
+import time
+
+from werkzeug.serving import make_server
+
+import db
+
+DEFAULT_BIND = "0.0.0.0:5000"
+DEFAULT_MAX_REQUESTS = 1000         # 0 이면 워커를 교체하지 않음
+DEFAULT_MAX_REQUESTS_JITTER = 50    # 워커들이 한꺼번에 교체되지 않도록 더하는 난수 범위
+DEFAULT_GRACEFUL_TIMEOUT = 30       # 종료 신호 후 이 시간(초)이 지나면 강제 종료
+
+
+# ======================
+# 워커 프로세스
+# ======================
+class RequestLimit:
+    """처리한 요청 수를 세다가 limit 에 도달하면 서버 종료를 요청하는 WSGI 미들웨어"""
+
+    def __init__(self, wsgi_app, limit, on_limit):
+        self.wsgi_app = wsgi_app
+        self.limit = limit
+        self.on_limit = on_limit
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, environ, start_response):
+        with self._lock:
+            self.count += 1
+            reached = self.limit and self.count == self.limit
+        if reached:
+            self.on_limit()
+        return self.wsgi_app(environ, start_response)
+
+
+def run_worker(app, sock, max_requests):
+    host, port = sock.getsockname()[:2]
+    server = make_server(host, port, app, threaded=True, fd=sock.fileno())
+    # server_close() 가 처리 중인 요청 스레드를 기다리도록
+    server.daemon_threads = False
+
+    stopping = threading.Event()
+
+    def stop(*_):
+        if not stopping.is_set():
+            stopping.set()
+            # serve_forever() 를 돌리는 스레드에서 shutdown() 을 부르면 멈추므로 별도 스레드에서 호출
+            threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)   # Ctrl+C 는 마스터가 처리
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+
+    def watch_master(master_pid):
+        # 마스터가 강제 종료되면 워커도 정리
+        while not stopping.wait(1.0):
+            if os.getppid() != master_pid:
+                stop()
+
+    threading.Thread(target=watch_master, args=(os.getppid(),), daemon=True).start()
+
+    server.app = RequestLimit(app, max_requests, stop)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        db.pool.close_all()
+
+
+# ======================
+# 마스터 프로세스
+# ======================
+class Arbiter:
+    def __init__(self, app, sock, workers, max_requests, jitter, graceful_timeout):
+        self.app = app
+        self.sock = sock
+        self.num_workers = workers
+        self.max_requests = max_requests
+        self.jitter = jitter
+        self.graceful_timeout = graceful_timeout
+        self.workers = {}   # pid -> 시작 시각
+        self._stopping = False
+        self._reload = False
+
+    def spawn_worker(self):
+        limit = self.max_requests
+        if limit and self.jitter:
+            limit += random.randint(0, self.jitter)
+
+        pid = os.fork()
+        if pid:
+            self.workers[pid] = time.monotonic()
+            return pid
+
+        # 자식 프로세스
+        code = 0
+        try:
+            random.seed()
+            run_worker(self.app, self.sock, limit)
+        except Exception as e:
+            print(f"[worker {os.getpid()}] 오류: {e}", file=sys.stderr)
+            code = 1
+        finally:
+            os._exit(code)
+
+    def kill_workers(self, pids, sig=signal.SIGTERM):
+        for pid in pids:
+            try:
+                os.kill(pid, sig)
+            except ProcessLookupError:
+                self.workers.pop(pid, None)
+
+    def reap_workers(self):
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if not pid:
+                return
+            if self.workers.pop(pid, None) is not None and not self._stopping:
+                code = os.waitstatus_to_exitcode(status)
+                if code:
+                    print(f"[master] worker {pid} 비정상 종료 (code={code})", file=sys.stderr)
+
+    def handle_stop(self, *_):
+        self._stopping = True
+
+    def handle_reload(self, *_):
+        self._reload = True
+
+    def reload(self):
+        """새 워커를 먼저 띄운 뒤 기존 워커를 graceful 종료"""
+        old = list(self.workers)
+        for _ in range(self.num_workers):
+            self.spawn_worker()
+        self.kill_workers(old)
+
+    def stop(self):
+        self.kill_workers(list(self.workers))
+        deadline = time.monotonic() + self.graceful_timeout
+        while self.workers and time.monotonic() < deadline:
+            self.reap_workers()
+            time.sleep(0.1)
+        # 시간 안에 끝나지 않은 워커는 강제 종료
+        self.kill_workers(list(self.workers), signal.SIGKILL)
+        while self.workers:
+            self.reap_workers()
+            time.sleep(0.1)
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self.handle_stop)
+        signal.signal(signal.SIGINT, self.handle_stop)
+        signal.signal(signal.SIGHUP, self.handle_reload)
+
+        host, port = self.sock.getsockname()[:2]
+        print(f"[master {os.getpid()}] http://{host}:{port} 에서 워커 {self.num_workers}개 실행")
+
+        while not self._stopping:
+            if self._reload:
+                self._reload = False
+                self.reload()
+            self.reap_workers()
+            # 종료된 워커(요청 수 제한/오류) 자리를 채움
+            while len(self.workers) < self.num_workers and not self._stopping:
+                self.spawn_worker()
+            time.sleep(0.2)
+
+        print(f"[master {os.getpid()}] 종료 중...")
+        self.stop()
+        self.sock.close()
+
+
+def bind_socket(bind):
+    host, _, port = bind.rpartition(":")
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host or "0.0.0.0", int(port)))
+    sock.listen(1024)
+    sock.set_inheritable(True)
+    return sock
+
+
+def main():
+    parser = argparse.ArgumentParser(description="pre-fork WSGI 실행기")
+    parser.add_argument("--bind", default=DEFAULT_BIND, help="host:port")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--max-requests", type=int, default=DEFAULT_MAX_REQUESTS)
+    parser.add_argument("--max-requests-jitter", type=int, default=DEFAULT_MAX_REQUESTS_JITTER)
+    parser.add_argument("--graceful-timeout", type=float, default=DEFAULT_GRACEFUL_TIMEOUT)
+    args = parser.parse_args()
+
+    if not hasattr(os, "fork"):
+        sys.exit("serve.py 는 fork 를 지원하는 OS(Linux/macOS)에서만 실행할 수 있습니다. "
+                 "Windows 에서는 python app.py 를 사용하세요.")
+
+    from app import create_app
+    app = create_app()
+    # 마스터가 적재하면서 연 커넥션은 워커에게 물려주지 않음
+    db.pool.close_all()
+
+    sock = bind_socket(args.bind)
+    Arbiter(app, sock, max(1, args.workers), args.max_requests,
+            args.max_requests_jitter, args.graceful_timeout).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -8,28 +8,21 @@ store_admin.py
 """
 
 from flask import Blueprint, request, jsonify
-import pymysql
-from datetime import timedelta
-import decimal
+from db import get_connection
+from ranking import remove_store_stats, invalidate_rank_cache
+import autocomplete
+import geo
+import versions
+from versions import conditional
 
 bp = Blueprint('store_admin', __name__)
 
-def get_connection():
-    """MySQL 연결을 생성합니다."""
-    return pymysql.connect(
-        host="localhost",
-        user="root",
-        password="root",
-        db="foodfood",
-        charset="utf8mb4",
-        cursorclass=pymysql.cursors.DictCursor,
-    )
-
 # =========================================================
 # [관리자] 매장 정보 조회 
 # 
 # =========================================================
 @bp.route("/api/stores/<int:store_id>", methods=["GET"])
+@conditional(lambda store_id: f"store:{store_id}")
 def get_store(store_id):
     """
     매장 정보 수정 페이지에 들어갈 때,
@@ -46,31 +39,15 @@ def get_store(store_id):
                     open_time AS `open`,
                     close_time AS `close`,
                     phone,
-                    distance_km AS distance
+                    distance_km AS distance,
+                    lat,
+                    lng
                 FROM store
                 WHERE store_id = %s
             """
             cur.execute(sql, (store_id,))
             row = cur.fetchone()
             
-            if row:
-               
-                if isinstance(row.get("open"), timedelta):
-                    total_seconds = row["open"].seconds
-                    hours = total_seconds // 3600
-                    minutes = (total_seconds % 3600) // 60
-                    row["open"] = f"{hours:02d}:{minutes:02d}"
-                
-                if isinstance(row.get("close"), timedelta):
-                    total_seconds = row["close"].seconds
-                    hours = total_seconds // 3600
-                    minutes = (total_seconds % 3600) // 60
-                    row["close"] = f"{hours:02d}:{minutes:02d}"
-                
-                
-                if row.get("distance") is not None and isinstance(row.get("distance"), decimal.Decimal):
-                    row["distance"] = float(row["distance"])
-                    
     except Exception as e:
         print(f"매장 정보 조회 오류: {e}")
         return jsonify({"error": "매장 정보를 불러오는 중 오류가 발생했습니다."}), 500
@@ -91,7 +68,7 @@ def update_store(store_id):
     """
     매장 정보 수정 페이지에서 입력값을 수정 후 저장할 때 호출되는 API.
     필수: name, address
-    선택: open, close, phone, distance
+    선택: open, close, phone, distance, lat, lng (lat/lng 는 둘 다 보내야 하며 null 이면 좌표 삭제)
     """
     data = request.json or {}
 
@@ -101,6 +78,9 @@ def update_store(store_id):
     close_time = data.get("close")
     phone = data.get("phone")
     distance = data.get("distance")
+    has_location = "lat" in data or "lng" in data
+    lat = data.get("lat")
+    lng = data.get("lng")
 
     
     if not name or not address:
@@ -108,6 +88,14 @@ def update_store(store_id):
             jsonify({"error": "필수 항목(name, address)이 누락되었습니다."}),
             400,
         )
+    if has_location:
+        if (lat is None) != (lng is None):
+            return jsonify({"error": "lat, lng 는 함께 입력해야 합니다."}), 400
+        if lat is not None and not (
+            isinstance(lat, (int, float)) and isinstance(lng, (int, float))
+            and -90 <= lat <= 90 and -180 <= lng <= 180
+        ):
+            return jsonify({"error": "lat, lng 값이 올바르지 않습니다."}), 400
     conn = get_connection()
     try:
         with conn.cursor() as cur:
@@ -134,6 +122,9 @@ def update_store(store_id):
             if distance is not None:
                 update_fields.append("distance_km = %s")
                 params.append(distance)
+            if has_location:
+                update_fields.extend(["lat = %s", "lng = %s"])
+                params.extend([lat, lng])
 
             params.append(store_id)
 
@@ -143,6 +134,9 @@ def update_store(store_id):
                 WHERE store_id = %s
             """
             cur.execute(sql, params)
+            # 매장 이름/정보는 랭킹 응답에도 포함되므로 둘 다 올림
+            # "stores" 는 다른 워커 프로세스의 자동완성 / 좌표 인덱스를 다시 읽게 함
+            versions.bump(cur, "rank", f"store:{store_id}", "stores")
             conn.commit()
 
            
@@ -155,7 +149,9 @@ def update_store(store_id):
                     open_time AS `open`,
                     close_time AS `close`,
                     phone,
-                    distance_km AS distance
+                    distance_km AS distance,
+                    lat,
+                    lng
                 FROM store
                 WHERE store_id = %s
                 """,
@@ -163,30 +159,16 @@ def update_store(store_id):
             )
             updated = cur.fetchone()
             
-            if updated:
-               
-                if isinstance(updated.get("open"), timedelta):
-                    total_seconds = updated["open"].seconds
-                    hours = total_seconds // 3600
-                    minutes = (total_seconds % 3600) // 60
-                    updated["open"] = f"{hours:02d}:{minutes:02d}"
-                
-                if isinstance(updated.get("close"), timedelta):
-                    total_seconds = updated["close"].seconds
-                    hours = total_seconds // 3600
-                    minutes = (total_seconds % 3600) // 60
-                    updated["close"] = f"{hours:02d}:{minutes:02d}"
-                
-               
-                if updated.get("distance") is not None and isinstance(updated.get("distance"), decimal.Decimal):
-                    updated["distance"] = float(updated["distance"])
-                    
     except Exception as e:
         print(f"매장 정보 수정 오류: {e}")
         return jsonify({"error": "매장 정보를 수정하는 중 오류가 발생했습니다."}), 500
     finally:
         conn.close()
 
+    invalidate_rank_cache()
+    autocomplete.upsert_store(store_id, name)
+    if has_location:
+        geo.upsert_store(store_id, lat, lng)
     return jsonify({"message": "매장 정보가 수정되었습니다.", "store": updated}), 200
 
 
@@ -208,11 +190,16 @@ def delete_store(store_id):
             if not cur.fetchone():
                 return jsonify({"error": "해당 매장을 찾을 수 없습니다."}), 404
 
-            
+            # 삭제될 리뷰들을 랭킹 전체 평균에서 제외
+            remove_store_stats(cur, store_id)
             cur.execute("DELETE FROM store WHERE store_id = %s", (store_id,))
+            versions.bump(cur, "rank", f"store:{store_id}", "stores")
             conn.commit()
     finally:
         conn.close()
 
+    invalidate_rank_cache()
+    autocomplete.remove_store(store_id)
+    geo.remove_store(store_id)
     return jsonify({"message": "매장이 삭제되었습니다."}), 200
 
@@ -7,131 +7,212 @@ store_info.py
 
 from flask import Blueprint, jsonify
 from db import get_connection
-from datetime import datetime, timedelta
-import decimal
+import versions
+from versions import conditional
+from menus import cache_menus, get_cached_menus, menu_cache
+from projection import parse_fields, project
+from ranking import RATING_LEVELS, REVIEW_WINDOW_COLUMNS, shape_review_stats
+import json
 
 bp = Blueprint('store_info', __name__)
 
+# 매장 상세 응답을 브라우저/CDN 이 재검증 없이 재사용해도 되는 시간(초).
+# 리뷰/메뉴를 쓴 직후 상세를 다시 읽으면 바로 보여야 하므로 0 (no-cache, 매번 ETag 로 재검증 → 대부분 304)
+STORE_DETAIL_MAX_AGE = 0
+
+
+# 메뉴 / 최근 리뷰 JSON 에 담을 수 있는 키와 SQL 식
+MENU_COLUMNS = {
+    "menu_id": "m.menu_id",
+    "name": "m.name",
+    "price": "m.price",
+    "recommend": "m.recommend",
+}
+REVIEW_COLUMNS = {
+    "review_id": "r.review_id",
+    "user_id": "r.user_id",
+    "content": "r.content",
+    "rating": "r.rating",
+    "helpful_cnt": "r.helpful_cnt",
+    "created_at": "DATE_FORMAT(r.created_at, '%%Y-%%m-%%d %%H:%%i:%%s')",
+}
+
+# ?fields= 로 고를 수 있는 필드 (projection.parse_fields 형식)
+STORE_DETAIL_FIELDS = {
+    "store": {"store_id", "name", "address", "open_time", "close_time",
+              "phone", "distance_km", "category_id"},
+    "stats": {"avg_rating", "review_cnt", "bayes_score", "rating_hist",
+              "avg_30d", "cnt_30d", "avg_90d", "cnt_90d", "trend_30d"},
+    "menus": set(MENU_COLUMNS),
+    "reviews": set(REVIEW_COLUMNS),
+}
+
+
+def _json_object(columns, keys):
+    return ",\n".join(f"'{k}', {columns[k]}" for k in columns if k in keys)
+
+
+def build_store_detail_sql(menu_keys=MENU_COLUMNS, review_keys=REVIEW_COLUMNS):
+    """
+    매장 기본 정보 + 통계 + 메뉴(JSON) + 최근 리뷰 10개(JSON) SQL 과 파라미터 개수.
+    menu_keys / review_keys 에 없는 키는 JSON 에 담지 않고, None 이면 해당 서브쿼리를 생략합니다.
+    파라미터: 리뷰 포함 시 (store_id, store_id), 생략 시 (store_id,)
+    """
+    menus = "NULL"
+    if menu_keys is not None:
+        # 정렬(shape_store_detail)에 필요한 menu_id 는 항상 포함
+        menus = f"""(
+            SELECT JSON_ARRAYAGG(JSON_OBJECT(
+                {_json_object(MENU_COLUMNS, {"menu_id", *menu_keys})}
+            ))
+            FROM menu m
+            WHERE m.store_id = s.store_id
+        )"""
+    reviews = "NULL"
+    if review_keys is not None:
+        reviews = f"""(
+            SELECT JSON_ARRAYAGG(JSON_OBJECT(
+                {_json_object(REVIEW_COLUMNS, {"review_id", "created_at", *review_keys})}
+            ))
+            FROM (
+                SELECT review_id, user_id, content, rating, helpful_cnt, created_at
+                FROM review
+                WHERE store_id = %s
+                ORDER BY created_at DESC
+                LIMIT 10
+            ) r
+        )"""
+
+    sql = f"""
+    SELECT
+        s.store_id,
+        s.name,
+        s.address,
+        s.open_time,
+        s.close_time,
+        s.phone,
+        s.distance_km,
+        s.category_id,
+        COALESCE(rs.avg_rating, 0)  AS avg_rating,
+        COALESCE(rs.review_cnt, 0)  AS review_cnt,
+        COALESCE(rs.bayes_score, 0) AS bayes_score,
+        rs.cnt_1, rs.cnt_2, rs.cnt_3, rs.cnt_4, rs.cnt_5,
+        (
+            SELECT JSON_OBJECT({_json_object(REVIEW_WINDOW_COLUMNS, REVIEW_WINDOW_COLUMNS)})
+            FROM store_review_daily d
+            WHERE d.store_id = s.store_id
+              AND d.day > CURDATE() - INTERVAL 90 DAY
+        ) AS window_json,
+        {menus} AS menus_json,
+        {reviews} AS reviews_json
+    FROM store s
+    LEFT JOIN store_rank_stats rs ON rs.store_id = s.store_id
+    WHERE s.store_id = %s
+"""
+    return sql, (2 if review_keys is not None else 1)
+
+
+# 전체 필드. 파라미터: (store_id, store_id)
+STORE_DETAIL_SQL, _ = build_store_detail_sql()
+# 메뉴를 캐시에서 채울 때. 파라미터: (store_id, store_id)
+STORE_DETAIL_NO_MENUS_SQL, _ = build_store_detail_sql(menu_keys=None)
+
+
+def fetch_store_detail(cur, store_id, fields=None, version=None):
+    """
+    매장 기본 정보 + 통계 + 메뉴 + 최근 리뷰 10개를 쿼리 한 번(왕복 1회)으로 조회합니다.
+    - 통계는 store_rank_stats(매장별 집계 테이블)에서 바로 읽고
+    - 메뉴/리뷰는 JSON_ARRAYAGG 로 묶어서 같은 행에 담아 옵니다.
+    fields(projection.parse_fields 결과)를 주면 요청하지 않은 메뉴/리뷰는 조회하지 않고
+    응답에서도 해당 필드만 남깁니다.
+    version('store:<id>' 리소스 버전)을 주면 메뉴는 menus.menu_cache 에서 읽고,
+    캐시에 없으면 전체 메뉴를 같이 조회해서 캐시에 넣습니다.
+    매장이 없으면 None 을 반환합니다.
+    """
+    want_menus = fields is None or "menus" in fields
+    menus = get_cached_menus(store_id, version) if want_menus and version is not None else None
+    generation = menu_cache.generation
+
+    if fields is None:
+        sql, n_params = (STORE_DETAIL_SQL if menus is None else STORE_DETAIL_NO_MENUS_SQL), 2
+    else:
+        def keys(name, columns):
+            if name not in fields:
+                return None
+            return columns if fields[name] is None else fields[name]
+        # 메뉴는 캐시에 넣을 수 있도록 요청한 필드와 관계없이 전체 키를 조회 (응답은 project() 가 거름)
+        menu_keys = MENU_COLUMNS if want_menus and menus is None else None
+        sql, n_params = build_store_detail_sql(menu_keys, keys("reviews", REVIEW_COLUMNS))
+    cur.execute(sql, (store_id,) * n_params)
+    result = shape_store_detail(cur.fetchone())
+    if not result:
+        return None
+
+    if menus is not None:
+        result["menus"] = menus
+    elif want_menus and version is not None:
+        cache_menus(store_id, version, result["menus"], generation)
+    return project(result, fields)
+
+
+def shape_store_detail(row):
+    """STORE_DETAIL_SQL 결과 한 행을 응답 형태로 바꿉니다 (동기/비동기 모드 공용)."""
+    if not row:
+        return None
+
+    # JSON_ARRAYAGG 는 순서를 보장하지 않으므로 여기서 정렬
+    menus = json.loads(row.pop("menus_json") or "[]")
+    menus.sort(key=lambda m: m["menu_id"])
+    reviews = json.loads(row.pop("reviews_json") or "[]")
+    reviews.sort(key=lambda r: (r["created_at"], r["review_id"]), reverse=True)
+
+    # Decimal / TIME 값은 FastJSONProvider 가 응답 직렬화 시점에 변환
+    stats = {
+        "avg_rating": row.pop("avg_rating"),
+        "review_cnt": row.pop("review_cnt"),
+        "bayes_score": row.pop("bayes_score"),
+    }
+    # 별점 분포 / 최근 30·90일 평균 (store_rank_stats + store_review_daily, review 는 읽지 않음)
+    hist = {f"cnt_{r}": row.pop(f"cnt_{r}") for r in RATING_LEVELS}
+    stats.update(shape_review_stats(hist, json.loads(row.pop("window_json") or "{}")))
+
+    return {
+        "store": row,
+        "stats": stats,
+        "menus": menus,
+        "reviews": reviews
+    }
+
 
 @bp.route("/api/stores/<int:store_id>/detail", methods=["GET"])
+@conditional(lambda store_id: f"store:{store_id}", max_age=STORE_DETAIL_MAX_AGE, also=("rank",))
 def get_store_detail(store_id):
     """
     매장 상세 정보 조회 API
     - 매장 기본 정보
-    - 통계 정보 (평균 평점, 리뷰 수, 베이지안 점수)
+    - 통계 정보 (평균 평점, 리뷰 수, 베이지안 점수, 별점 분포, 최근 30/90일 평균)
     - 메뉴 목록
     - 최근 리뷰 목록
+    ?fields=store,stats,reviews.rating 처럼 필요한 필드만 요청할 수 있습니다.
     """
+    try:
+        fields = parse_fields(STORE_DETAIL_FIELDS)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
     conn = None
     try:
+        # ETag 를 만들 때 읽은 버전 (VERSION_CACHE_TTL 동안 메모리 값이라 DB 를 다시 읽지 않음)
+        version, _ = versions.get_version(f"store:{store_id}")
         conn = get_connection()
         with conn.cursor() as cur:
-            # 1. 매장 기본 정보 조회
-            cur.execute("""
-                SELECT 
-                    store_id,
-                    name,
-                    address,
-                    open_time,
-                    close_time,
-                    phone,
-                    distance_km,
-                    category_id
-                FROM store
-                WHERE store_id = %s
-            """, (store_id,))
-            store_info = cur.fetchone()
-            
-            if not store_info:
-                return jsonify({"error": "해당 매장을 찾을 수 없습니다."}), 404
-            
-            # 2. 통계 정보 조회 (랭킹 뷰에서) - 뷰가 없을 수 있으므로 예외 처리
-            stats = None
-            try:
-                cur.execute("""
-                    SELECT 
-                        avg_rating,
-                        review_cnt,
-                        bayes_score
-                    FROM v_store_ranking
-                    WHERE store_id = %s
-                """, (store_id,))
-                stats = cur.fetchone()
-            except Exception as e:
-                print(f"통계 정보 조회 오류 (뷰가 없을 수 있음): {e}")
-                stats = None
-            
-            # 3. 메뉴 목록 조회
-            cur.execute("""
-                SELECT 
-                    menu_id,
-                    name,
-                    price,
-                    recommend
-                FROM menu
-                WHERE store_id = %s
-                ORDER BY menu_id
-            """, (store_id,))
-            menus = cur.fetchall()
-            
-            # 4. 최근 리뷰 목록 조회 
-            cur.execute("""
-                SELECT 
-                    review_id,
-                    user_id,
-                    content,
-                    rating,
-                    helpful_cnt,
-                    created_at
-                FROM review
-                WHERE store_id = %s
-                ORDER BY created_at DESC
-                LIMIT 10
-            """, (store_id,))
-            reviews = cur.fetchall()
-            
-            
-            for review in reviews:
-                if isinstance(review.get("created_at"), datetime):
-                    review["created_at"] = review["created_at"].strftime("%Y-%m-%d %H:%M:%S")
-            
-           
-            if isinstance(store_info.get("open_time"), timedelta):
-                total_seconds = store_info["open_time"].seconds
-                hours = total_seconds // 3600
-                minutes = (total_seconds % 3600) // 60
-                store_info["open_time"] = f"{hours:02d}:{minutes:02d}"
-            
-            if isinstance(store_info.get("close_time"), timedelta):
-                total_seconds = store_info["close_time"].seconds
-                hours = total_seconds // 3600
-                minutes = (total_seconds % 3600) // 60
-                store_info["close_time"] = f"{hours:02d}:{minutes:02d}"
-            
-            # Decimal 타입 변환
-            if store_info.get("distance_km"):
-                store_info["distance_km"] = float(store_info["distance_km"])
-            
-            if stats:
-                if stats.get("avg_rating"):
-                    stats["avg_rating"] = float(stats["avg_rating"])
-                if stats.get("bayes_score"):
-                    stats["bayes_score"] = float(stats["bayes_score"])
-            
-            # 응답 데이터 구성
-            result = {
-                "store": store_info,
-                "stats": stats or {
-                    "avg_rating": 0,
-                    "review_cnt": 0,
-                    "bayes_score": 0
-                },
-                "menus": menus,
-                "reviews": reviews
-            }
-            
-            return jsonify(result), 200
-            
+            result = fetch_store_detail(cur, store_id, fields, version=version)
+
+        if not result:
+            return jsonify({"error": "해당 매장을 찾을 수 없습니다."}), 404
+
+        return jsonify(result), 200
+
     except Exception as e:
         print(f"매장 정보 조회 오류: {e}")
         return jsonify({"error": "매장 정보를 불러오는 중 오류가 발생했습니다."}), 500
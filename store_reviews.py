@@ -0,0 +1,162 @@
+"""
+store_reviews.py
+----------------------------------------
+매장별 리뷰 목록 / 도움돼요 API
+- GET  /api/stores/<store_id>/reviews : ?sort=recent|rating|helpful&limit=20&cursor=
+       → {"items": [...], "next_cursor": "..." | null}
+- POST /api/reviews/<review_id>/helpful : 도움돼요 (사용자당 1회)
+
+정렬마다 (store_id, 정렬 컬럼, review_id) 복합 인덱스를 타고
+마지막 행 다음부터 읽는 keyset 방식이라 리뷰가 10만 개인 매장도 페이지마다 같은 속도입니다.
+"""
+
+import base64
+import json
+
+from flask import Blueprint, g, jsonify, request
+
+from auth import login_required
+from db import get_connection
+import versions
+from versions import conditional
+
+bp = Blueprint('store_reviews', __name__)
+
+REVIEW_PAGE_DEFAULT = 20
+REVIEW_PAGE_MAX = 100
+# 0 = no-cache: 방금 쓴 리뷰가 바로 보이도록 매번 ETag 로 재검증 (바뀌지 않았으면 304)
+REVIEW_FEED_MAX_AGE = 0
+
+# 정렬 이름 -> (cursor 표식, 정렬 컬럼). 동점은 review_id DESC (최신순)
+REVIEW_SORTS = {
+    "recent": ("r", "created_at"),
+    "rating": ("s", "rating"),
+    "helpful": ("h", "helpful_cnt"),
+}
+
+
+def encode_review_cursor(row, sort):
+    mark, column = REVIEW_SORTS[sort]
+    raw = json.dumps([mark, str(row[column]), row["review_id"]])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_review_cursor(cursor, sort):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        mark, value, review_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception:
+        raise ValueError("잘못된 cursor 입니다.")
+
+    if mark != REVIEW_SORTS[sort][0]:
+        raise ValueError("cursor 와 sort 값이 일치하지 않습니다.")
+    try:
+        return (value if sort == "recent" else int(value)), int(review_id)
+    except (TypeError, ValueError):
+        raise ValueError("잘못된 cursor 입니다.")
+
+
+def build_review_page_query(store_id, sort, limit, cursor=None):
+    """리뷰 페이지 SQL 과 파라미터. 잘못된 sort / cursor 는 ValueError."""
+    if sort not in REVIEW_SORTS:
+        raise ValueError("sort 는 recent / rating / helpful 중 하나여야 합니다.")
+    column = REVIEW_SORTS[sort][1]
+
+    where, params = ["store_id = %s"], [store_id]
+    if cursor:
+        # 행 생성자 비교 ({column}, review_id) < (%s, %s) 는 MySQL 이 인덱스 범위로 바꾸지 못하는
+        # 경우가 있어 풀어서 씀. store_id 고정 + {column} 상한이라 EXPLAIN 이
+        # type=range, key=idx_review_store_{created,rating,helpful} 로 나와야 함
+        # (created_at 인덱스에는 InnoDB 가 PK review_id 를 붙여 두므로 동점 비교도 인덱스 안에서 처리)
+        where.append(f"({column} < %s OR ({column} = %s AND review_id < %s))")
+        value, review_id = decode_review_cursor(cursor, sort)
+        params.extend((value, value, review_id))
+    params.append(limit)
+
+    sql = f"""
+        SELECT review_id, user_id, content, rating, helpful_cnt, created_at
+        FROM review
+        WHERE {" AND ".join(where)}
+        ORDER BY {column} DESC, review_id DESC
+        LIMIT %s
+    """
+    return sql, params
+
+
+# ======================
+# 매장 리뷰 목록
+# GET /api/stores/<store_id>/reviews
+# ======================
+@bp.route("/api/stores/<int:store_id>/reviews", methods=["GET"])
+@conditional(lambda store_id: f"store:{store_id}", max_age=REVIEW_FEED_MAX_AGE)
+def list_store_reviews(store_id):
+    sort = request.args.get("sort", "recent")
+    limit = request.args.get("limit", REVIEW_PAGE_DEFAULT, type=int)
+    limit = max(1, min(limit, REVIEW_PAGE_MAX))
+    try:
+        sql, params = build_review_page_query(store_id, sort, limit,
+                                              request.args.get("cursor") or None)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(sql, params)
+            rows = cur.fetchall()
+            if not rows and not request.args.get("cursor"):
+                cur.execute("SELECT store_id FROM store WHERE store_id = %s", (store_id,))
+                if not cur.fetchone():
+                    return jsonify({"error": "해당 매장을 찾을 수 없습니다."}), 404
+    finally:
+        conn.close()
+
+    next_cursor = encode_review_cursor(rows[-1], sort) if len(rows) == limit else None
+    return jsonify({"items": rows, "next_cursor": next_cursor})
+
+
+# ======================
+# 도움돼요
+# POST /api/reviews/<review_id>/helpful
+# ======================
+@bp.route("/api/reviews/<int:review_id>/helpful", methods=["POST", "OPTIONS"])
+@login_required
+def vote_helpful(review_id):
+    if request.method == "OPTIONS":
+        return "", 200
+
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT store_id FROM review WHERE review_id = %s", (review_id,))
+            review = cur.fetchone()
+            if not review:
+                return jsonify({"error": "해당 리뷰를 찾을 수 없습니다."}), 404
+
+            # (review_id, user_id) PK 로 중복 투표를 막고, 처음 투표일 때만 증가
+            cur.execute("""
+                INSERT IGNORE INTO review_helpful (review_id, user_id)
+                VALUES (%s, %s)
+            """, (review_id, g.user_id))
+            voted = cur.rowcount == 1
+            if voted:
+                cur.execute("""
+                    UPDATE review
+                    SET helpful_cnt = helpful_cnt + 1
+                    WHERE review_id = %s
+                """, (review_id,))
+                versions.bump(cur, f"store:{review['store_id']}")
+
+            cur.execute("SELECT helpful_cnt FROM review WHERE review_id = %s", (review_id,))
+            helpful_cnt = cur.fetchone()["helpful_cnt"]
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        print(f"도움돼요 처리 오류: {e}")
+        return jsonify({"error": "도움돼요 처리 중 오류가 발생했습니다."}), 500
+    finally:
+        conn.close()
+
+    if voted:
+        versions.clear_local()
+    return jsonify({"helpful_cnt": helpful_cnt, "voted": voted}), 200
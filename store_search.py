@@ -0,0 +1,155 @@
+"""
+store_search.py
+----------------------------------------
+매장 검색 API
+- GET /api/stores/search?q=검색어 : 매장 검색 (관련도 순)
+- GET /api/stores/autocomplete?q=접두사 : 매장 이름 자동완성 (초성 검색 지원)
+
+검색은 MySQL ngram FULLTEXT 인덱스(ft_store_name, ft_store_address, ft_menu_name)를
+사용합니다. 선택 파라미터
+- scope  : 검색 대상 (name, address, menu 를 콤마로 구분, 기본 name)
+- limit  : 최대 결과 수 (기본 20, 최대 100)
+- offset : 건너뛸 결과 수
+"""
+
+from flask import Blueprint, request, jsonify
+from db import get_connection
+import autocomplete
+
+bp = Blueprint('store_search', __name__)
+
+# MySQL ngram_token_size 와 같은 값. 이보다 짧은 검색어는 인덱스로 찾을 수 없음
+NGRAM_TOKEN_SIZE = 2
+
+SEARCH_DEFAULT_LIMIT = 20
+SEARCH_MAX_LIMIT = 100
+
+AUTOCOMPLETE_DEFAULT_K = 10
+AUTOCOMPLETE_MAX_K = 20
+
+# 검색 대상별 (FULLTEXT 검색 SQL, 관련도 가중치)
+SEARCH_SCOPES = {
+    "name": ("""
+        SELECT store_id, MATCH(name) AGAINST (%s IN BOOLEAN MODE) * {w} AS score
+        FROM store
+        WHERE MATCH(name) AGAINST (%s IN BOOLEAN MODE)
+    """, 3),
+    "address": ("""
+        SELECT store_id, MATCH(address) AGAINST (%s IN BOOLEAN MODE) * {w} AS score
+        FROM store
+        WHERE MATCH(address) AGAINST (%s IN BOOLEAN MODE)
+    """, 1),
+    "menu": ("""
+        SELECT store_id, MATCH(name) AGAINST (%s IN BOOLEAN MODE) * {w} AS score
+        FROM menu
+        WHERE MATCH(name) AGAINST (%s IN BOOLEAN MODE)
+    """, 1),
+}
+
+# BOOLEAN MODE 에서 연산자로 해석되는 문자
+_BOOLEAN_OPERATORS = '+-<>()~*"@'
+
+
+def build_boolean_query(q):
+    """
+    검색어를 BOOLEAN MODE 쿼리로 바꿉니다.
+    단어마다 '+' 를 붙여 모든 단어를 포함하도록 하고, ngram 파서가 각 단어를
+    n-gram 구(phrase)로 검색하므로 부분 문자열 검색처럼 동작합니다.
+    """
+    words = []
+    for word in q.split():
+        word = "".join(ch for ch in word if ch not in _BOOLEAN_OPERATORS)
+        if word:
+            words.append(f"+{word}")
+    return " ".join(words)
+
+
+def search_stores(q, scopes=("name",), limit=SEARCH_DEFAULT_LIMIT, offset=0):
+    sql, params = build_search_query(q, scopes, limit, offset)
+
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(sql, params)
+            rows = cur.fetchall()
+    finally:
+        conn.close()
+    return rows
+
+
+def build_search_query(q, scopes, limit, offset):
+    """검색 SQL 과 파라미터 (동기/비동기 모드 공용)"""
+    boolean_q = build_boolean_query(q)
+    short = any(len(w) < NGRAM_TOKEN_SIZE for w in boolean_q.replace("+", "").split())
+
+    if not boolean_q or short:
+        # 한 글자 검색어는 ngram 인덱스에 없으므로 이름 부분 일치로 대체 (결과 수 제한)
+        return """
+            SELECT store_id, name, 0 AS relevance
+            FROM store
+            WHERE name LIKE %s
+            ORDER BY name
+            LIMIT %s OFFSET %s
+        """, (f"%{q.strip()}%", limit, offset)
+
+    # 선택한 검색 대상별 FULLTEXT 결과를 합쳐 매장 단위 관련도 순으로 정렬
+    parts, params = [], []
+    for scope in scopes:
+        sql, weight = SEARCH_SCOPES[scope]
+        parts.append(sql.format(w=weight))
+        params.extend([boolean_q, boolean_q])
+    params.extend([limit, offset])
+
+    return f"""
+        SELECT s.store_id, s.name, SUM(x.score) AS relevance
+        FROM (
+            {" UNION ALL ".join(parts)}
+        ) x
+        JOIN store s ON s.store_id = x.store_id
+        GROUP BY s.store_id, s.name
+        ORDER BY relevance DESC, s.name
+        LIMIT %s OFFSET %s
+    """, params
+
+
+# ======================
+# 매장 검색
+# GET /api/stores/search
+# ======================
+@bp.route('/api/stores/search', methods=['GET'])
+def search_store():
+    q = request.args.get('q')
+    if not q or not q.strip():
+        return jsonify({'error': '검색어가 없습니다.'}), 400
+
+    scopes = [s.strip() for s in request.args.get('scope', 'name').split(',') if s.strip()]
+    if not scopes or any(s not in SEARCH_SCOPES for s in scopes):
+        return jsonify({'error': f'scope 는 {", ".join(SEARCH_SCOPES)} 중에서 선택하세요.'}), 400
+
+    limit = request.args.get('limit', SEARCH_DEFAULT_LIMIT, type=int)
+    offset = request.args.get('offset', 0, type=int)
+    limit = max(1, min(limit, SEARCH_MAX_LIMIT))
+    offset = max(0, offset)
+
+    stores = search_stores(q, scopes, limit, offset)
+
+    if not stores and offset == 0:
+        return jsonify({'error': '매장을 찾을 수 없습니다.'}), 404
+
+    return jsonify(stores)
+
+
+# ======================
+# 매장 이름 자동완성
+# GET /api/stores/autocomplete?q=...&k=10
+# ======================
+@bp.route('/api/stores/autocomplete', methods=['GET'])
+def autocomplete_store():
+    q = (request.args.get('q') or '').strip()
+    if not q:
+        return jsonify([])
+
+    k = request.args.get('k', AUTOCOMPLETE_DEFAULT_K, type=int)
+    k = max(1, min(k, AUTOCOMPLETE_MAX_K))
+
+    return jsonify(autocomplete.suggest(q, k))
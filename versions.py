@@ -0,0 +1,177 @@
+"""
+versions.py
+----------------------------------------
+리소스 버전 관리 + HTTP 조건부 요청(ETag / Last-Modified / 304)
+
+리소스 이름
+- "rank"          : 랭킹 전체 (리뷰 작성/삭제, 매장 수정/삭제 시 증가)
+- "store:<id>"    : 매장 하나 (매장 정보, 메뉴, 리뷰가 바뀌면 증가)
+- "stores"        : 매장 목록 (매장 이름/좌표 수정, 삭제 시 증가. 자동완성 / 좌표 인덱스가 감시)
+
+버전은 resource_version 테이블에 저장하므로 워커 프로세스(serve.py)끼리 공유되며,
+쓰기 트랜잭션 안에서 bump() / bump_steps() 로 함께 올립니다.
+읽을 때는 VERSION_CACHE_TTL 초 동안 프로세스 메모리의 값을 쓰므로
+If-None-Match 가 맞으면 DB 를 거치지 않고 304 를 반환합니다.
+"""
+
+import hashlib
+import threading
+import time
+from datetime import date, timezone
+from functools import wraps
+
+from flask import make_response, request
+from werkzeug.http import is_resource_modified
+
+from cache import TTLCache
+from db import get_connection
+
+# 다른 워커에서 올린 버전이 이 시간(초) 안에 반영됨 (같은 워커의 쓰기는 즉시 반영)
+VERSION_CACHE_TTL = 1
+
+# 응답 JSON 형식을 바꿀 때 올려주세요 (기존 ETag 를 모두 무효화)
+ETAG_SALT = "v1"
+
+version_cache = TTLCache(maxsize=4096, ttl=VERSION_CACHE_TTL)
+
+VERSION_SQL = "SELECT version, updated_at FROM resource_version WHERE resource = %s"
+
+
+def bump_steps(*resources):
+    """버전을 1 올리는 (sql, params). 잠금 순서를 맞추기 위해 이름순으로 처리합니다."""
+    resources = sorted(set(resources))
+    if not resources:
+        return
+    values = ", ".join(["(%s, 1, UTC_TIMESTAMP())"] * len(resources))
+    yield (f"""
+        INSERT INTO resource_version (resource, version, updated_at)
+        VALUES {values}
+        ON DUPLICATE KEY UPDATE
+            version = version + 1,
+            updated_at = VALUES(updated_at)
+    """, tuple(resources))
+
+
+def bump(cur, *resources):
+    """호출한 쪽의 트랜잭션 안에서 버전을 올립니다. commit 후 clear_local() 을 호출하세요."""
+    for sql, params in bump_steps(*resources):
+        cur.execute(sql, params)
+
+
+def clear_local():
+    version_cache.clear()
+
+
+def get_version(resource):
+    """(version, updated_at). 한 번도 올린 적 없는 리소스는 (0, None)"""
+    cached = version_cache.get(resource)
+    if cached is not None:
+        return cached
+
+    generation = version_cache.generation
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(VERSION_SQL, (resource,))
+            row = cur.fetchone()
+    finally:
+        conn.close()
+
+    result = (row["version"], row["updated_at"]) if row else (0, None)
+    version_cache.set(resource, result, generation)
+    return result
+
+
+class VersionWatch:
+    """
+    프로세스 메모리 인덱스(autocomplete / geo)가 다른 워커 프로세스의 쓰기를 반영하기 위한 버전 감시.
+    - mark()         : 인덱스를 읽기 직전에 호출해 지금 버전을 기록
+    - poll(reload)   : interval 초에 한 번만 버전을 확인하고, 기록한 버전과 다르면
+                       reload 를 백그라운드 스레드에서 실행 (한 번에 하나, 조회는 기다리지 않음)
+    """
+
+    def __init__(self, resource, interval):
+        self.resource = resource
+        self.interval = interval
+        self.seen = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._reloading = threading.Lock()
+
+    def mark(self):
+        self.seen = get_version(self.resource)[0]
+
+    def poll(self, reload):
+        if self.seen is None:
+            return   # DB 에서 읽은 적 없는 인덱스 (테스트용 등)
+        now = time.monotonic()
+        with self._lock:
+            if now - self._checked_at < self.interval:
+                return
+            self._checked_at = now
+        if get_version(self.resource)[0] == self.seen:
+            return
+        if not self._reloading.acquire(blocking=False):
+            return   # 이미 다시 읽는 중
+
+        def run():
+            try:
+                reload()
+            except Exception as e:
+                print(f"'{self.resource}' 인덱스 다시 읽기 오류: {e}")
+            finally:
+                self._reloading.release()
+
+        threading.Thread(target=run, name=f"reload-{self.resource}", daemon=True).start()
+
+
+def make_etag(resource, version, full_path=None):
+    # 같은 버전이라도 쿼리(limit/offset 등)가 다르면 다른 응답이므로 경로 전체를 포함.
+    # 최근 30/90일 통계는 쓰기 없이도 날짜가 바뀌면 달라지므로 날짜도 포함
+    # (asgi_app 은 quart request.full_path 를 넘김)
+    full_path = request.full_path if full_path is None else full_path
+    raw = f"{ETAG_SALT}:{date.today().isoformat()}:{resource}:{version}:{full_path}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:20]
+
+
+def conditional(resource, max_age=0, version=None, also=()):
+    """
+    GET 응답에 ETag / Last-Modified / Cache-Control 을 붙이고,
+    클라이언트가 가진 버전이 최신이면 핸들러를 실행하지 않고 304 를 반환합니다.
+    resource : 리소스 이름 또는 URL 인자를 받아 이름을 돌려주는 함수
+    max_age  : 0 이면 no-cache (매번 재검증), 양수면 그 시간(초) 동안 캐시 허용
+    version  : (version, updated_at) 을 돌려주는 함수. 응답을 DB 가 아닌 메모리 스냅샷에서 만들 때
+               스냅샷의 버전을 쓰기 위함 (None 을 돌려주면 resource_version 테이블 값)
+    also     : 응답에 함께 담기는 다른 리소스 이름들. 이 버전들도 ETag / Last-Modified 에 포함
+               (예: 매장 상세의 bayes_score 는 전체 평균이 바뀌면 "rank" 만 올라감)
+    """
+    cache_control = f"public, max-age={max_age}" if max_age else "no-cache"
+
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            name = resource(**kwargs) if callable(resource) else resource
+            # 핸들러보다 먼저 버전을 읽어야 그 사이에 쓰기가 있어도 ETag 가 응답보다 새것이 되지 않음
+            current, updated_at = (version() if version else None) or get_version(name)
+            for other in also:
+                other_version, other_updated = get_version(other)
+                current = f"{current}.{other_version}"
+                if other_updated and (updated_at is None or other_updated > updated_at):
+                    updated_at = other_updated
+            etag = make_etag(name, current)
+            last_modified = updated_at.replace(tzinfo=timezone.utc) if updated_at else None
+
+            if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+                response = make_response("", 304)
+            else:
+                response = make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag)
+            if last_modified:
+                response.last_modified = last_modified
+            response.headers["Cache-Control"] = cache_control
+            return response
+        return decorated
+    return decorator